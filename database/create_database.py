@@ -45,6 +45,7 @@ CREATE TABLE IF NOT EXISTS hands (
   total_pot       INTEGER DEFAULT 0, -- 总底池
 
   board_cards     TEXT, -- 建议存 JSON: ["Ah","Kd","Qs"]，比分开存灵活
+  deck_order      TEXT, -- 本手牌按顺序发出的牌编码，每张两位十六进制，用于回放
 
   FOREIGN KEY(table_id) REFERENCES poker_tables(id) ON DELETE SET NULL
 );
@@ -153,6 +154,20 @@ END;
 """
 
 
+# 旧库升级：(表名, 列名, 列定义)
+MIGRATIONS = [
+    ("hands", "deck_order", "TEXT"),
+]
+
+
+def migrate(conn):
+    for table, column, definition in MIGRATIONS:
+        columns = [row[1] for row in conn.execute("PRAGMA table_info({})".format(table))]
+        if column not in columns:
+            conn.execute("ALTER TABLE {} ADD COLUMN {} {}".format(table, column, definition))
+    conn.commit()
+
+
 # 初始化 DB
 def init_db(db_path: str = "poker.sqlite3"):
     conn = sqlite3.connect(db_path)
@@ -160,6 +175,7 @@ def init_db(db_path: str = "poker.sqlite3"):
     conn.execute("PRAGMA journal_mode = WAL;")
     conn.execute("PRAGMA synchronous = NORMAL;")
     conn.executescript(DDL)
+    migrate(conn)
     conn.close()
     print("Database initialized successfully.")
 
@@ -25,7 +25,7 @@ def create_bot_player(logger, difficulty: str, exclude_ids: Sequence[int] = None
 
     player_id = int(player_data["id"])
     nickname = player_data.get("nickname") or player_data.get("username")
-    money = float(player_data.get("chips") or 0)
+    money = int(player_data.get("chips") or 0)
     avatar = player_data.get("avatar")
 
     return BotPlayerServer(
@@ -0,0 +1,115 @@
+"""
+一手牌内增量维护的机器人决策上下文。
+
+每次轮到机器人时不再重建整个上下文：玩家的静态信息、手牌和公共牌的编码在一手牌内只计算一次，
+行动记录只追加、上下文里保存的是某一时刻的只读视图，底池总额随行动累加。
+上下文只在发给远程引擎时才序列化（BotDecisionContext.to_dict）。
+"""
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from ..card import code_dto
+from .decision import BotDecisionContext
+
+
+class ActionLog(Sequence):
+    """只追加的行动记录在某一时刻的只读视图（前 length 条，再加上预测的行动 extra），不复制记录"""
+    __slots__ = ("_actions", "_length", "_extra")
+
+    def __init__(self, actions: List[Dict[str, Any]], length: int = None, extra: Tuple[Dict[str, Any], ...] = ()):
+        self._actions = actions
+        self._length = len(actions) if length is None else length
+        self._extra = extra
+
+    def __len__(self) -> int:
+        return self._length + len(self._extra)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Action index out of range")
+        return self._actions[index] if index < self._length else self._extra[index - self._length]
+
+    def __iter__(self):
+        return chain(islice(self._actions, self._length), self._extra)
+
+    def with_action(self, action: Dict[str, Any]) -> "ActionLog":
+        """在视图末尾加一条（预测的）行动，原来的记录不受影响"""
+        return ActionLog(self._actions, self._length, self._extra + (action,))
+
+
+class HandContextTracker:
+    """
+    一手牌的机器人上下文状态：
+    - actions 是这手牌的行动记录（只追加），由牌局在每次行动后 record
+    - 手牌、公共牌的编码和 dto 在第一次用到时计算并缓存
+    - pot_total 为这手牌已投入的全部筹码（底池 + 本轮下注）
+    """
+
+    def __init__(self, room_id: str, game_id: str, players: Iterable, scores):
+        self._room_id = room_id
+        self._game_id = game_id
+        self._scores = scores
+        self._players = [(p, {
+            "id": p.id,
+            "name": p.name,
+            "seat": getattr(p, "seat", None),
+            "is_bot": getattr(p, "is_bot", False),
+            "bot_difficulty": getattr(p, "bot_difficulty", None)
+        }) for p in players]
+        self._hands: Dict[int, Tuple[Tuple[int, ...], List[Tuple[int, int]]]] = {}
+        self._board: Tuple[Tuple[int, ...], List[Tuple[int, int]]] = ((), [])
+        self.actions: List[Dict[str, Any]] = []
+        self.pot_total = 0
+
+    def record(self, action: Dict[str, Any], bet: int):
+        self.actions.append(action)
+        if bet != -1:
+            self.pot_total += bet
+
+    def hand(self, player_id: int) -> Tuple[Tuple[int, ...], List[Tuple[int, int]]]:
+        cached = self._hands.get(player_id)
+        if cached is None:
+            codes = tuple(self._scores.player_codes(player_id)) if self._scores else ()
+            cached = self._hands[player_id] = (codes, [code_dto(c) for c in codes])
+        return cached
+
+    def board(self) -> Tuple[Tuple[int, ...], List[Tuple[int, int]]]:
+        shared_codes = self._scores.shared_codes if self._scores else ()
+        if len(shared_codes) != len(self._board[0]):
+            # 公共牌变化时换一个新列表，之前的上下文仍然看到当时的公共牌
+            codes = tuple(shared_codes)
+            self._board = (codes, [code_dto(c) for c in codes])
+        return self._board
+
+    def context(self, player, street: int, min_bet, max_bet, bets: Dict[int, int], is_active: Callable[[int], bool],
+                pending_bet: int = 0) -> BotDecisionContext:
+        """
+        :param bets: 本轮下注
+        :param is_active: 玩家 id 是否未弃牌
+        :param pending_bet: 还没有记录的下注（预测下一位玩家的局面时使用）
+        """
+        hand_codes, hand_cards = self.hand(player.id)
+        board_codes, board_cards = self.board()
+        return BotDecisionContext(
+            room_id=self._room_id,
+            game_id=self._game_id,
+            street=street,
+            player_id=player.id,
+            player_name=player.name,
+            seat=getattr(player, "seat", None),
+            hand=hand_cards,
+            board=board_cards,
+            players=[dict(info, money=p.money, active=is_active(p.id)) for p, info in self._players],
+            pot_total=self.pot_total + pending_bet,
+            street_bets=dict(bets or {}),
+            min_bet=min_bet,
+            max_bet=max_bet,
+            to_call=min_bet,
+            action_history=ActionLog(self.actions),
+            hand_codes=hand_codes,
+            board_codes=board_codes,
+        )
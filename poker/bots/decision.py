@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence, Tuple
 
 
 @dataclass
@@ -18,7 +18,10 @@ class BotDecisionContext:
     min_bet: int
     max_bet: int
     to_call: int
-    action_history: List[Dict[str, Any]] = field(default_factory=list)
+    action_history: Sequence[Dict[str, Any]] = field(default_factory=list)
+    # 牌编码（card.card_code），与 hand/board 对应；为空时由 hand/board 换算
+    hand_codes: Tuple[int, ...] = ()
+    board_codes: Tuple[int, ...] = ()
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -36,7 +39,7 @@ class BotDecisionContext:
             "min_bet": self.min_bet,
             "max_bet": self.max_bet,
             "to_call": self.to_call,
-            "action_history": self.action_history,
+            "action_history": list(self.action_history),
         }
 
 
@@ -45,6 +48,11 @@ class BotDecisionEngine:
     Bot decision engine interface.
     Implementations should return a bet amount:
     -1 = fold, 0 = check, min_bet = call, > min_bet = raise (clamped by game)
+
+    prefetch: whether the game should compute decisions ahead of the bot's turn
+    (worth it for engines that are slow to compute or call a remote service).
     """
+    prefetch = False
+
     def decide(self, context: BotDecisionContext) -> int:
         raise NotImplementedError
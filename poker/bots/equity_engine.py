@@ -0,0 +1,156 @@
+import random
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional
+
+from ..card import card_code
+from ..equity import equity, estimate_equity
+from ..preflop import COMBOS, NUM_CLASSES, dto_class_id
+from .. import preflop_equity
+from .decision import BotDecisionContext, BotDecisionEngine
+
+
+def _chen_score(class_id: int) -> float:
+    """Chen 公式的起手牌分数，只用来给169类手牌排序生成范围表"""
+    row, col = divmod(class_id, 13)
+    high, low = 14 - min(row, col), 14 - max(row, col)
+    score = {14: 10.0, 13: 8.0, 12: 7.0, 11: 6.0}.get(high, high / 2.0)
+    if high == low:
+        return max(score * 2, 5.0)
+    if row < col:  # 同花
+        score += 2
+    gap = high - low - 1
+    score -= (0, 1, 2, 4)[gap] if gap < 4 else 5
+    if gap <= 1 and high < 12:
+        score += 1
+    return score
+
+
+# 起手牌从强到弱
+_CLASS_ORDER: List[int] = sorted(range(NUM_CLASSES), key=lambda class_id: (-_chen_score(class_id), class_id))
+
+
+def top_range(fraction: float) -> FrozenSet[int]:
+    """按组合数取最强的 fraction 比例的起手牌"""
+    total = sum(COMBOS)
+    selected, combos = [], 0
+    for class_id in _CLASS_ORDER:
+        if combos >= total * fraction:
+            break
+        selected.append(class_id)
+        combos += COMBOS[class_id]
+    return frozenset(selected)
+
+
+@dataclass(frozen=True)
+class EngineProfile:
+    samples: int  # 蒙特卡洛最多模拟次数
+    tight_range: float  # 翻前主动加注的对手的范围
+    loose_range: float  # 其他对手的范围
+    call_margin: float  # 胜率需要比底池赔率高出多少才跟注
+    bet_equity: float  # 无人下注时主动下注的胜率
+    raise_equity: float  # 加注的胜率
+    bluff: float  # 无人下注时诈唬的概率
+
+
+PROFILES: Dict[str, EngineProfile] = {
+    "medium": EngineProfile(samples=800, tight_range=0.2, loose_range=0.6, call_margin=0.04,
+                            bet_equity=0.6, raise_equity=0.72, bluff=0.0),
+    "hard": EngineProfile(samples=2000, tight_range=0.15, loose_range=0.45, call_margin=0.0,
+                          bet_equity=0.55, raise_equity=0.66, bluff=0.08),
+}
+
+AGGRESSIVE_ACTIONS = ("bet", "raise", "all-in")
+
+
+class LocalEquityEngine(BotDecisionEngine):
+    """
+    本地中高难度机器人：估计自己对各对手范围的胜率，与底池赔率比较后决定弃牌/跟注/加注。
+    - 翻前有胜率表时直接查表（preflop_equity），否则蒙特卡洛
+    - 对手范围：翻前主动加注过的用紧的范围，其他的用松的范围
+    - 翻后用 equity.equity，转牌、河牌组合数少时精确计算
+    """
+    prefetch = True
+
+    def __init__(self, difficulty: str, rng: Optional[random.Random] = None):
+        self._difficulty = difficulty
+        self._profile = PROFILES.get(difficulty, PROFILES["medium"])
+        self._rng = rng or random.Random()
+        self._tight = top_range(self._profile.tight_range)
+        self._loose = top_range(self._profile.loose_range)
+
+    def decide(self, context: BotDecisionContext) -> int:
+        if not context.hand or len(context.hand) < 2:
+            return 0 if context.min_bet == 0 else -1
+
+        win = self._equity(context)
+        profile = self._profile
+        pot = max(context.pot_total, 1)
+
+        if context.min_bet == 0:
+            if win >= profile.bet_equity:
+                return self._clamp_bet(context, int(pot * (0.5 if win < 0.75 else 0.75)))
+            if profile.bluff and self._rng.random() < profile.bluff:
+                return self._clamp_bet(context, int(pot * 0.5))
+            return 0
+
+        if win >= profile.raise_equity:
+            return self._clamp_bet(context, max(int(pot * 0.8), context.min_bet * 2))
+        pot_odds = context.min_bet / (pot + context.min_bet)
+        if win >= pot_odds + profile.call_margin:
+            return context.min_bet
+        return -1
+
+    def _opponent_ranges(self, context: BotDecisionContext) -> List[FrozenSet[int]]:
+        raisers = {
+            action.get("player_id") for action in context.action_history
+            if action.get("street") == 0 and action.get("action_type") in AGGRESSIVE_ACTIONS
+        }
+        return [
+            self._tight if player.get("id") in raisers else self._loose
+            for player in context.players
+            if player.get("active") and player.get("id") != context.player_id
+        ]
+
+    def _equity(self, context: BotDecisionContext) -> float:
+        ranges = self._opponent_ranges(context)
+        if not ranges:
+            return 1.0
+        hole = list(context.hand_codes[0:2]) or [card_code(rank, suit) for rank, suit in context.hand[0:2]]
+        board = list(context.board_codes) or [card_code(rank, suit) for rank, suit in context.board]
+
+        if not board:
+            table_equity = self._preflop_table_equity(dto_class_id(context.hand[0:2]), ranges)
+            if table_equity is not None:
+                return table_equity
+            return estimate_equity(hole, board, len(ranges), ranges, target_stderr=0.02,
+                                   max_samples=self._profile.samples, batch_size=200, rng=self._rng).equity
+
+        try:
+            return equity(hole, board, len(ranges), ranges, target_stderr=0.02,
+                          max_samples=self._profile.samples, batch_size=200, rng=self._rng).equity
+        except ValueError:
+            # 范围和已知的牌冲突（例如范围内的牌都在公共牌上），按随机手牌计算
+            return equity(hole, board, len(ranges), None, target_stderr=0.02,
+                          max_samples=self._profile.samples, batch_size=200, rng=self._rng).equity
+
+    @staticmethod
+    def _preflop_table_equity(class_id: int, ranges: List[FrozenSet[int]]) -> Optional[float]:
+        if preflop_equity.TABLES is None:
+            return None
+        if len(ranges) == 1:
+            # 单挑：对范围内各类的胜率按组合数加权
+            total = weight = 0.0
+            for opponent_class in ranges[0]:
+                total += preflop_equity.heads_up_equity(class_id, opponent_class) * COMBOS[opponent_class]
+                weight += COMBOS[opponent_class]
+            return total / weight
+        # 多人底池近似为对随机手牌的胜率
+        return preflop_equity.equity_vs_random(class_id, min(len(ranges), preflop_equity.MAX_OPPONENTS))
+
+    @staticmethod
+    def _clamp_bet(context: BotDecisionContext, size: int) -> int:
+        if size < context.min_bet:
+            size = context.min_bet
+        if size > context.max_bet:
+            size = context.max_bet
+        return int(max(size, 1 if context.max_bet > 0 else 0))
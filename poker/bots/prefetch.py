@@ -0,0 +1,85 @@
+from typing import Dict, Optional, Tuple
+
+import gevent
+
+from .decision import BotDecisionContext, BotDecisionEngine
+
+
+def context_fingerprint(context: BotDecisionContext) -> Tuple:
+    """
+    决定机器人决策的全部牌局状态，预测的局面与实际局面指纹相同时可以直接使用预先算好的决策。
+    一手牌内行动记录只追加，所以只比较记录条数和最后一条（预测的行动）。
+    """
+    history = context.action_history
+    return (
+        context.street,
+        context.player_id,
+        tuple(tuple(card) for card in context.hand),
+        tuple(tuple(card) for card in context.board),
+        context.min_bet,
+        context.max_bet,
+        context.pot_total,
+        tuple(sorted(context.street_bets.items())),
+        tuple((player.get("id"), player.get("money"), player.get("active")) for player in context.players),
+        len(history),
+        tuple(sorted(history[-1].items())) if history else (),
+    )
+
+
+def _decide(engine: BotDecisionEngine, context: BotDecisionContext):
+    # 异常留到取结果时再抛出，避免协程直接打印错误
+    try:
+        return engine.decide(context), None
+    except Exception as e:
+        return None, e
+
+
+class PrefetchedDecision:
+    def __init__(self, fingerprint: Tuple, engine: BotDecisionEngine, context: BotDecisionContext):
+        self.fingerprint = fingerprint
+        self._greenlet = gevent.spawn(_decide, engine, context)
+
+    def get(self) -> int:
+        """等待计算完成并返回决策"""
+        decision, error = self._greenlet.get()
+        if error is not None:
+            raise error
+        return decision
+
+    def cancel(self):
+        self._greenlet.kill(block=False)
+
+
+class DecisionPrefetcher:
+    """
+    提前计算机器人决策：轮到机器人之前（真人思考时、上一个机器人的思考时间里）按预测的局面在协程中计算，
+    轮到它时实际局面与预测一致就直接使用结果（可能还在计算中），否则丢弃重新计算。
+    每个玩家最多保留一个预测。
+    """
+
+    def __init__(self):
+        self._pending: Dict[int, PrefetchedDecision] = {}
+
+    def prefetch(self, engine: BotDecisionEngine, context: BotDecisionContext):
+        fingerprint = context_fingerprint(context)
+        pending = self._pending.get(context.player_id)
+        if pending is not None:
+            if pending.fingerprint == fingerprint:
+                return
+            pending.cancel()
+        self._pending[context.player_id] = PrefetchedDecision(fingerprint, engine, context)
+
+    def take(self, context: BotDecisionContext) -> Optional[PrefetchedDecision]:
+        """取出与实际局面一致的预先计算，没有时返回 None"""
+        pending = self._pending.pop(context.player_id, None)
+        if pending is None:
+            return None
+        if pending.fingerprint != context_fingerprint(context):
+            pending.cancel()
+            return None
+        return pending
+
+    def clear(self):
+        for pending in self._pending.values():
+            pending.cancel()
+        self._pending.clear()
@@ -1,12 +1,19 @@
 import random
-from typing import Dict, List, Tuple
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
-from ..card import Card
+from ..canonical import canonical_key
+from ..card import card_code
+from ..preflop import LABELS, dto_class_id
 from ..score_detector import HoldemPokerScoreDetector, HoldemPokerScore
-from .remote_engine import RemoteDecisionEngine
+from ..config import BOT_DECISION_MODE
+from .equity_engine import LocalEquityEngine
 
 from .decision import BotDecisionContext, BotDecisionEngine
 
+# 牌力计算器无状态，所有机器人共用一个
+_SCORE_DETECTOR = HoldemPokerScoreDetector()
+
 
 class TableDrivenEasyEngine(BotDecisionEngine):
     """
@@ -14,22 +21,6 @@ class TableDrivenEasyEngine(BotDecisionEngine):
     根据手牌强度（Premium, Strong, Speculative）在翻牌前做决定。
     翻牌后根据牌型大小做决定。
     """
-    RANK_TO_CHAR = {
-        14: "A",
-        13: "K",
-        12: "Q",
-        11: "J",
-        10: "T",
-        9: "9",
-        8: "8",
-        7: "7",
-        6: "6",
-        5: "5",
-        4: "4",
-        3: "3",
-        2: "2",
-    }
-
     # 顶级手牌
     PREMIUM = {
         "AA", "KK", "QQ", "JJ", "TT",
@@ -48,75 +39,137 @@ class TableDrivenEasyEngine(BotDecisionEngine):
         "87s", "76s", "65s", "54s",
     }
 
+    # _call_or_fold 用到的跟注额/底池比例，决策缓存按这些阈值给底池赔率分档
+    CALL_RATIOS = (0.25, 0.4, 0.5)
+    CACHE_SIZE = 4096
+
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        # 抽象局面 -> 抽象动作的 LRU 缓存，下注金额在取出后按实际底池计算
+        self._cache: "OrderedDict[Tuple, Tuple]" = OrderedDict()
+        self._cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+
     def decide(self, context: BotDecisionContext) -> int:
+        key = self._situation_key(context)
+        action = self._cache.get(key)
+        if action is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+            action = self._preflop_decide(context) if context.street == 0 else self._postflop_decide(context)
+            self._cache[key] = action
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return self._apply(context, action)
+
+    def cache_stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._cache)}
+
+    def _situation_key(self, context: BotDecisionContext) -> Tuple:
+        """
+        决定抽象动作的全部信息：圈数、手牌（翻前为起手牌类别，翻后为花色规范化的手牌+公共牌）、
+        是否需要跟注、跟注额在各个 CALL_RATIOS 阈值的哪一档
+        """
+        if context.min_bet == 0:
+            odds_bucket = -1
+        else:
+            pot = max(context.pot_total, 1)
+            odds_bucket = sum(1 for ratio in self.CALL_RATIOS if context.min_bet > pot * ratio)
         if context.street == 0:
-            return self._preflop_decide(context)
-        return self._postflop_decide(context)
+            cards = self._hand_key(context.hand)
+        else:
+            hand = self._codes(context.hand_codes, context.hand)
+            cards = canonical_key(hand, self._codes(context.board_codes, context.board)) if hand else None
+        return context.street, cards, odds_bucket
+
+    @staticmethod
+    def _codes(codes, cards) -> Optional[List[int]]:
+        if codes:
+            return list(codes)
+        try:
+            return [card_code(rank, suit) for rank, suit in cards]
+        except (TypeError, ValueError):
+            return None
+
+    def _apply(self, context: BotDecisionContext, action: Tuple) -> int:
+        """抽象动作 -> 下注金额"""
+        kind = action[0]
+        if kind == "fold":
+            return -1
+        if kind == "check":
+            return 0
+        if kind == "call":
+            return context.min_bet
+        if kind == "bet":
+            return self._bet(context, action[1])
+        return self._raise(context, action[1])
 
-    def _preflop_decide(self, context: BotDecisionContext) -> int:
+    def _check_or_fold(self, context: BotDecisionContext) -> Tuple:
+        return ("check",) if context.min_bet == 0 else ("fold",)
+
+    def _preflop_decide(self, context: BotDecisionContext) -> Tuple:
         """翻牌前决策逻辑"""
         hand_key = self._hand_key(context.hand)
         if not hand_key:
-            return 0 if context.min_bet == 0 else -1
+            return self._check_or_fold(context)
 
         if hand_key in self.PREMIUM:
-            return self._raise(context, 0.9)
+            return "raise", 0.9
         if hand_key in self.STRONG:
             if context.min_bet == 0:
-                return self._bet(context, 0.6)
+                return "bet", 0.6
             return self._call_or_fold(context, 0.5)
         if hand_key in self.SPECULATIVE:
             return self._call_or_fold(context, 0.25)
 
-        return 0 if context.min_bet == 0 else -1
+        return self._check_or_fold(context)
 
-    def _postflop_decide(self, context: BotDecisionContext) -> int:
+    def _postflop_decide(self, context: BotDecisionContext) -> Tuple:
         """翻牌后决策逻辑"""
-        score = self._score_hand(context.hand, context.board)
+        score = self._score_hand(self._codes(context.hand_codes, context.hand),
+                                 self._codes(context.board_codes, context.board))
         if not score:
-            return 0 if context.min_bet == 0 else -1
+            return self._check_or_fold(context)
 
         # 两对及以上
         if score.category >= HoldemPokerScore.TWO_PAIR:
             if context.min_bet == 0:
-                return self._bet(context, 0.6)
-            return self._raise(context, 0.8)
+                return "bet", 0.6
+            return "raise", 0.8
         # 一对
         if score.category == HoldemPokerScore.PAIR:
             return self._call_or_fold(context, 0.4)
 
-        return 0 if context.min_bet == 0 else -1
+        return self._check_or_fold(context)
 
     def _hand_key(self, hand: List[Tuple[int, int]]) -> str:
-        """生成手牌的字符串表示，例如 'AKs', '99'"""
+        """手牌的起手牌类别，例如 'AKs', '99'（查 preflop 的预计算表）"""
         if not hand or len(hand) < 2:
             return ""
-        (r1, s1), (r2, s2) = hand[0], hand[1]
-        suited = s1 == s2
-        if r1 == r2:
-            return f"{self.RANK_TO_CHAR.get(r1, '')}{self.RANK_TO_CHAR.get(r2, '')}"
-        high, low = (r1, r2) if r1 > r2 else (r2, r1)
-        return f"{self.RANK_TO_CHAR.get(high, '')}{self.RANK_TO_CHAR.get(low, '')}{'s' if suited else 'o'}"
-
-    def _score_hand(self, hand: List[Tuple[int, int]], board: List[Tuple[int, int]]):
+        try:
+            return LABELS[dto_class_id(hand[0:2])]
+        except ValueError:
+            return ""
+
+    def _score_hand(self, hand: Optional[List[int]], board: Optional[List[int]]):
         """计算当前手牌和公共牌组成的最佳牌型"""
-        if not hand:
+        if not hand or board is None:
             return None
-        cards = [Card(rank, suit) for rank, suit in (hand + board)]
-        detector = HoldemPokerScoreDetector()
         try:
-            return detector.get_score(cards)
+            return _SCORE_DETECTOR.get_score_codes(hand + board)
         except Exception:
             return None
 
-    def _call_or_fold(self, context: BotDecisionContext, max_ratio: float) -> int:
+    def _call_or_fold(self, context: BotDecisionContext, max_ratio: float) -> Tuple:
         """决定跟注还是弃牌，取决于下注额相对于底池的比例"""
         if context.min_bet == 0:
-            return 0
+            return ("check",)
         pot = max(context.pot_total, 1)
         if context.min_bet <= pot * max_ratio:
-            return context.min_bet
-        return -1
+            return ("call",)
+        return ("fold",)
 
     def _bet(self, context: BotDecisionContext, fraction: float) -> int:
         """下注底池的一定比例"""
@@ -145,10 +198,18 @@ class TableDrivenEasyEngine(BotDecisionEngine):
         return int(size)
 
 
+def _create_engine(difficulty: str) -> BotDecisionEngine:
+    # 中高难度默认使用本地胜率引擎，配置为 remote 时调用外部决策服务
+    if BOT_DECISION_MODE == "remote":
+        from .remote_engine import RemoteDecisionEngine
+        return RemoteDecisionEngine(difficulty)
+    return LocalEquityEngine(difficulty)
+
+
 BOT_ENGINE_REGISTRY: Dict[str, BotDecisionEngine] = {
     "easy": TableDrivenEasyEngine(),
-    "medium": RemoteDecisionEngine("medium"),
-    "hard": RemoteDecisionEngine("hard"),
+    "medium": _create_engine("medium"),
+    "hard": _create_engine("hard"),
 }
 
 
@@ -159,3 +220,8 @@ def get_engine_for_difficulty(difficulty: str) -> BotDecisionEngine:
     if difficulty == "normal":
         difficulty = "medium"
     return BOT_ENGINE_REGISTRY.get(difficulty, BOT_ENGINE_REGISTRY["easy"])
+
+
+def easy_cache_stats() -> Dict[str, int]:
+    """简单机器人决策缓存的命中/未命中次数"""
+    return BOT_ENGINE_REGISTRY["easy"].cache_stats()
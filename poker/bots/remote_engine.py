@@ -1,13 +1,254 @@
+import bisect
+import logging
 import os
 import time
-from typing import Optional, Tuple, List, Any
+from typing import Optional, Tuple, List, Any, Dict
 
+import gevent
 import requests
+from gevent.event import AsyncResult
+from requests.adapters import HTTPAdapter
 
+from ..card import code_dto
 from .decision import BotDecisionContext, BotDecisionEngine
 from ..db_utils.system_utils import get_api_key
 
 
+# 每个决策服务地址共用一个 Session，连接保持复用，不再每次请求都新建 TCP 连接
+_SESSIONS: Dict[str, requests.Session] = {}
+SESSION_POOL_SIZE = 32
+
+
+def get_session(base_url: str) -> requests.Session:
+    session = _SESSIONS.get(base_url)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=SESSION_POOL_SIZE, max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _SESSIONS[base_url] = session
+    return session
+
+
+class CircuitBreaker:
+    """
+    熔断器：连续失败 failure_threshold 次后断开，断开期间直接走本地兜底，不再等待请求超时；
+    reset_timeout 秒后半开，放行一次试探请求，成功则恢复，失败则继续断开。
+    试探请求被中途取消（record_cancel）算失败；没有结果的试探超过 reset_timeout 后放行新的试探。
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0, clock=time.monotonic):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+        self._probing = False
+        self._probe_started_at = 0.0
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> bool:
+        if self._state == self.CLOSED:
+            return True
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self._reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probing = False
+        if self._state == self.HALF_OPEN and (
+                not self._probing or self._clock() - self._probe_started_at >= self._reset_timeout):
+            self._probing = True  # 半开时同一时间只放行一个试探请求
+            self._probe_started_at = self._clock()
+            return True
+        return False
+
+    def record_success(self):
+        self._failures = 0
+        self._probing = False
+        self._state = self.CLOSED
+
+    def record_failure(self):
+        self._failures += 1
+        self._probing = False
+        if self._state == self.HALF_OPEN or self._failures >= self._failure_threshold:
+            if self._state != self.OPEN:
+                logging.getLogger(__name__).warning("Bot decision service unavailable, using local engine")
+            self._state = self.OPEN
+            self._opened_at = self._clock()
+
+    def record_cancel(self):
+        """请求没有结果就被取消（例如丢弃预取的决策）：试探请求算失败，其他请求不计数"""
+        if self._state == self.HALF_OPEN and self._probing:
+            self.record_failure()
+
+
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(base_url: str) -> CircuitBreaker:
+    breaker = _BREAKERS.get(base_url)
+    if breaker is None:
+        breaker = _BREAKERS[base_url] = CircuitBreaker()
+    return breaker
+
+
+class LatencyHistogram:
+    """请求耗时直方图（毫秒），按结果（ok / error / skipped）分别计数"""
+    BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2000)
+
+    def __init__(self):
+        self._counts: Dict[str, List[int]] = {}
+        self._total_ms: Dict[str, float] = {}
+
+    def record(self, seconds: float, outcome: str = "ok"):
+        ms = seconds * 1000
+        counts = self._counts.setdefault(outcome, [0] * (len(self.BUCKETS_MS) + 1))
+        counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+        self._total_ms[outcome] = self._total_ms.get(outcome, 0.0) + ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = ["<={}ms".format(bucket) for bucket in self.BUCKETS_MS] + [">{}ms".format(self.BUCKETS_MS[-1])]
+        result = {}
+        for outcome, counts in self._counts.items():
+            total = sum(counts)
+            result[outcome] = {
+                "count": total,
+                "mean_ms": self._total_ms[outcome] / total if total else 0.0,
+                "buckets": dict(zip(labels, counts)),
+            }
+        return result
+
+
+# 按难度统计
+LATENCY_HISTOGRAMS: Dict[str, LatencyHistogram] = {}
+
+
+def latency_stats() -> Dict[str, Dict[str, Any]]:
+    return {difficulty: histogram.snapshot() for difficulty, histogram in LATENCY_HISTOGRAMS.items()}
+
+
+class DecisionBatcher:
+    """
+    合并同一进程内所有牌桌的远程决策请求：第一个请求到达后等待 linger 秒（或攒够 max_batch 个），
+    把期间的请求合并成一次 POST /act_batch，再把结果按顺序分给各个请求。
+
+    /act_batch 请求体 {"requests": [{"difficulty", "context"}, ...]}，返回 {"results": [{"bet"}, ...]}，
+    与 /act 的请求、返回一一对应。只有一个请求时直接调用 /act；
+    服务不支持 /act_batch（404/405）时记住，之后同一批请求并发地分别调用 /act。
+    熔断器按 HTTP 调用计数，一批失败只算一次失败。
+    """
+
+    def __init__(self, base_url: str, headers: Dict[str, str], timeout: Tuple[float, float],
+                 linger: float = 0.005, max_batch: int = 64):
+        self._base_url = base_url
+        self._headers = headers
+        self._timeout = timeout
+        self._linger = linger
+        self._max_batch = max_batch
+        self._pending: List[Tuple[Dict[str, Any], AsyncResult]] = []
+        self._flush_timer = None
+        self._batch_supported = True
+        self.calls = 0  # 实际发出的 HTTP 请求数
+        self.requests = 0  # 提交的决策请求数
+
+    def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """提交一个 /act 请求体，阻塞当前协程直到拿到对应的返回；失败时抛出异常"""
+        result = AsyncResult()
+        self._pending.append((payload, result))
+        self.requests += 1
+        if len(self._pending) >= self._max_batch:
+            self._cancel_timer()
+            gevent.spawn(self.flush)
+        elif self._flush_timer is None:
+            self._flush_timer = gevent.spawn_later(self._linger, self.flush)
+        # linger 之后才发请求，多等一个 linger 作为余量
+        # wait 返回的是结果本身（空字典、异常时为 None），是否超时只能看 ready()
+        result.wait(self._linger * 2 + sum(self._timeout))
+        if not result.ready():
+            raise TimeoutError("Batched bot decision timed out")
+        return result.get()  # 请求失败时抛出原来的异常
+
+    def flush(self):
+        self._cancel_timer()
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        breaker = get_breaker(self._base_url)
+        try:
+            if len(batch) == 1:
+                responses = [self._post("/act", batch[0][0])]
+            elif self._batch_supported:
+                responses = self._post_batch([payload for payload, _ in batch])
+                if responses is None:
+                    responses = self._post_each([payload for payload, _ in batch])
+            else:
+                responses = self._post_each([payload for payload, _ in batch])
+        except Exception as e:
+            breaker.record_failure()
+            for _, result in batch:
+                result.set_exception(e)
+            return
+        breaker.record_success()
+        for (_, result), response in zip(batch, responses):
+            if isinstance(response, Exception):
+                result.set_exception(response)
+            else:
+                result.set(response)
+
+    def _cancel_timer(self):
+        timer, self._flush_timer = self._flush_timer, None
+        if timer is not None and timer is not gevent.getcurrent():
+            timer.kill(block=False)
+
+    def _post(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        self.calls += 1
+        resp = get_session(self._base_url).post(self._base_url + path, json=body, headers=self._headers,
+                                                timeout=self._timeout)
+        resp.raise_for_status()
+        return resp.json() if resp.content else {}
+
+    def _post_batch(self, payloads: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """返回 None 表示服务不支持 /act_batch"""
+        self.calls += 1
+        resp = get_session(self._base_url).post(self._base_url + "/act_batch", json={"requests": payloads},
+                                                headers=self._headers, timeout=self._timeout)
+        if resp.status_code in (404, 405):
+            logging.getLogger(__name__).warning("Bot decision service has no /act_batch, sending requests one by one")
+            self._batch_supported = False
+            return None
+        resp.raise_for_status()
+        results = resp.json().get("results")
+        if not isinstance(results, list) or len(results) != len(payloads):
+            raise ValueError("Batch response does not match the request")
+        return results
+
+    def _post_each(self, payloads: List[Dict[str, Any]]) -> List[Any]:
+        jobs = [gevent.spawn(self._post, "/act", payload) for payload in payloads]
+        gevent.joinall(jobs)
+        if all(job.exception is not None for job in jobs):
+            raise jobs[0].exception
+        return [job.exception if job.exception is not None else job.value for job in jobs]
+
+
+_BATCHERS: Dict[str, DecisionBatcher] = {}
+
+
+def get_batcher(base_url: str, headers: Dict[str, str], timeout: Tuple[float, float]) -> DecisionBatcher:
+    batcher = _BATCHERS.get(base_url)
+    if batcher is None:
+        try:
+            linger = float(os.environ.get("BOT_DECISION_BATCH_LINGER", "0.005"))
+        except Exception:
+            linger = 0.005
+        batcher = _BATCHERS[base_url] = DecisionBatcher(base_url, headers, timeout, linger=linger)
+    return batcher
+
+
 class RemoteDecisionEngine(BotDecisionEngine):
     """
     Calls an external bot service via HTTP for decisions.
@@ -15,8 +256,16 @@ class RemoteDecisionEngine(BotDecisionEngine):
     Env vars:
     - BOT_DECISION_URL: base URL, e.g. http://127.0.0.1:8081
     - BOT_DECISION_TOKEN: optional bearer token
-    - BOT_DECISION_TIMEOUT: seconds (float). Applies to connect/read.
+    - BOT_DECISION_TIMEOUT: seconds (float). Applies to read.
+    - BOT_DECISION_CONNECT_TIMEOUT: seconds (float), defaults to BOT_DECISION_TIMEOUT.
+    - BOT_DECISION_BATCH: "0" to send one /act request per decision instead of batching.
+    - BOT_DECISION_BATCH_LINGER: seconds (float) the batcher waits to collect requests, default 0.005.
+
+    Requests share a pooled keep-alive session per base URL and, unless disabled, are coalesced
+    across tables by a DecisionBatcher. After consecutive failures the circuit breaker opens and
+    decisions go straight to the local engine until a probe succeeds.
     """
+    prefetch = True
 
     SUIT_TO_CHAR = {
         0: "S",  # ♠
@@ -46,24 +295,38 @@ class RemoteDecisionEngine(BotDecisionEngine):
             self._timeout = float(timeout_s)
         except Exception:
             self._timeout = 1.2
+        try:
+            self._connect_timeout = float(os.environ.get("BOT_DECISION_CONNECT_TIMEOUT", self._timeout))
+        except Exception:
+            self._connect_timeout = self._timeout
+        self._batch = os.environ.get("BOT_DECISION_BATCH", "1") != "0"
+        self._histogram = LATENCY_HISTOGRAMS.setdefault(difficulty, LatencyHistogram())
+        self._local_engine = None
 
     def decide(self, context: BotDecisionContext) -> int:
-        time.sleep(0.5)
-
+        # 思考时间由 scheduler.ThinkScheduler 在牌局中非阻塞地补足，这里不再 sleep
         if not self._base_url:
             return self._fallback(context)
-        
-        url = f"{self._base_url}/act"
+
+        breaker = get_breaker(self._base_url)
+        if not breaker.allow():
+            self._histogram.record(0.0, "skipped")
+            return self._fallback(context)
+
         headers = {"Content-Type": "application/json"}
         if self._token:
             headers["Authorization"] = f"Bearer {self._token}"
 
         context_dict = context.to_dict()
         
-        # Convert cards to backend format
-        if "hand" in context_dict:
+        # Convert cards to backend format（有牌编码时直接查表）
+        if context.hand_codes:
+            context_dict["hand"] = [BACKEND_CARDS[c] for c in context.hand_codes]
+        elif "hand" in context_dict:
             context_dict["hand"] = [self._to_backend_card(c) for c in context_dict["hand"]]
-        if "board" in context_dict:
+        if context.board_codes:
+            context_dict["board"] = [BACKEND_CARDS[c] for c in context.board_codes]
+        elif "board" in context_dict:
             context_dict["board"] = [self._to_backend_card(c) for c in context_dict["board"]]
 
         payload = {
@@ -71,14 +334,36 @@ class RemoteDecisionEngine(BotDecisionEngine):
             "context": context_dict,
         }
 
-        try:
-            resp = requests.post(url, json=payload, headers=headers, timeout=(self._timeout, self._timeout))
-            resp.raise_for_status()
-            data = resp.json() if resp.content else {}
-        except Exception:
-            return self._fallback(context)
+        timeout = (self._connect_timeout, self._timeout)
+        started = time.monotonic()
+        if self._batch:
+            # 熔断器由 batcher 按 HTTP 调用更新
+            try:
+                data = get_batcher(self._base_url, headers, timeout).request(payload)
+            except Exception:
+                self._histogram.record(time.monotonic() - started, "error")
+                return self._fallback(context)
+        else:
+            completed = False
+            try:
+                resp = get_session(self._base_url).post(f"{self._base_url}/act", json=payload, headers=headers,
+                                                        timeout=timeout)
+                resp.raise_for_status()
+                data = resp.json() if resp.content else {}
+                completed = True
+            except Exception:
+                completed = True
+                self._histogram.record(time.monotonic() - started, "error")
+                breaker.record_failure()
+                return self._fallback(context)
+            finally:
+                if not completed:
+                    # 协程被杀掉（GreenletExit），不然试探请求会一直占着半开状态
+                    breaker.record_cancel()
+            breaker.record_success()
+        self._histogram.record(time.monotonic() - started, "ok")
 
-        bet = data.get("bet")
+        bet = data.get("bet") if isinstance(data, dict) else None
         if bet is None:
             return self._fallback(context)
         try:
@@ -86,23 +371,23 @@ class RemoteDecisionEngine(BotDecisionEngine):
         except Exception:
             return self._fallback(context)
 
-    def _to_backend_card(self, card: Any) -> str:
+    @classmethod
+    def _to_backend_card(cls, card: Any) -> str:
         # card: [rank, suit] or (rank, suit)
         try:
             rank, suit = card
-            return f"{self.SUIT_TO_CHAR.get(suit, '?')}{self.RANK_TO_CHAR.get(rank, '?')}"
+            return f"{cls.SUIT_TO_CHAR.get(suit, '?')}{cls.RANK_TO_CHAR.get(rank, '?')}"
         except Exception:
             return "??"
 
     def _fallback(self, context: BotDecisionContext) -> int:
+        # 本地同难度的胜率引擎
         try:
-            # Avoid circular import
-            from .registry import BOT_ENGINE_REGISTRY
-            easy_engine = BOT_ENGINE_REGISTRY.get("easy")
-            # Prevent infinite recursion if "easy" is also RemoteDecisionEngine (though it shouldn't be)
-            if easy_engine and not isinstance(easy_engine, RemoteDecisionEngine):
-                return easy_engine.decide(context)
-        except ImportError:
+            if self._local_engine is None:
+                from .equity_engine import LocalEquityEngine
+                self._local_engine = LocalEquityEngine(self._difficulty)
+            return self._local_engine.decide(context)
+        except Exception:
             pass
 
         # Safe-ish fallback: check if free; otherwise call small, fold big.
@@ -112,3 +397,7 @@ class RemoteDecisionEngine(BotDecisionEngine):
         if context.min_bet <= int(pot * 0.2):
             return context.min_bet
         return -1
+
+
+# 牌编码 -> 决策服务的牌格式（例如 "SA"）
+BACKEND_CARDS: List[str] = [RemoteDecisionEngine._to_backend_card(code_dto(code)) for code in range(52)]
@@ -0,0 +1,44 @@
+import random
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import gevent
+
+from .decision import BotDecisionContext, BotDecisionEngine
+from ..config import BOT_THINK_DELAY
+
+
+class ThinkScheduler:
+    """
+    机器人“思考时间”调度。
+    决策计算完成后，如果还没到该难度的思考时间，用 gevent.sleep 补足剩余时间：
+    只让出当前牌桌的协程，其他牌桌照常运行（原来在决策引擎里 time.sleep 会阻塞整个进程）。
+    """
+
+    def __init__(self, delays: Optional[Dict[str, Tuple[float, float]]] = None, rng: Optional[random.Random] = None):
+        self._delays: Dict[str, Tuple[float, float]] = dict(BOT_THINK_DELAY if delays is None else delays)
+        self._rng = rng or random.Random()
+
+    def delay_for(self, difficulty: Optional[str]) -> float:
+        low, high = self._delays.get(difficulty or "easy", (0.0, 0.0))
+        if high <= low:
+            return low
+        return self._rng.uniform(low, high)
+
+    def decide(self, engine: BotDecisionEngine, context: BotDecisionContext, difficulty: Optional[str] = None) -> int:
+        return self.run(lambda: engine.decide(context), difficulty)
+
+    def run(self, decide: Callable[[], int], difficulty: Optional[str] = None) -> int:
+        """执行 decide 得到决策，再补足思考时间"""
+        started = time.monotonic()
+        decision = decide()
+        remaining = self.delay_for(difficulty) - (time.monotonic() - started)
+        if remaining > 0:
+            gevent.sleep(remaining)
+        return decision
+
+
+# 所有牌桌共用
+DEFAULT_SCHEDULER = ThinkScheduler()
+# 不等待（回放、模拟）
+NO_DELAY_SCHEDULER = ThinkScheduler(delays={})
@@ -0,0 +1,57 @@
+"""
+花色同构规范化。
+
+德州扑克中花色之间没有大小，只差一个花色置换的牌面（例如 AhKh / QhJh2c 和 AsKs / QsJs2d）牌力和胜率完全相同。
+缓存（胜率、机器人决策等）以规范形式为键，可以把最多 24 种等价的牌面合并成一个键。
+
+规范化时把牌分成若干组（例如 手牌、公共牌），每个花色的特征是它在各组中的点数掩码，
+按特征从大到小给花色重新编号，组内牌编码从小到大排序。特征相同的花色可以互换，所以结果与原来的花色无关。
+规范形式本身仍是合法的牌编码，可以直接拿去计算；需要还原成原来的花色时使用 canonicalize 返回的花色映射。
+"""
+from typing import List, Sequence, Tuple
+
+CanonicalGroups = Tuple[Tuple[int, ...], ...]
+SuitMap = Tuple[int, int, int, int]  # 下标为原花色，值为规范后的花色
+
+
+def suit_map(groups: Sequence[Sequence[int]]) -> SuitMap:
+    """计算原花色到规范花色的映射"""
+    signatures = [[0] * len(groups) for _ in range(4)]
+    for index, group in enumerate(groups):
+        for code in group:
+            signatures[code & 3][index] |= 1 << (code >> 2)
+    mapping = [0] * 4
+    for new_suit, suit in enumerate(sorted(range(4), key=lambda suit: signatures[suit], reverse=True)):
+        mapping[suit] = new_suit
+    return tuple(mapping)
+
+
+def apply_suit_map(codes: Sequence[int], mapping: Sequence[int]) -> List[int]:
+    """按映射替换每张牌的花色，点数不变"""
+    return [(code & ~3) | mapping[code & 3] for code in codes]
+
+
+def invert_suit_map(mapping: Sequence[int]) -> SuitMap:
+    inverse = [0] * 4
+    for suit, new_suit in enumerate(mapping):
+        inverse[new_suit] = suit
+    return tuple(inverse)
+
+
+def canonicalize(*groups: Sequence[int]) -> Tuple[CanonicalGroups, SuitMap]:
+    """
+    :param groups: 若干组牌编码，例如 canonicalize(hole, board)
+    :return: (规范化后的各组牌, 原花色 -> 规范花色的映射)
+    """
+    mapping = suit_map(groups)
+    return tuple(tuple(sorted(apply_suit_map(group, mapping))) for group in groups), mapping
+
+
+def canonical_key(*groups: Sequence[int]) -> CanonicalGroups:
+    """只需要缓存键时使用，等价于 canonicalize(*groups)[0]"""
+    return canonicalize(*groups)[0]
+
+
+def decanonicalize(codes: Sequence[int], mapping: Sequence[int]) -> List[int]:
+    """把规范形式下的牌（例如缓存的最佳五张牌、建议的听牌）还原成原来的花色"""
+    return apply_suit_map(codes, invert_suit_map(mapping))
@@ -1,4 +1,62 @@
+from typing import Iterable, List, Tuple
+
+# 牌编码：0~51 的整数，code = ((rank - 2) << 2) + suit，即 int(Card) - 8，大小顺序与 Card 一致
+# 一手牌也可以用52位掩码表示，第 code 位为1表示包含这张牌，方便做集合运算（例如去掉死牌）
+NUM_CODES = 52
+FULL_DECK_MASK = (1 << NUM_CODES) - 1
+_CODE_OFFSET = 2 << 2
+
+
+def card_code(rank: int, suit: int) -> int:
+    return ((rank - 2) << 2) + suit
+
+
+def code_rank(code: int) -> int:
+    return (code >> 2) + 2
+
+
+def code_suit(code: int) -> int:
+    return code & 3
+
+
+def code_dto(code: int) -> Tuple[int, int]:
+    # 与 Card.dto() 相同的序列化格式
+    return (code >> 2) + 2, code & 3
+
+
+def codes_mask(codes: Iterable[int]) -> int:
+    mask = 0
+    for code in codes:
+        mask |= 1 << code
+    return mask
+
+
+def mask_codes(mask: int) -> List[int]:
+    # 掩码中的牌编码，从小到大
+    codes = []
+    while mask:
+        low = mask & -mask
+        codes.append(low.bit_length() - 1)
+        mask ^= low
+    return codes
+
+
+def encode_codes(codes: Iterable[int]) -> str:
+    # 牌编码序列的紧凑字符串形式，每张牌两位十六进制，例如 [0, 51] -> "0033"
+    return "".join("{:02x}".format(code) for code in codes)
+
+
+def decode_codes(text: str) -> List[int]:
+    return [int(text[i:i + 2], 16) for i in range(0, len(text), 2)]
+
+
 class Card:
+    """
+    不可变的扑克牌。52张牌在模块导入时创建，之后 Card(rank, suit) 和 Card.from_code 都返回同一批实例，
+    所有牌组和房间共用，不会在每手牌重复创建。
+    """
+    __slots__ = ("_value",)
+
     RANKS = {
         2: "2",
         3: "3",
@@ -21,12 +79,27 @@ class Card:
         0: u"\u2660",  # 黑桃
     }
 
-    def __init__(self, rank: int, suit: int):
+    def __new__(cls, rank: int, suit: int):
         if rank not in Card.RANKS:
             raise ValueError("Invalid card rank")
         if suit not in Card.SUITS:
             raise ValueError("Invalid card suit")
-        self._value: int = (rank << 2) + suit  # 数字左移两位，后两位用于保存花色
+        return _CARDS[card_code(rank, suit)]
+
+    @classmethod
+    def _create(cls, rank: int, suit: int):
+        card = object.__new__(cls)
+        object.__setattr__(card, "_value", (rank << 2) + suit)  # 数字左移两位，后两位用于保存花色
+        return card
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Card is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Card is immutable")
+
+    def __reduce__(self):
+        return Card, (self.rank, self.suit)
 
     @property
     def rank(self) -> int:
@@ -37,14 +110,29 @@ class Card:
         # 111000 & 000011 = 000000 = 0
         return self._value & 3  # 按位与操作取出后两位花色位
 
+    @property
+    def code(self) -> int:
+        return self._value - _CODE_OFFSET
+
+    @classmethod
+    def from_code(cls, code: int):
+        return _CARDS[code]
+
     def __lt__(self, other):
         return int(self) < int(other)
 
     def __eq__(self, other):
         return int(self) == int(other)
 
+    def __hash__(self):
+        # 与 __eq__ 一致：相等的牌（或与之相等的整数）哈希值相同
+        return hash(self._value)
+
     def __int__(self):
         return self._value
 
     def dto(self):
         return self.rank, self.suit
+
+
+_CARDS: List[Card] = [Card._create(code_rank(code), code_suit(code)) for code in range(NUM_CODES)]
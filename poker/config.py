@@ -2,3 +2,13 @@ INIT_MONEY = 3000
 TIMEOUT_TOLERANCE = 2
 BET_TIMEOUT = 90
 WAIT_AFTER_FLOP_TURN_RIVER = 1
+# 牌局节奏（见 poker/timing.py）：realtime / standard / turbo / tournament / bots-only
+TABLE_TIMING = "standard"
+# 机器人思考时间（秒），按难度配置 (最短, 最长)，计算决策的时间计入其中，等待期间不阻塞其他牌桌
+BOT_THINK_DELAY = {
+    "easy": (0.0, 0.0),
+    "medium": (0.5, 0.5),
+    "hard": (0.5, 0.5),
+}
+# 中高难度机器人的决策方式：local 为本地胜率+底池赔率，remote 为外部决策服务
+BOT_DECISION_MODE = "local"
@@ -16,7 +16,9 @@ from .game_round import (
     add_hand_player,
     update_hand_player_result,
     add_hand_action,
-    finish_hand
+    finish_hand,
+    update_hand_deck_order,
+    get_hand_replay_data
 )
 
 __all__ = [
@@ -41,5 +43,7 @@ __all__ = [
     'add_hand_player',
     'update_hand_player_result',
     'add_hand_action',
-    'finish_hand'
+    'finish_hand',
+    'update_hand_deck_order',
+    'get_hand_replay_data'
 ]
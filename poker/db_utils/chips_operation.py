@@ -10,7 +10,7 @@ import logging
 from .base import get_db_connection
 
 
-def update_player_wallet(player_id: int, money: float) -> bool:
+def update_player_wallet(player_id: int, money: int) -> bool:
     """
     更新玩家钱包中筹码，wallet表
     
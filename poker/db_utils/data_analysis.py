@@ -11,6 +11,7 @@ import json
 from datetime import date, datetime
 from collections import defaultdict
 from .base import get_db_connection
+from ..preflop import LABELS, parse_hole_cards
 
 
 def update_daily_stats(player_id: int, hands_played: int = 0, net_chips: int = 0):
@@ -309,47 +310,18 @@ def get_player_analysis_data(player_id: int):
         matrix_data = defaultdict(int)
 
         def normalize_hand(cards_str):
-            # cards_str expected like "AhKd" or "['Ah', 'Kd']" or "[[14, 0], [13, 1]]"
-            # Parse it
+            # cards_str 一般是 json: "[[14, 0], [13, 1]]"，旧数据可能是 "['Ah', 'Kd']" 或 "AhKd"
             try:
-                if cards_str.startswith('['):
+                cards = json.loads(cards_str) if cards_str.startswith('[') else cards_str
+            except ValueError:
+                try:
                     import ast
                     cards = ast.literal_eval(cards_str)
-                else:
-                    # simplistic parse if just concatenated "AhKd"
-                    cards = [cards_str[0:2], cards_str[2:4]]
-            except:
-                return None
-
-            if len(cards) != 2: return None
-
-            # Map for int ranks
-            int_to_rank = {
-                14: 'A', 13: 'K', 12: 'Q', 11: 'J', 10: 'T',
-                9: '9', 8: '8', 7: '7', 6: '6', 5: '5', 4: '4', 3: '3', 2: '2'
-            }
-
-            # Sort by rank to ensure AK (A high) not KA
-            ranks_order = "23456789TJQKA"
-            r1, s1 = cards[0][0], cards[0][1]
-            r2, s2 = cards[1][0], cards[1][1]
+                except (ValueError, SyntaxError):
+                    return None
 
-            # Normalize r1, r2 to string chars if they are ints
-            if isinstance(r1, int): r1 = int_to_rank.get(r1, str(r1))
-            if isinstance(r2, int): r2 = int_to_rank.get(r2, str(r2))
-
-            idx1 = ranks_order.index(r1) if r1 in ranks_order else -1
-            idx2 = ranks_order.index(r2) if r2 in ranks_order else -1
-
-            if idx1 < idx2:
-                r1, r2 = r2, r1
-                s1, s2 = s2, s1
-
-            suffix = 's' if s1 == s2 else 'o'
-            if r1 == r2:
-                return r1 + r2  # AA
-            else:
-                return r1 + r2 + suffix  # AKs or AKo
+            class_id = parse_hole_cards(cards)
+            return None if class_id is None else LABELS[class_id]
 
         for row in hand_rows:
             h_str = row["hole_cards"]
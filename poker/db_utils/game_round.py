@@ -160,3 +160,61 @@ def finish_hand(hand_id: int, board_cards: str, total_pot: int) -> bool:
         return False
     finally:
         conn.close()
+
+
+def update_hand_deck_order(hand_id: int, deck_order: str) -> bool:
+    """
+    Record the dealt card order of a hand (see card.encode_codes), used for replays.
+    """
+    conn = get_db_connection()
+    if not conn:
+        return False
+    try:
+        conn.execute("UPDATE hands SET deck_order = ? WHERE id = ?", (deck_order, hand_id))
+        conn.commit()
+        return True
+    except sqlite3.Error as e:
+        logging.error(f"Error saving deck order for hand {hand_id}: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+def get_hand_replay_data(hand_id: int) -> Optional[dict]:
+    """
+    Load everything needed to replay a hand: blinds, deck order, players (by seat) and actions (in order).
+    """
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        hand = conn.execute("""
+                            SELECT id, small_blind, big_blind, board_cards, total_pot, deck_order
+                            FROM hands
+                            WHERE id = ?
+                            """, (hand_id,)).fetchone()
+        if not hand:
+            return None
+        players = conn.execute("""
+                               SELECT hp.player_id, hp.seat_no, hp.starting_stack, hp.ending_stack, hp.position_name,
+                                      hp.hole_cards, hp.is_winner, p.nickname
+                               FROM hand_players hp
+                                        LEFT JOIN players p ON p.id = hp.player_id
+                               WHERE hp.hand_id = ?
+                               ORDER BY hp.seat_no
+                               """, (hand_id,)).fetchall()
+        actions = conn.execute("""
+                               SELECT player_id, street, action_num, action_type, amount, pot_before
+                               FROM hand_actions
+                               WHERE hand_id = ?
+                               ORDER BY action_num
+                               """, (hand_id,)).fetchall()
+        data = dict(hand)
+        data["players"] = [dict(row) for row in players]
+        data["actions"] = [dict(row) for row in actions]
+        return data
+    except sqlite3.Error as e:
+        logging.error(f"Error loading replay data for hand {hand_id}: {e}")
+        return None
+    finally:
+        conn.close()
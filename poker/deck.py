@@ -1,35 +1,120 @@
 import random
-from typing import List
+import secrets
+from typing import List, Optional
 
-from .card import Card
+from .card import Card, card_code, codes_mask, NUM_CODES
+
+# 生产环境默认使用操作系统的安全随机源
+_SYSTEM_RANDOM = secrets.SystemRandom()
 
 
 class DeckFactory:
-    def __init__(self, lowest_rank: int):
+    """
+    牌组工厂。牌组用完后通过 recycle 放回池中，下一手牌直接复用，不再重新生成52张牌。
+    rng 为空时使用 secrets 随机源；回放/测试时可以传入带种子的 random.Random。
+    """
+    def __init__(self, lowest_rank: int, rng: Optional[random.Random] = None, pool_size: int = 64):
         self._lowest_rank = lowest_rank  # 指定最小牌
+        self._rng = rng
+        self._pool_size = pool_size
+        self._pool: List[Deck] = []
 
     def create_deck(self):
-        return Deck(self._lowest_rank)
+        if self._pool:
+            deck = self._pool.pop()
+            deck.reset()
+            return deck
+        return Deck(self._lowest_rank, self._rng)
+
+    def recycle(self, deck):
+        """一手牌结束后归还牌组"""
+        if len(self._pool) < self._pool_size:
+            self._pool.append(deck)
 
 
 class Deck:
-    def __init__(self, lowest_rank: int):
-        # 生成所有牌
-        self._cards: List[Card] = [Card(rank, suit) for rank in range(lowest_rank, 15) for suit in range(0, 4)]
-        self._discard: List[Card] = []  # 存放弃牌
-        random.shuffle(self._cards)
+    """
+    牌组保存一个预先分配好的牌编码数组（见 card.card_code），发牌时做部分 Fisher–Yates 洗牌：
+    第 i 张牌从剩下的牌里随机选一张换到位置 i，所以只会洗实际发出去的牌，重置牌组也只需要把发牌位置归零。
+    """
+    def __init__(self, lowest_rank: int, rng: Optional[random.Random] = None):
+        self._codes: List[int] = list(range(card_code(lowest_rank, 0), NUM_CODES))
+        self._rng: random.Random = rng if rng is not None else _SYSTEM_RANDOM
+        self._top: int = 0  # 已发出的牌数
+        self._size: int = len(self._codes)  # 可发的牌数（去掉死牌后）
+
+    def reset(self):
+        """重新开始发牌，不需要恢复原来的顺序"""
+        self._top = 0
+        self._size = len(self._codes)
+
+    @property
+    def dealt(self) -> List[int]:
+        """已发出的牌编码，按发牌顺序"""
+        return self._codes[:self._top]
+
+    @property
+    def remaining(self) -> int:
+        return self._size - self._top
+
+    @property
+    def mask(self) -> int:
+        """牌堆中剩余牌的掩码"""
+        return codes_mask(self._codes[self._top:self._size])
+
+    def remove_dead(self, dead_mask: int):
+        """从牌堆中去掉掩码中的牌（例如已知的手牌和公共牌），死牌被换到数组末尾"""
+        i = self._top
+        while i < self._size:
+            if dead_mask >> self._codes[i] & 1:
+                self._size -= 1
+                self._codes[i], self._codes[self._size] = self._codes[self._size], self._codes[i]
+            else:
+                i += 1
+
+    def draw(self) -> int:
+        """发一张牌，返回牌编码"""
+        top = self._top
+        if top >= self._size:
+            raise ValueError("Not enough cards in the deck")
+        codes = self._codes
+        swap = self._rng.randrange(top, self._size)
+        code = codes[swap]
+        codes[swap] = codes[top]
+        codes[top] = code
+        self._top = top + 1
+        return code
+
+    def pop_codes(self, num_cards=1) -> List[int]:
+        """Returns and removes card codes from the top of the deck."""
+        if num_cards > self._size - self._top:
+            raise ValueError("Not enough cards in the deck")
+        return [self.draw() for _ in range(num_cards)]
 
     def pop_cards(self, num_cards=1) -> List[Card]:
         """Returns and removes cards them from the top of the deck."""
-        new_cards = []
-        # 如果牌堆中的牌数量不足，使用弃牌堆补充牌堆。
-        if len(self._cards) < num_cards:
-            new_cards = self._cards
-            self._cards = self._discard
-            self._discard = []
-            random.shuffle(self._cards)
-        return new_cards + [self._cards.pop() for _ in range(num_cards - len(new_cards))]
-
-    def push_cards(self, discard: List[Card]):
-        """Adds discard"""
-        self._discard += discard
+        return [Card.from_code(code) for code in self.pop_codes(num_cards)]
+
+
+class PresetDeck(Deck):
+    """
+    按给定顺序发牌的牌组（用于回放），预设的牌发完后继续随机发剩下的牌。
+    """
+    def __init__(self, order: List[int], lowest_rank: int = 2, rng: Optional[random.Random] = None):
+        super().__init__(lowest_rank, rng)
+        self._order: List[int] = list(order)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        # 把预设的牌按顺序换到数组最前面
+        for index, code in enumerate(self._order):
+            position = self._codes.index(code)
+            self._codes[index], self._codes[position] = self._codes[position], self._codes[index]
+
+    def draw(self) -> int:
+        top = self._top
+        if top < len(self._order):
+            self._top = top + 1
+            return self._codes[top]
+        return super().draw()
@@ -0,0 +1,394 @@
+"""
+胜率（equity）计算。
+
+给定自己的两张手牌、已知公共牌和若干对手（每个对手可以指定起手牌范围，见 preflop 的类编号），
+统计赢/平的比例：
+- estimate_equity: 蒙特卡洛模拟随机发出对手手牌和剩余公共牌。每模拟一批检查一次标准误，达到 target_stderr
+  就提前停止；传入 executor（例如 ProcessPoolExecutor）时每轮把多批模拟分发到进程池并行执行。
+- exact_equity: 枚举所有剩余公共牌和对手手牌（转牌、河牌时组合数很少），结果按花色同构后的牌做 LRU 缓存。
+- equity: 组合数不超过 EXACT_LIMIT 时精确计算，否则蒙特卡洛。
+
+牌都用牌编码表示（见 card.card_code），牌力比较使用 HoldemPokerScoreDetector.get_scores_batch。
+"""
+import functools
+import math
+import os
+import random
+from itertools import combinations
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from .canonical import canonical_key
+from .card import NUM_CODES, codes_mask
+from .preflop import class_codes
+from .score_detector import HoldemPokerScoreDetector, ScoreDetector
+
+BOARD_SIZE = 5
+EXACT_LIMIT = 50000  # 需要比较的组合数不超过该值时精确枚举
+EXACT_CACHE_SIZE = 4096
+
+_DETECTOR = HoldemPokerScoreDetector()
+
+
+@dataclass
+class EquityResult:
+    win: float  # 独赢的比例
+    tie: float  # 平分底池的比例
+    equity: float  # 平均分到的底池份额（平局按人数平分）
+    samples: int
+    stderr: float  # equity 的标准误
+
+
+class _Tally:
+    """模拟结果的累加：样本数、独赢次数、平局次数、份额和、份额平方和"""
+    __slots__ = ("samples", "wins", "ties", "share", "share_sq")
+
+    def __init__(self, samples=0, wins=0, ties=0, share=0.0, share_sq=0.0):
+        self.samples = samples
+        self.wins = wins
+        self.ties = ties
+        self.share = share
+        self.share_sq = share_sq
+
+    def add(self, other: "_Tally"):
+        self.samples += other.samples
+        self.wins += other.wins
+        self.ties += other.ties
+        self.share += other.share
+        self.share_sq += other.share_sq
+
+    def stderr(self) -> float:
+        if self.samples < 2:
+            return 1.0
+        mean = self.share / self.samples
+        variance = max(self.share_sq / self.samples - mean * mean, 0.0)
+        return math.sqrt(variance / (self.samples - 1))
+
+    def result(self) -> EquityResult:
+        samples = max(self.samples, 1)
+        return EquityResult(
+            win=self.wins / samples,
+            tie=self.ties / samples,
+            equity=self.share / samples,
+            samples=self.samples,
+            stderr=self.stderr()
+        )
+
+
+def range_combos(class_ids: Iterable[int], dead_mask: int = 0) -> List[Tuple[int, int]]:
+    """起手牌范围（类编号集合）展开为具体手牌，去掉和死牌冲突的组合"""
+    combos = []
+    for class_id in class_ids:
+        for code1, code2 in class_codes(class_id):
+            if not (dead_mask >> code1 & 1 or dead_mask >> code2 & 1):
+                combos.append((code1, code2))
+    return combos
+
+
+def _simulate(hole: Sequence[int], board: Sequence[int], num_random: int,
+              range_combos_list: Sequence[Sequence[Tuple[int, int]]], samples: int, seed,
+              score_detector: Optional[ScoreDetector] = None) -> _Tally:
+    """
+    模拟一批牌局。num_random 为随机手牌的对手数，range_combos_list 为其余每个对手的可选手牌。
+    seed 可以是整数或 random.Random（进程池中执行时传整数）。
+    """
+    rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+    detector = score_detector or _DETECTOR
+    hole = list(hole)
+    board = list(board)
+    dead_mask = codes_mask(hole) | codes_mask(board)
+    live = [code for code in range(NUM_CODES) if not dead_mask >> code & 1]
+
+    missing = BOARD_SIZE - len(board)
+    # 范围对手最多占用两张牌，多抽这么多张保证过滤后仍然够用
+    draw_count = missing + 2 * num_random + 2 * len(range_combos_list)
+    if draw_count > len(live):
+        raise ValueError("Not enough cards in the deck")
+
+    tally = _Tally()
+    num_live = len(live)
+    random_float = rng.random
+    for _ in range(samples):
+        used = dead_mask
+        hands = [hole]
+
+        # 有范围的对手：在范围内均匀选一手不冲突的牌
+        for combos in range_combos_list:
+            for _attempt in range(100):
+                code1, code2 = combos[int(random_float() * len(combos))]
+                if not (used >> code1 & 1 or used >> code2 & 1):
+                    break
+            else:
+                raise ValueError("Opponent ranges cannot be dealt together")
+            used |= (1 << code1) | (1 << code2)
+            hands.append([code1, code2])
+
+        # 部分 Fisher–Yates：只把需要的 draw_count 张牌洗到前面
+        for i in range(draw_count):
+            j = i + int(random_float() * (num_live - i))
+            live[i], live[j] = live[j], live[i]
+        if range_combos_list:
+            cards = [code for code in live[0:draw_count] if not used >> code & 1]
+        else:
+            cards = live[0:draw_count]
+        for i in range(num_random):
+            hands.append(cards[2 * i:2 * i + 2])
+        runout = board + cards[2 * num_random:2 * num_random + missing]
+
+        strengths = detector.get_scores_batch(runout, hands)
+        mine = strengths[0]
+        best = max(strengths)
+        if mine == best:
+            winners = strengths.count(best)
+            if winners == 1:
+                tally.wins += 1
+                share = 1.0
+            else:
+                tally.ties += 1
+                share = 1.0 / winners
+            tally.share += share
+            tally.share_sq += share * share
+        tally.samples += 1
+    return tally
+
+
+def _simulate_batch(args) -> _Tally:
+    # 进程池入口，参数打包成一个元组方便 pickle
+    return _simulate(*args)
+
+
+def estimate_equity(hole: Sequence[int], board: Sequence[int] = (), opponents: int = 1,
+                    ranges: Optional[Sequence[Optional[Iterable[int]]]] = None,
+                    target_stderr: float = 0.005, max_samples: int = 20000, batch_size: int = 1000,
+                    rng: Optional[random.Random] = None, executor: Optional[Executor] = None,
+                    parallel_batches: Optional[int] = None,
+                    score_detector: Optional[ScoreDetector] = None) -> EquityResult:
+    """
+    蒙特卡洛估计胜率。
+    :param hole: 自己的两张手牌编码
+    :param board: 已知公共牌编码（0~5张）
+    :param opponents: 对手人数
+    :param ranges: 每个对手的起手牌范围（preflop 类编号集合），None 或缺省的对手为随机手牌
+    :param target_stderr: 标准误达到该值后停止
+    :param max_samples: 最多模拟次数
+    :param batch_size: 每批模拟次数，每批结束检查一次标准误
+    :param rng: 随机数生成器，默认新建
+    :param executor: 进程池，传入时每轮并行执行多批
+    :param parallel_batches: 使用进程池时每轮的批数，默认 CPU 核数
+    """
+    if len(hole) != 2:
+        raise ValueError("Hole cards must be two cards")
+    if len(board) > BOARD_SIZE:
+        raise ValueError("Too many board cards")
+    if opponents < 1:
+        raise ValueError("At least one opponent is required")
+    if len(set(hole) | set(board)) != len(hole) + len(board):
+        raise ValueError("Duplicate cards")
+
+    rng = rng or random.Random()
+    ranges = list(ranges or [])[0:opponents]
+    dead_mask = codes_mask(hole) | codes_mask(board)
+    range_combos_list = []
+    for class_ids in ranges:
+        if class_ids is None:
+            continue
+        combos = range_combos(class_ids, dead_mask)
+        if not combos:
+            raise ValueError("Opponent range is empty")
+        range_combos_list.append(combos)
+    num_random = opponents - len(range_combos_list)
+
+    # 不需要发牌时结果是确定的
+    if BOARD_SIZE - len(board) == 0 and num_random == 0 and all(len(combos) == 1 for combos in range_combos_list):
+        max_samples = 1
+
+    workers = parallel_batches or os.cpu_count() or 1
+    tally = _Tally()
+    while tally.samples < max_samples:
+        if executor is not None and workers > 1:
+            remaining = max_samples - tally.samples
+            sizes = [min(batch_size, remaining - i * batch_size) for i in range(workers)]
+            jobs = [
+                (hole, board, num_random, range_combos_list, size, rng.getrandbits(64), score_detector)
+                for size in sizes if size > 0
+            ]
+            for result in executor.map(_simulate_batch, jobs):
+                tally.add(result)
+        else:
+            size = min(batch_size, max_samples - tally.samples)
+            tally.add(_simulate(hole, board, num_random, range_combos_list, size, rng, score_detector))
+        if tally.stderr() <= target_stderr:
+            break
+    return tally.result()
+
+
+def _ranges_key(opponents: int, ranges) -> Tuple[Optional[FrozenSet[int]], ...]:
+    # 类编号与花色无关，花色置换后范围不变；对手顺序不影响自己的胜率
+    ranges = [frozenset(class_ids) if class_ids is not None else None for class_ids in list(ranges or [])[0:opponents]]
+    ranges += [None] * (opponents - len(ranges))
+    return tuple(sorted(ranges, key=lambda class_ids: (class_ids is not None, sorted(class_ids or ()))))
+
+
+def _opponent_candidates(class_ids: Optional[FrozenSet[int]], live: List[int], dead_mask: int) -> List[Tuple[int, int]]:
+    if class_ids is None:
+        return list(combinations(live, 2))
+    return range_combos(class_ids, dead_mask)
+
+
+def _exact_size(hole: Sequence[int], board: Sequence[int], ranges_key) -> int:
+    """精确枚举需要比较的组合数（上限估计）"""
+    dead_mask = codes_mask(hole) | codes_mask(board)
+    num_live = NUM_CODES - len(hole) - len(board)
+    missing = BOARD_SIZE - len(board)
+    size = math.comb(num_live, missing)
+    num_live -= missing
+    for class_ids in ranges_key:
+        if class_ids is None:
+            size *= math.comb(num_live, 2)
+        else:
+            size *= len(range_combos(class_ids, dead_mask))
+    return size
+
+
+@functools.lru_cache(maxsize=EXACT_CACHE_SIZE)
+def _exact_equity_cached(hole: Tuple[int, ...], board: Tuple[int, ...], ranges_key) -> EquityResult:
+    detector = _DETECTOR
+    board = list(board)
+    dead_mask = codes_mask(hole) | codes_mask(board)
+    live = [code for code in range(NUM_CODES) if not dead_mask >> code & 1]
+
+    tally = _Tally()
+    for runout in combinations(live, BOARD_SIZE - len(board)):
+        full_board = board + list(runout)
+        runout_mask = dead_mask | codes_mask(runout)
+        rest = [code for code in live if not runout_mask >> code & 1]
+        candidates = [_opponent_candidates(class_ids, rest, runout_mask) for class_ids in ranges_key]
+
+        # 每个可能的对手手牌只计算一次牌力
+        unique = list({combo for combos in candidates for combo in combos})
+        strengths = dict(zip(unique, detector.get_scores_batch(full_board, unique)))
+        mine = detector.get_scores_batch(full_board, [hole])[0]
+
+        def assign(index: int, used: int, ties: int):
+            # 依次给每个对手分配不冲突的手牌，ties 为和自己牌力相同的对手数
+            if index == len(candidates):
+                share = 1.0 / (ties + 1)
+                if ties:
+                    tally.ties += 1
+                else:
+                    tally.wins += 1
+                tally.share += share
+                tally.share_sq += share * share
+                tally.samples += 1
+                return
+            for combo in candidates[index]:
+                code1, code2 = combo
+                if used >> code1 & 1 or used >> code2 & 1:
+                    continue
+                strength = strengths[combo]
+                if strength > mine:
+                    tally.samples += _count_assignments(candidates, index + 1, used | (1 << code1) | (1 << code2))
+                    continue
+                assign(index + 1, used | (1 << code1) | (1 << code2), ties + (strength == mine))
+
+        assign(0, runout_mask, 0)
+
+    result = tally.result()
+    result.stderr = 0.0
+    return result
+
+
+def _count_assignments(candidates, index: int, used: int) -> int:
+    # 剩余对手不冲突的手牌分配数（输掉的分支只需要计数）
+    if index == len(candidates):
+        return 1
+    count = 0
+    for code1, code2 in candidates[index]:
+        if not (used >> code1 & 1 or used >> code2 & 1):
+            count += _count_assignments(candidates, index + 1, used | (1 << code1) | (1 << code2))
+    return count
+
+
+def exact_equity(hole: Sequence[int], board: Sequence[int] = (), opponents: int = 1,
+                 ranges: Optional[Sequence[Optional[Iterable[int]]]] = None) -> EquityResult:
+    """
+    枚举所有剩余公共牌和对手手牌计算精确胜率，参数同 estimate_equity。
+    结果按花色同构后的手牌和公共牌缓存，samples 为枚举的局面数，stderr 为0。
+    """
+    if len(hole) != 2:
+        raise ValueError("Hole cards must be two cards")
+    if len(board) > BOARD_SIZE:
+        raise ValueError("Too many board cards")
+    if opponents < 1:
+        raise ValueError("At least one opponent is required")
+    if len(set(hole) | set(board)) != len(hole) + len(board):
+        raise ValueError("Duplicate cards")
+    hole_key, board_key = canonical_key(hole, board)
+    result = _exact_equity_cached(hole_key, board_key, _ranges_key(opponents, ranges))
+    if not result.samples:
+        raise ValueError("Opponent ranges cannot be dealt together")
+    return EquityResult(result.win, result.tie, result.equity, result.samples, result.stderr)
+
+
+def equity(hole: Sequence[int], board: Sequence[int] = (), opponents: int = 1,
+           ranges: Optional[Sequence[Optional[Iterable[int]]]] = None, exact_limit: int = EXACT_LIMIT,
+           **kwargs) -> EquityResult:
+    """
+    组合数不超过 exact_limit 时精确计算（一般是转牌、河牌），否则蒙特卡洛估计，kwargs 传给 estimate_equity。
+    """
+    if _exact_size(hole, board, _ranges_key(opponents, ranges)) <= exact_limit:
+        return exact_equity(hole, board, opponents, ranges)
+    return estimate_equity(hole, board, opponents, ranges, **kwargs)
+
+
+@functools.lru_cache(maxsize=EXACT_CACHE_SIZE)
+def _showdown_exact_cached(groups: Tuple[Tuple[int, ...], ...]) -> Tuple[float, ...]:
+    hands, board = [list(hand) for hand in groups[:-1]], list(groups[-1])
+    return tuple(_showdown_shares(hands, board, None, 0))
+
+
+def _showdown_shares(hands: List[List[int]], board: List[int], rng: Optional[random.Random], samples: int) -> List[float]:
+    # rng 为空时枚举所有剩余公共牌，否则随机模拟 samples 次
+    dead_mask = codes_mask(board)
+    for hand in hands:
+        dead_mask |= codes_mask(hand)
+    live = [code for code in range(NUM_CODES) if not dead_mask >> code & 1]
+    missing = BOARD_SIZE - len(board)
+    if rng is None:
+        runouts = combinations(live, missing)
+    else:
+        runouts = (rng.sample(live, missing) for _ in range(samples))
+
+    shares = [0.0] * len(hands)
+    total = 0
+    for runout in runouts:
+        strengths = _DETECTOR.get_scores_batch(board + list(runout), hands)
+        best = max(strengths)
+        winners = strengths.count(best)
+        for index, strength in enumerate(strengths):
+            if strength == best:
+                shares[index] += 1.0 / winners
+        total += 1
+    return [share / total for share in shares]
+
+
+def showdown_is_exact(hands: Sequence[Sequence[int]], board: Sequence[int] = (), exact_limit: int = EXACT_LIMIT) -> bool:
+    """showdown_equities 是否精确计算（剩余公共牌组合数 x 玩家数不超过 exact_limit）"""
+    num_live = NUM_CODES - len(board) - sum(len(hand) for hand in hands)
+    return math.comb(num_live, BOARD_SIZE - len(board)) * len(hands) <= exact_limit
+
+
+def showdown_equities(hands: Sequence[Sequence[int]], board: Sequence[int] = (), exact_limit: int = EXACT_LIMIT,
+                      samples: int = 5000, rng: Optional[random.Random] = None) -> List[float]:
+    """
+    所有玩家手牌已知时（全下摊牌）每名玩家的胜率，剩余公共牌组合数不超过 exact_limit 时精确计算。
+    :param hands: 每名玩家的手牌编码
+    :param board: 已发出的公共牌编码
+    :return: 与 hands 顺序对应的胜率（平局按人数平分）
+    """
+    hands = [list(hand) for hand in hands]
+    board = list(board)
+    if showdown_is_exact(hands, board, exact_limit):
+        return list(_showdown_exact_cached(canonical_key(*hands, board)))
+    return _showdown_shares(hands, board, rng or random.Random(), samples)
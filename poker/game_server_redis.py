@@ -66,7 +66,7 @@ class GameServerRedis(GameServer):
 
         # player money
         try:
-            player_money = float(message["player"]["money"])
+            player_money = int(float(message["player"]["money"]))
         except KeyError:
             raise MessageFormatError(attribute="player.money", desc="Missing attribute")
         except ValueError:
@@ -0,0 +1,219 @@
+"""
+查表法牌力计算。
+
+牌用 0~51 的编码表示（见 card.card_code），牌力与 HoldemPokerScore.strength 的编码完全一致：
+category << 20 | 五张成牌的点数（每张4位，从高位到低位）。
+
+两张表在导入时生成：
+- _FLUSH_TABLE: 以13位点数掩码为下标，给出同花/同花顺的牌力（不足5张为0）
+- _RANK_TABLE: 以点数计数的5进制编码为键（每个点数最多4张，不会进位），给出非同花牌型的牌力
+7张以内的牌不可能同时组成同花和葫芦/四条，所以只要某个花色有5张以上就直接查同花表。
+"""
+from typing import Dict, Iterable, List
+
+LOWEST_RANK = 2
+HIGHEST_RANK = 14
+
+NO_PAIR = 0
+PAIR = 1
+TWO_PAIR = 2
+TRIPS = 3
+STRAIGHT = 4
+FLUSH = 5
+FULL_HOUSE = 6
+QUADS = 7
+STRAIGHT_FLUSH = 8
+
+CATEGORY_SHIFT = 20
+MAX_CARDS = 7
+
+# 以牌编码为下标的查找表
+_RANK_BIT: List[int] = [1 << (code >> 2) for code in range(52)]
+_RANK_KEY: List[int] = [5 ** (code >> 2) for code in range(52)]
+
+
+def _pack(category: int, ranks: List[int]) -> int:
+    # 与 HoldemPokerScore.strength 相同的编码方式，不足5张的位置补0
+    strength = category
+    for offset in range(5):
+        strength <<= 4
+        if offset < len(ranks):
+            strength += ranks[offset]
+    return strength
+
+
+def _straight_high(mask: int) -> int:
+    # 返回掩码中最大顺子的最高点数，A可以作为最小牌组成 5-4-3-2-A
+    for high in range(HIGHEST_RANK, LOWEST_RANK + 3, -1):
+        run = 0b11111 << (high - 4 - LOWEST_RANK)
+        if mask & run == run:
+            return high
+    wheel = 0b1111 | (1 << (HIGHEST_RANK - LOWEST_RANK))
+    if mask & wheel == wheel:
+        return LOWEST_RANK + 3
+    return 0
+
+
+def _straight_ranks(high: int) -> List[int]:
+    if high == LOWEST_RANK + 3:
+        return [5, 4, 3, 2, HIGHEST_RANK]
+    return list(range(high, high - 5, -1))
+
+
+def _mask_ranks(mask: int) -> List[int]:
+    # 掩码中的点数，从大到小
+    return [rank for rank in range(HIGHEST_RANK, LOWEST_RANK - 1, -1) if mask & (1 << (rank - LOWEST_RANK))]
+
+
+def _build_flush_table() -> List[int]:
+    table = [0] * (1 << 13)
+    for mask in range(1 << 13):
+        if bin(mask).count("1") < 5:
+            continue
+        high = _straight_high(mask)
+        if high:
+            table[mask] = _pack(STRAIGHT_FLUSH, _straight_ranks(high))
+        else:
+            table[mask] = _pack(FLUSH, _mask_ranks(mask)[0:5])
+    return table
+
+
+def _rank_strength(counts: List[int]) -> int:
+    """根据每个点数的张数计算非同花牌型的牌力，counts 以点数为下标"""
+    ranks, quads, trips, pairs = [], [], [], []
+    mask = 0
+    for rank in range(HIGHEST_RANK, LOWEST_RANK - 1, -1):
+        count = counts[rank]
+        if count:
+            ranks.append(rank)
+            mask |= 1 << (rank - LOWEST_RANK)
+            if count == 4:
+                quads.append(rank)
+            elif count == 3:
+                trips.append(rank)
+            elif count == 2:
+                pairs.append(rank)
+
+    def kickers(used: List[int], num: int) -> List[int]:
+        return [rank for rank in ranks if rank not in used][0:num]
+
+    if quads:
+        return _pack(QUADS, [quads[0]] * 4 + kickers(quads[0:1], 1))
+    if len(trips) >= 2:
+        return _pack(FULL_HOUSE, [trips[0]] * 3 + [trips[1]] * 2)
+    if trips and pairs:
+        return _pack(FULL_HOUSE, [trips[0]] * 3 + [pairs[0]] * 2)
+    if len(ranks) >= 5:
+        high = _straight_high(mask)
+        if high:
+            return _pack(STRAIGHT, _straight_ranks(high))
+    if trips:
+        return _pack(TRIPS, [trips[0]] * 3 + kickers(trips, 2))
+    if len(pairs) >= 2:
+        return _pack(TWO_PAIR, [pairs[0]] * 2 + [pairs[1]] * 2 + kickers(pairs[0:2], 1))
+    if pairs:
+        return _pack(PAIR, [pairs[0]] * 2 + kickers(pairs, 3))
+    return _pack(NO_PAIR, ranks[0:5])
+
+
+def _build_rank_table() -> Dict[int, int]:
+    table = {}
+    counts = [0] * (HIGHEST_RANK + 1)
+
+    def fill(rank: int, key: int, num_cards: int):
+        if rank > HIGHEST_RANK:
+            if num_cards:
+                table[key] = _rank_strength(counts)
+            return
+        for count in range(min(4, MAX_CARDS - num_cards) + 1):
+            counts[rank] = count
+            fill(rank + 1, key + count * 5 ** (rank - LOWEST_RANK), num_cards + count)
+        counts[rank] = 0
+
+    fill(LOWEST_RANK, 0, 0)
+    return table
+
+
+_FLUSH_TABLE: List[int] = _build_flush_table()
+_RANK_TABLE: Dict[int, int] = _build_rank_table()
+
+
+def evaluate(codes: Iterable[int]) -> int:
+    """
+    计算 1~7 张牌的最佳牌力。
+    :param codes: 牌编码列表
+    :return: 与 HoldemPokerScore.strength 相同编码的整数
+    """
+    key = 0
+    spades = clubs = diamonds = hearts = 0
+    for code in codes:
+        key += _RANK_KEY[code]
+        suit = code & 3
+        if suit == 0:
+            spades |= _RANK_BIT[code]
+        elif suit == 1:
+            clubs |= _RANK_BIT[code]
+        elif suit == 2:
+            diamonds |= _RANK_BIT[code]
+        else:
+            hearts |= _RANK_BIT[code]
+    strength = _FLUSH_TABLE[spades] or _FLUSH_TABLE[clubs] or _FLUSH_TABLE[diamonds] or _FLUSH_TABLE[hearts]
+    if strength:
+        return strength
+    return _RANK_TABLE[key]
+
+
+def evaluate_batch(board: Iterable[int], hands: Iterable[Iterable[int]]) -> List[int]:
+    """
+    同一组公共牌下批量计算多手牌的牌力，公共牌的点数计数和花色掩码只计算一次。
+    :param board: 公共牌编码
+    :param hands: 每名玩家的手牌编码
+    :return: 与 hands 顺序对应的牌力列表
+    """
+    board_key = 0
+    board_masks = [0, 0, 0, 0]
+    for code in board:
+        board_key += _RANK_KEY[code]
+        board_masks[code & 3] |= _RANK_BIT[code]
+    strengths = []
+    for hand in hands:
+        key = board_key
+        masks = list(board_masks)
+        for code in hand:
+            key += _RANK_KEY[code]
+            masks[code & 3] |= _RANK_BIT[code]
+        strength = _FLUSH_TABLE[masks[0]] or _FLUSH_TABLE[masks[1]] or _FLUSH_TABLE[masks[2]] or _FLUSH_TABLE[masks[3]]
+        strengths.append(strength or _RANK_TABLE[key])
+    return strengths
+
+
+class HandAccumulator:
+    """
+    可以逐步加牌的牌力计算状态：保存点数计数编码和四个花色的点数掩码，
+    每发一条街只需要把新牌加进来，不用重新处理之前的牌。
+    """
+    __slots__ = ("codes", "_rank_key", "_suit_masks")
+
+    def __init__(self, codes: Iterable[int] = ()):
+        self.codes: List[int] = []
+        self._rank_key: int = 0
+        self._suit_masks: List[int] = [0, 0, 0, 0]
+        self.add(codes)
+
+    def add(self, codes: Iterable[int]):
+        for code in codes:
+            self.codes.append(code)
+            self._rank_key += _RANK_KEY[code]
+            self._suit_masks[code & 3] |= _RANK_BIT[code]
+
+    def strength(self) -> int:
+        masks = self._suit_masks
+        strength = _FLUSH_TABLE[masks[0]] or _FLUSH_TABLE[masks[1]] or _FLUSH_TABLE[masks[2]] or _FLUSH_TABLE[masks[3]]
+        if strength:
+            return strength
+        return _RANK_TABLE[self._rank_key]
+
+
+def category(strength: int) -> int:
+    """从牌力中取出牌型"""
+    return strength >> CATEGORY_SHIFT
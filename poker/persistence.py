@@ -0,0 +1,71 @@
+"""
+牌局数据的持久化出口。
+
+HoldemPokerGame 不直接调用 db_utils，而是通过注入的 sink 写牌局、行动、结果和统计数据：
+线上使用 DatabaseSink（sqlite，见 db_utils），无界面模拟使用 NullSink，不做任何 IO。
+"""
+from typing import Any, List, Optional
+
+from . import db_utils
+
+
+class DatabaseSink:
+    get_or_create_table = staticmethod(db_utils.get_or_create_table)
+    create_hand = staticmethod(db_utils.create_hand)
+    add_hand_player = staticmethod(db_utils.add_hand_player)
+    update_hand_player_result = staticmethod(db_utils.update_hand_player_result)
+    add_hand_action = staticmethod(db_utils.add_hand_action)
+    finish_hand = staticmethod(db_utils.finish_hand)
+    update_hand_deck_order = staticmethod(db_utils.update_hand_deck_order)
+    update_daily_stats = staticmethod(db_utils.update_daily_stats)
+    update_lifetime_stats = staticmethod(db_utils.update_lifetime_stats)
+    update_player_wallet = staticmethod(db_utils.update_player_wallet)
+    auto_topup_chips = staticmethod(db_utils.auto_topup_chips)
+    get_daily_ranking_list = staticmethod(db_utils.get_daily_ranking_list)
+
+
+class NullSink(DatabaseSink):
+    """
+    什么都不保存。没有桌子记录，牌局中按牌局 ID 写入的数据都会跳过；
+    自动补充筹码直接成功（只加到内存中的玩家）。
+    """
+
+    def get_or_create_table(self, room_id: str) -> Optional[int]:
+        return None
+
+    def create_hand(self, *args, **kwargs) -> Optional[int]:
+        return None
+
+    def add_hand_player(self, *args, **kwargs) -> bool:
+        return True
+
+    def update_hand_player_result(self, *args, **kwargs) -> bool:
+        return True
+
+    def add_hand_action(self, *args, **kwargs) -> bool:
+        return True
+
+    def finish_hand(self, *args, **kwargs) -> bool:
+        return True
+
+    def update_hand_deck_order(self, *args, **kwargs) -> bool:
+        return True
+
+    def update_daily_stats(self, *args, **kwargs) -> bool:
+        return True
+
+    def update_lifetime_stats(self, *args, **kwargs) -> bool:
+        return True
+
+    def update_player_wallet(self, *args, **kwargs) -> bool:
+        return True
+
+    def auto_topup_chips(self, *args, **kwargs) -> bool:
+        return True
+
+    def get_daily_ranking_list(self, *args, **kwargs) -> List[Any]:
+        return []
+
+
+DATABASE_SINK = DatabaseSink()
+NULL_SINK = NullSink()
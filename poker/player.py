@@ -5,7 +5,7 @@ class Player:
     def __init__(self, id, name, money, avatar=None, ready=False, is_bot: bool = False, bot_difficulty: str = None):
         self._id = id
         self._name = name
-        self._money = money
+        self._money = int(money)  # 筹码为整数（最小单位）
         self._avatar = avatar
         self.seat = None
         self._ready = ready
@@ -21,7 +21,7 @@ class Player:
         return self._name
 
     @property
-    def money(self) -> float:
+    def money(self) -> int:
         return self._money
 
     @property
@@ -43,15 +43,15 @@ class Player:
             "bot_difficulty": self.bot_difficulty,
         }
 
-    def take_money(self, money: float):
+    def take_money(self, money: int):
         if money > self._money:
             raise ValueError("Player does not have enough money")
-        if money < 0.0:
+        if money < 0:
             raise ValueError("Money has to be a positive amount")
         self._money -= money
 
-    def add_money(self, money: float):
-        if money <= 0.0:
+    def add_money(self, money: int):
+        if money <= 0:
             raise ValueError("Money has to be a positive amount")
         self._money += money
 
@@ -70,7 +70,7 @@ class Player:
             if player_data:
                 # 'chips' in wallet table maps to money
                 if player_data.get('chips') is not None:
-                    self._money = float(player_data['chips'])
+                    self._money = int(player_data['chips'])
                 
                 # 'avatar' in players table
                 if player_data.get('avatar') is not None:
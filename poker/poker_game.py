@@ -1,15 +1,19 @@
+import bisect
+import heapq
 import time
-from typing import List, Dict, Set, Generator, Optional
+from typing import List, Dict, Set, Generator, Optional, Tuple
 
 import gevent
 
-from .card import Card
+from .card import Card, code_dto
 from .channel import ChannelError, MessageTimeout, MessageFormatError
 from .deck import DeckFactory, Deck
 from .player import Player
 from .player_server import PlayerServer
+from .hand_evaluator import HandAccumulator
 from .score_detector import Score, ScoreDetector
-from .config import BET_TIMEOUT, TIMEOUT_TOLERANCE
+from .timing import TimingPolicy, BET_ROUND, CARDS, SHOWDOWN, WINNER, get_timing_policy
+from .config import BET_TIMEOUT, TIMEOUT_TOLERANCE, TABLE_TIMING
 
 
 class GameError(Exception):
@@ -36,21 +40,46 @@ class GameSubscriber:
 
 
 class GamePlayers:
+    """
+    未弃牌的玩家按座位顺序串成环（_next / _prev），弃牌时 O(1) 摘除，get_next 直接取下一个。
+    摘除的玩家保留原来的指针，沿指针可以找到它后面第一个未弃牌的玩家；reset 时重新串环。
+    """
+
     def __init__(self, players: List[Player]):
         # Dictionary of players keyed by their ids
         self._players: Dict[int, Player] = {player.id: player for player in players}  # 玩家id-Player字典
         # List of player ids sorted according to the original players list
         self._player_ids: List[int] = [player.id for player in players]  # 玩家id列表
+        self._seat_index: Dict[int, int] = {player_id: i for i, player_id in enumerate(self._player_ids)}
         # List of folder ids
         self._folder_ids: Set[int] = set()  # 弃牌玩家
         # Dead players
         self._dead_player_ids: Set[int] = set()  # 出局玩家
+        self._next: Dict[int, int] = {}
+        self._prev: Dict[int, int] = {}
+        self._link_active()
+
+    def _link_active(self):
+        # 按座位顺序把未弃牌的玩家串成环，已弃牌的玩家指向它后面第一个未弃牌的玩家
+        next_id = None
+        for player_id in reversed(self._player_ids * 2):
+            self._next[player_id] = next_id
+            if player_id not in self._folder_ids:
+                if next_id is not None:
+                    self._prev[next_id] = player_id
+                next_id = player_id
 
     def fold(self, player_id: int):
         # 弃牌玩家加入弃牌集合
-        if player_id not in self._player_ids:
+        if player_id not in self._players:
             raise ValueError("Unknown player id")
+        if player_id in self._folder_ids:
+            return
         self._folder_ids.add(player_id)
+        # 从环中摘除，自己的指针不变
+        prev_id, next_id = self._prev[player_id], self._next[player_id]
+        self._next[prev_id] = next_id
+        self._prev[next_id] = prev_id
 
     def remove(self, player_id: int):
         # 移除玩家，同事标记为弃牌和已出局
@@ -60,18 +89,39 @@ class GamePlayers:
     def reset(self):
         # 在游戏的某些环节（如新的一轮开始之前），需要清除上一轮中未出局玩家的弃牌状态，但保留已出局玩家的状态。
         self._folder_ids = set(self._dead_player_ids)
+        self._link_active()
+
+    def _first_active_after(self, player_id: int) -> int:
+        """座位在 player_id 之后的第一个未弃牌玩家（player_id 未弃牌且只剩它时返回它自己）"""
+        next_id = self._next[player_id]
+        while next_id in self._folder_ids:
+            next_id = self._next[next_id]
+        return next_id
 
     def round(self, dealer_id: int, reverse=False) -> Generator[Player, None, None]:
         """
         a,b,c,d,e 如果dealer_id是b，那么迭代器返回的结果为c, d, e, a, b
         列表第一位是小盲第二位是大盲最后一位是庄家
         """
-        # 按顺序遍历未弃牌玩家
-        start_item = (self._player_ids.index(dealer_id) + 1) % len(self._player_ids)  # 保证循环列表中在最后一位时也能取得小盲位索引
-        step_multiplier = -1 if reverse else 1  # 根据方向确定步进值
-        for i in range(len(self._player_ids)):
-            next_item = (start_item + (i * step_multiplier)) % len(self._player_ids)
-            player_id = self._player_ids[next_item]
+        if reverse:
+            # 按顺序遍历未弃牌玩家
+            start_item = (self._seat_index[dealer_id] + 1) % len(self._player_ids)  # 保证循环列表中在最后一位时也能取得小盲位索引
+            for i in range(len(self._player_ids)):
+                player_id = self._player_ids[(start_item - i) % len(self._player_ids)]
+                if player_id not in self._folder_ids:
+                    yield self._players[player_id]
+            return
+
+        if self.count_active() == 0:
+            return
+        # 沿环走一圈，遍历过程中弃牌的玩家跳过
+        first_id = self._first_active_after(dealer_id)
+        round_ids = [first_id]
+        player_id = self._next[first_id]
+        while player_id != first_id:
+            round_ids.append(player_id)
+            player_id = self._next[player_id]
+        for player_id in round_ids:
             if player_id not in self._folder_ids:
                 yield self._players[player_id]
 
@@ -84,21 +134,16 @@ class GamePlayers:
 
     def get_next(self, dealer_id: int) -> Optional[Player]:
         # 获取下一个未弃牌玩家
-        if dealer_id not in self._player_ids:
+        if dealer_id not in self._players:
             raise ValueError("Unknown player id")
         if dealer_id in self._folder_ids:
             raise ValueError("Inactive player")
-        start_item = self._player_ids.index(dealer_id)
-        for i in range(len(self._player_ids) - 1):
-            next_index = (start_item + i + 1) % len(self._player_ids)
-            next_id = self._player_ids[next_index]
-            if next_id not in self._folder_ids:
-                return self._players[next_id]
-        return None
+        next_id = self._next[dealer_id]
+        return self._players[next_id] if next_id != dealer_id else None
 
     def is_active(self, player_id: int) -> bool:
         # 检查玩家是否弃牌
-        if player_id not in self._player_ids:
+        if player_id not in self._players:
             raise ValueError("Unknown player id")
         return player_id not in self._folder_ids
 
@@ -132,61 +177,124 @@ class GamePlayers:
 
 
 class GameScores:
+    """
+    手牌和公共牌都以牌编码保存（见 card.card_code），只在需要序列化时才生成 Card 对象。
+    每名玩家保存一份可累加的牌力状态，发公共牌时只加入新牌；同一条街内的得分只计算一次。
+    """
     def __init__(self, score_detector: ScoreDetector):
         self._score_detector: ScoreDetector = score_detector
-        self._players_cards: Dict[int, List[Card]] = {}
-        self._shared_cards: List[Card] = []
+        self._players_codes: Dict[int, List[int]] = {}
+        self._shared_codes: List[int] = []
+        self._players_hands: Dict[int, HandAccumulator] = {}  # 玩家id-手牌+公共牌的累积状态
+        self._players_scores: Dict[int, Score] = {}  # 当前这条街已经算过的得分
+        self._players_strengths: Dict[int, int] = {}  # 当前这条街批量算出的牌力
+
+    @property
+    def shared_codes(self) -> List[int]:
+        # 获取公共牌编码
+        return self._shared_codes
 
     @property
-    def shared_cards(self):
+    def shared_cards(self) -> List[Card]:
         # 获取公共牌
-        return self._shared_cards
+        return [Card.from_code(code) for code in self._shared_codes]
 
-    def player_cards(self, player_id: int):
+    def player_codes(self, player_id: int) -> List[int]:
+        # 获取玩家手牌编码
+        return self._players_codes[player_id]
+
+    def player_cards(self, player_id: int) -> List[Card]:
         # 获取玩家手牌
-        return self._players_cards[player_id]
+        return [Card.from_code(code) for code in self._players_codes[player_id]]
 
     def player_score(self, player_id: int):
-        # 计分
-        return self._score_detector.get_score(self._players_cards[player_id] + self._shared_cards)
-
-    def assign_cards(self, player_id: int, cards: List[Card]):
-        # 分配手牌
-        self._players_cards[player_id] = self._score_detector.get_score(cards).cards
+        # 计分，同一条街内复用已算出的得分
+        score = self._players_scores.get(player_id)
+        if score is None:
+            score = self._score_detector.get_hand_score(self._players_hands[player_id])
+            self._players_scores[player_id] = score
+        return score
+
+    def player_strengths(self, player_ids: List[int]) -> Dict[int, int]:
+        """
+        获取多名玩家的牌力。没有算过的玩家在同一组公共牌上批量计算。
+        """
+        missing = [
+            player_id for player_id in player_ids
+            if player_id not in self._players_scores and player_id not in self._players_strengths
+        ]
+        if missing:
+            strengths = self._score_detector.get_scores_batch(
+                self._shared_codes,
+                [self._players_codes[player_id] for player_id in missing]
+            )
+            self._players_strengths.update(zip(missing, strengths))
+        return {
+            player_id: self._players_scores[player_id].strength if player_id in self._players_scores
+            else self._players_strengths[player_id]
+            for player_id in player_ids
+        }
+
+    def assign_cards(self, player_id: int, codes: List[int]):
+        # 分配手牌，按牌的大小降序保存
+        self._players_codes[player_id] = sorted(codes, reverse=True)
+        self._players_hands[player_id] = self._score_detector.create_hand(
+            self._players_codes[player_id] + self._shared_codes
+        )
+        self._players_scores.pop(player_id, None)
+        self._players_strengths.pop(player_id, None)
 
-    def add_shared_cards(self, cards):
-        # 添加公共牌
-        self._shared_cards += cards
+    def add_shared_cards(self, codes: List[int]):
+        # 添加公共牌，只把新牌累加到每名玩家的状态中
+        self._shared_codes += codes
+        for hand in self._players_hands.values():
+            hand.add(codes)
+        self._players_scores.clear()
+        self._players_strengths.clear()
 
 
 class GamePots:
-    # 奖金池
+    """
+    奖金池（主池和边池）。
+
+    按投入金额分层：未弃牌玩家的每个不同的投入金额是一层，每层一个奖金池，
+    参与者是投入不低于该层的未弃牌玩家，金额是每个参与者在这一层的投入，
+    加上弃牌玩家投入中落在这一层的部分。
+
+    未弃牌玩家按 (投入, 座位) 保存在有序列表中，add_bets 只移动本轮下注或弃牌的玩家；
+    GamePot 对象在读取时才生成，并缓存到下一次 add_bets。
+
+    例：P1 100、P2 50（弃牌）、P3 200、P4 100
+        奖金池编号	金额	参与玩家
+        1	350	P1、P3、P4（含 P2 的 50）
+        2	100	P3
+    """
     class GamePot:
         """
         单个奖金池类，用于存储奖金金额和参与玩家。
         """
 
         def __init__(self):
-            self._money = 0.0
+            self._money = 0
             self._players: List[Player] = []
             # 新增: 记录玩家在此特定底池中的贡献
-            self._contributions: Dict[int, float] = {}
+            self._contributions: Dict[int, int] = {}
 
-        def add_money(self, money: float):
+        def add_money(self, money: int):
             self._money += money
 
         def add_player(self, player: Player):
             self._players.append(player)
             # 新增: 初始化玩家贡献
             if player.id not in self._contributions:
-                self._contributions[player.id] = 0.0
+                self._contributions[player.id] = 0
 
         # 新增: 添加玩家贡献的方法
-        def add_player_contribution(self, player_id: int, amount: float):
-            self._contributions[player_id] = self._contributions.get(player_id, 0.0) + amount
+        def add_player_contribution(self, player_id: int, amount: int):
+            self._contributions[player_id] = self._contributions.get(player_id, 0) + amount
 
         @property
-        def money(self) -> float:
+        def money(self) -> int:
             return self._money
 
         @property
@@ -195,105 +303,99 @@ class GamePots:
 
         # 新增: 获取贡献的属性
         @property
-        def contributions(self) -> Dict[int, float]:
+        def contributions(self) -> Dict[int, int]:
             return self._contributions
 
     def __len__(self):
-        return len(self._pots)
+        return len(self._get_pots())
 
     def __getitem__(self, item):
-        return self._pots[item]
+        return self._get_pots()[item]
 
     def __iter__(self):
-        return iter(self._pots)
+        return iter(self._get_pots())
 
     def __init__(self, game_players: GamePlayers):
         self._game_players = game_players
-        self._pots = []
-        self._bets = {player.id: 0.0 for player in game_players.all}
+        players = game_players.all
+        self._players: Dict[int, Player] = {player.id: player for player in players}
+        self._seats: Dict[int, int] = {player.id: seat for seat, player in enumerate(players)}
+        self._bets: Dict[int, int] = {player.id: 0 for player in players}
+        # 未弃牌玩家 (投入, 座位, id)，按投入从低到高、同投入按座位排序，只包含投入大于 0 的玩家
+        self._stacks: List[Tuple[int, int, int]] = []
+        self._active_ids: Set[int] = set(self._players)
+        # 弃牌玩家的投入
+        self._folded: Dict[int, int] = {}
+        self._money = 0
+        self._pots: Optional[List[GamePots.GamePot]] = []
 
     @property
-    def bets(self) -> Dict[int, float]:
+    def bets(self) -> Dict[int, int]:
         return self._bets
 
-    def add_bets(self, bets: Dict[int, float]):
-        for player in self._game_players.all:  # self._game_players.all所有未出局玩家的Player列表
-            self._bets[player.id] += bets[player.id] if player.id in bets else 0.0
-
-        bets = dict(self._bets)  # 浅拷贝，保证不直接修改self._bets
-
-        # List of players sorted by their bets
-        # 按照玩家下注金额从低到高排序
-        players = sorted(
-            self._game_players.all,
-            key=lambda player: bets[player.id]
-        )
-
-        self._pots = []  # 清空当前的奖金池
-
-        spare_money = 0.0  # 用于存储未分配的金额（通常来自非活动玩家）
+    @property
+    def money(self) -> int:
+        """所有奖金池的总金额"""
+        return self._money
+
+    def _unstack(self, player_id: int):
+        stack = (self._bets[player_id], self._seats[player_id], player_id)
+        if stack[0] > 0:
+            del self._stacks[bisect.bisect_left(self._stacks, stack)]
+
+    def add_bets(self, bets: Dict[int, int]):
+        dead_ids = {player.id for player in self._game_players.dead}
+
+        # 新弃牌的玩家移出有序列表，出局玩家的投入不再计入奖金池
+        for player_id in [player_id for player_id in self._active_ids if not self._game_players.is_active(player_id)]:
+            self._unstack(player_id)
+            self._active_ids.discard(player_id)
+            self._folded[player_id] = self._bets[player_id]
+        for player_id in dead_ids:
+            self._money -= self._folded.pop(player_id, 0)
+
+        for player_id, bet in bets.items():
+            if not bet or player_id not in self._bets or player_id in dead_ids:
+                continue
+            self._money += bet
+            if player_id in self._active_ids:
+                self._unstack(player_id)
+                self._bets[player_id] += bet
+                bisect.insort(self._stacks, (self._bets[player_id], self._seats[player_id], player_id))
+            else:
+                self._bets[player_id] += bet
+                self._folded[player_id] = self._bets[player_id]
 
-        '''
-        处理逻辑
-        玩家 ID	活跃状态	下注金额
-        P1	活跃	100
-        P2	非活动	50
-        P3	活跃	200
-        P4	活跃	100
-        执行逻辑
-        
-            1.	第一轮：处理 P1 的下注金额 100
-            •	当前活跃玩家：P1、P3、P4。
-            •	创建一个奖金池，金额为 100 * 3 = 300。
-            •	参与玩家：P1、P3、P4。
-            •	更新玩家下注金额：
-            •	P1：0
-            •	P3：100
-            •	P4：0
-            2.	第二轮：处理 P3 的剩余下注金额 100
-            •	当前活跃玩家：P3。
-            •	创建一个新的奖金池，金额为 100。
-            •	参与玩家：P3。
-            •	更新玩家下注金额：
-            •	P3：0
-            3.	处理非活动玩家 P2 的金额
-            •	P2 的 50 会被加入 spare_money，在下一次活跃玩家奖金池分配中使用。
-            •	如果所有玩家的下注金额已匹配完毕，spare_money 应为 0。
-        
-        最终奖金池结果
-        奖金池编号	金额	参与玩家
-        1	300	P1、P3、P4
-        2	100	P3
-        '''
-
-        for i, player in enumerate(players):
-            if not self._game_players.is_active(player.id):
-                # 如果玩家处于非活动状态（例如弃牌或出局），他们的下注金额不会参与任何后续奖金池的分配
-                # 这些金额被加入spare_money，作为后续奖金池的补充资金
-                spare_money += bets[player.id]
-                bets[player.id] = 0.0
-            elif bets[player.id] > 0.0:
-                # 如果玩家仍然活跃且有下注金额
-                pot_bet = bets[player.id]  # 当前玩家下注值
-                current_pot = GamePots.GamePot()  # 创建一个新的奖金池
-                # 将 spare_money（来自之前非活动玩家的资金）加入当前奖金池
-                current_pot.add_money(spare_money)
-                spare_money = 0.0  # 重置spare_money为 0，因为它已被分配到当前奖金池
-                for j in range(i, len(players)):
-                    # 从当前玩家开始，检查后续玩家是否活跃
-                    if self._game_players.is_active(players[j].id):
-                        # 如果玩家活跃，将其加入当前奖金池的参与者列表
-                        current_pot.add_player(players[j])
-                        # 新增: 记录活跃玩家对这个特定底池的贡献
-                        current_pot.add_player_contribution(players[j].id, pot_bet)
-                    # 每个活跃玩家都需要匹配当前的下注金额（pot_bet）
-                    current_pot.add_money(pot_bet)
-                    bets[players[j].id] -= pot_bet  # 减少玩家的下注金额，记录匹配的部分
-                self._pots.append(current_pot)
-
-        if spare_money:
+        top_level = self._stacks[-1][0] if self._stacks else 0
+        if any(money > top_level for money in self._folded.values()):
             # The players who bet more is actually inactive
             raise ValueError("Invalid bets")
+        self._pots = None
+
+    def _get_pots(self) -> List[GamePot]:
+        if self._pots is None:
+            self._pots = self._build_pots()
+        return self._pots
+
+    def _build_pots(self) -> List[GamePot]:
+        pots = []
+        folded = [money for money in self._folded.values() if money > 0]
+        previous_level = 0
+        for i, (level, _, _) in enumerate(self._stacks):
+            if level == previous_level:
+                continue
+            layer = level - previous_level
+            pot = GamePots.GamePot()
+            for _, _, player_id in self._stacks[i:]:
+                pot.add_player(self._players[player_id])
+                pot.add_player_contribution(player_id, layer)
+            # 每个参与者投入 layer，弃牌玩家投入中落在 (previous_level, level] 的部分
+            pot.add_money(layer * (len(self._stacks) - i) + sum(
+                min(money, level) - previous_level for money in folded if money > previous_level
+            ))
+            pots.append(pot)
+            previous_level = level
+        return pots
 
 
 class GameEventDispatcher:
@@ -334,13 +436,13 @@ class GameEventDispatcher:
             for subscriber in self._subscribers
         ])
 
-    def cards_assignment_event(self, player: Player, cards: List[Card], score: Score):
+    def cards_assignment_event(self, player: Player, codes: List[int], score: Score):
         # 发牌
         self.raise_event(
             "cards-assignment",
             {
                 "target": player.id,
-                "cards": [card.dto() for card in cards],
+                "cards": [code_dto(code) for code in codes],
                 "score": score.dto()
             }
         )
@@ -362,7 +464,12 @@ class GameEventDispatcher:
         )
 
     def winner_designation_event(self, players: List[Player], pot: GamePots.GamePot, winners: List[Player],
-                                 money_split: float, net_win_split: float, upcoming_pots: GamePots, bets: Dict[int, float]):
+                                 money_split: int, net_win_split: int, upcoming_pots: GamePots, bets: Dict[int, int],
+                                 winner_shares: Dict[int, int], net_wins: Dict[int, int]):
+        """
+        money_split 为平分后每人的基本份额，winner_shares / net_wins 为每名赢家实际分到的金额和净赢金额
+        （除不尽的筹码分给了 winner_ids 中靠前的赢家），net_win_split 为第一名赢家的净赢金额。
+        """
         # 赢家判定
         self.raise_event(
             "winner-designation",
@@ -373,7 +480,9 @@ class GameEventDispatcher:
                     "winner_ids": [winner.id for winner in winners],
                     "money_split": money_split,
                     # 新增: 用于前端显示的净赢金额
-                    "net_win_split": net_win_split
+                    "net_win_split": net_win_split,
+                    "winner_shares": winner_shares,
+                    "net_wins": net_wins
                 },
                 "pots": [
                     {
@@ -387,7 +496,7 @@ class GameEventDispatcher:
             }
         )
 
-    def bet_action_event(self, player: Player, min_bet: float, max_bet: float, bets: Dict[int, float], timeout: int,
+    def bet_action_event(self, player: Player, min_bet: int, max_bet: int, bets: Dict[int, int], timeout: int,
                          timeout_epoch: float):
         # 下注动作
         self.raise_event(
@@ -403,7 +512,7 @@ class GameEventDispatcher:
             }
         )
 
-    def bet_event(self, player: Player, bet: float, bet_type: str, bets: Dict[str, float]):
+    def bet_event(self, player: Player, bet: int, bet_type: str, bets: Dict[int, int]):
         # 完成下注
         self.raise_event(
             "bet",
@@ -433,25 +542,38 @@ class GameEventDispatcher:
             }
         )
 
-    def showdown_event(self, players: List[Player], scores: GameScores):
-        # 摊牌
+    def showdown_event(self, players: List[Player], scores: GameScores, equities: Optional[Dict[int, float]] = None):
+        # 摊牌，全下提前摊牌时附带每名玩家的胜率
+        event_players = {
+            player.id: {
+                "cards": [code_dto(code) for code in scores.player_codes(player.id)],
+                "score": scores.player_score(player.id).dto(),
+            }
+            for player in players
+        }
+        if equities:
+            for player_id, equity in equities.items():
+                event_players[player_id]["equity"] = equity
         self.raise_event(
             "showdown",
             {
-                "players": {
-                    player.id: {
-                        "cards": [card.dto() for card in scores.player_cards(player.id)],
-                        "score": scores.player_score(player.id).dto(),
-                    }
-                    for player in players
-                }
+                "players": event_players
             }
         )
 
-    def shared_cards_event(self, new_shared_cards: List[Card]):
+    def shared_cards_event(self, new_shared_codes: List[int]):
         # 发公共牌
         raise NotImplemented
 
+    def pace_event(self, seconds: float):
+        # 服务器没有等待的动画时长，客户端收到后延迟处理之后的牌局事件（见 timing.py）
+        self.raise_event(
+            "pace",
+            {
+                "seconds": seconds
+            }
+        )
+
     def new_game_event(self, *args, **kwargs):
         raise NotImplemented
 
@@ -473,21 +595,60 @@ class GameWinnersDetector:
         self._game_players: GamePlayers = game_players
 
     def get_winners(self, players: List[Player], scores: GameScores) -> List[Player]:
-        winners = []
+        # 每名玩家的牌力只取一次（共用公共牌批量计算），取最大值后牌力相同的玩家平分
+        active_players = [player for player in players if self._game_players.is_active(player.id)]
+        if not active_players:
+            return []
+        strengths = scores.player_strengths([player.id for player in active_players])
+        best = max(strengths.values())
+        return [player for player in active_players if strengths[player.id] == best]
 
-        for player in players:
-            if not self._game_players.is_active(player.id):
-                continue
-            if not winners:
-                winners.append(player)
-            else:
-                score_diff = scores.player_score(player.id).cmp(scores.player_score(winners[0].id))
-                if score_diff == 0:
-                    winners.append(player)
-                elif score_diff > 0:
-                    winners = [player]
 
-        return winners
+class _RoundStakes:
+    """
+    一轮下注中的下注上下限。
+    一轮内每个玩家的 money + bets 不变，只需要维护当前最高下注和未弃牌玩家中最大的两个 money + bets，
+    每次行动的上下限都是 O(1)；最大的两个中有人弃牌时才重新计算。
+    """
+
+    def __init__(self, game_players: GamePlayers, players: List[Player], bets: Dict[int, int]):
+        self._game_players = game_players
+        self._stakes: Dict[int, int] = {player.id: player.money + bets[player.id] for player in players}
+        self.max_bet: int = max(bets.values())
+        self._top: List[Tuple[int, int]] = self._top_stakes()
+
+    def _top_stakes(self) -> List[Tuple[int, int]]:
+        return heapq.nlargest(2, (
+            (stake, player_id) for player_id, stake in self._stakes.items()
+            if self._game_players.is_active(player_id)
+        ))
+
+    def on_bet(self, bets: Dict[int, int], player_id: int):
+        if bets[player_id] > self.max_bet:
+            self.max_bet = bets[player_id]
+
+    def highest_other(self, player_id: int, folder_id: Optional[int] = None) -> Optional[int]:
+        # 除 player_id 以外未弃牌玩家的最大 money + bets，没有其他玩家时返回 None
+        # folder_id 为假设已经弃牌的玩家（预测下一位玩家的局面时使用）
+        if any(not self._game_players.is_active(top_id) for _, top_id in self._top):
+            self._top = self._top_stakes()
+        for stake, top_id in self._top:
+            if top_id != player_id and top_id != folder_id:
+                return stake
+        if folder_id is None or len(self._top) < 2:
+            return None
+        # 最大的两个都被排除，需要看第三个
+        return max((
+            stake for other_id, stake in self._stakes.items()
+            if other_id not in (player_id, folder_id) and self._game_players.is_active(other_id)
+        ), default=None)
+
+    def limits(self, player: Player, bets: Dict[int, int]) -> Tuple[int, int]:
+        min_bet = min(self.max_bet - bets[player.id], player.money)
+        highest_stake = self.highest_other(player.id)
+        if highest_stake is None:
+            return min_bet, 0
+        return min_bet, min(highest_stake - bets[player.id], player.money)
 
 
 class GameBetRounder:
@@ -504,53 +665,42 @@ class GameBetRounder:
     """
     def __init__(self, game_players: GamePlayers):
         self._game_players: GamePlayers = game_players
+        # 进行中的下注轮的状态，供 predict_next 使用
+        self._stakes: Optional[_RoundStakes] = None
+        self._best_player: Optional[Player] = None
 
-    def _get_max_bet(self, dealer: Player, bets: Dict[int, float]) -> float:
+    def predict_next(self, player: Player, bet: int, min_bet: int, bets: Dict[int, int]) -> Optional[Tuple[Player, int, int]]:
         """
-        计算当前玩家（dealer）的最大可下注金额。
-
-        参数：
-        - dealer (Player): 当前轮到的玩家。
-        - bets (Dict[str, float]): 玩家当前的下注状态，键为玩家 ID，值为已下注金额。
-
-        返回：
-        - float: 当前玩家的最大可下注金额。
+        假设轮到的 player 这次下注 bet（-1 为弃牌），返回 (下一位玩家, 最小下注, 最大下注)。
+        不在下注轮中、这次行动后本轮下注结束、或下一位玩家不需要下注时返回 None。
+        bets 为 player 行动之前的下注状态。
         """
-        # Max raise:
-        # Maximum amount of money that other players bet (or can still bet) during this round
+        stakes = self._stakes
+        if stakes is None:
+            return None
         try:
-            # 计算其他玩家的最大可下注金额
-            highest_stake = max(
-                player.money + bets[player.id]
-                for player in self._game_players.round(dealer.id)
-                if player is not dealer
-            )
+            next_player = self._game_players.get_next(player.id)
         except ValueError:
-            return 0.0
-
-        # 最大下注金额取决于其他玩家的下注金额差和当前玩家的剩余金额
-        return min(
-            highest_stake - bets[dealer.id],
-            dealer.money
-        )
-
-    def _get_min_bet(self, dealer: Player, bets: Dict[int, float]) -> float:
-        """
-        计算当前玩家（dealer）的最小可下注金额。
-
-        参数：
-        - dealer (Player): 当前轮到的玩家。
-        - bets (Dict[str, float]): 玩家当前的下注状态，键为玩家 ID，值为已下注金额。
-
-        返回：
-        - float: 当前玩家的最小可下注金额。
-        """
-        return min(
-            max(bets.values()) - bets[dealer.id],
-            dealer.money
-        )
-
-    def bet_round(self, dealer_id: int, bets: Dict[int, float], get_bet_function, on_bet_function=None, blind_bet: bool=False) -> Optional[
+            return None
+        best_player = self._best_player
+        if bet != -1 and (best_player is None or bet > min_bet):
+            best_player = player
+        if next_player is None or next_player is best_player or next_player.id not in bets:
+            return None
+
+        # 一轮内 money + bets 不变，下一位玩家还没有行动，只需要把 player 的下注或弃牌计入
+        player_bet = bets[player.id] + (0 if bet == -1 else bet)
+        next_bet = bets[next_player.id]
+        next_min_bet = min(max(stakes.max_bet, player_bet) - next_bet, next_player.money)
+        highest_stake = stakes.highest_other(next_player.id, folder_id=player.id if bet == -1 else None)
+        if highest_stake is None:
+            return None
+        next_max_bet = min(highest_stake - next_bet, next_player.money)
+        if next_max_bet == 0:
+            return None
+        return next_player, next_min_bet, next_max_bet
+
+    def bet_round(self, dealer_id: int, bets: Dict[int, int], get_bet_function, on_bet_function=None, blind_bet: bool=False) -> Optional[
         PlayerServer]:
         """
         performs a complete bet round
@@ -580,18 +730,27 @@ class GameBetRounder:
                 # Ensuring the bets dictionary makes sense
                 raise ValueError("Invalid bets dictionary")
 
+        stakes = self._stakes = _RoundStakes(self._game_players, players_round, bets)
+        self._best_player = None
+
+        try:
+            return self._bet_round(starting_player, bets, stakes, get_bet_function, on_bet_function)
+        finally:
+            self._stakes = self._best_player = None
+
+    def _bet_round(self, starting_player: Player, bets: Dict[int, int], stakes: _RoundStakes,
+                   get_bet_function, on_bet_function) -> Optional[PlayerServer]:
         best_player = None  # 最后加注的玩家
 
         while starting_player is not None and starting_player != best_player:
             next_player = self._game_players.get_next(starting_player.id)
 
             # 计算当前玩家下注的上下限
-            max_bet = self._get_max_bet(starting_player, bets)
-            min_bet = self._get_min_bet(starting_player, bets)
+            min_bet, max_bet = stakes.limits(starting_player, bets)
 
-            if max_bet == 0.0:
+            if max_bet == 0:
                 # No bet required to this player (either he is all-in or all other players are all-in)
-                bet = 0.0
+                bet = 0
             else:
                 # This player isn't all in, and there's at least one other player who is not all-in
                 # 接收下注数据
@@ -604,8 +763,9 @@ class GameBetRounder:
                     raise ValueError("Invalid bet")
                 starting_player.take_money(bet)
                 bets[starting_player.id] += bet
+                stakes.on_bet(bets, starting_player.id)
                 if best_player is None or bet > min_bet:
-                    best_player = starting_player
+                    best_player = self._best_player = starting_player
 
             if on_bet_function:
                 on_bet_function(starting_player, bet, min_bet, max_bet, bets)
@@ -616,6 +776,10 @@ class GameBetRounder:
         return best_player
 
 
+def _sleep(seconds: float, point: Optional[str] = None):
+    gevent.sleep(seconds)
+
+
 class GameBetHandler:
     """
     GameBetHandler 类用于管理扑克游戏中的下注逻辑。
@@ -635,7 +799,8 @@ class GameBetHandler:
     - _wait_after_round (int): 每轮下注结束后的等待时间（秒）。
     """
     def __init__(self, game_players: GamePlayers, bet_rounder: GameBetRounder, event_dispatcher: GameEventDispatcher,
-                 bet_timeout: int, timeout_tolerance: int, wait_after_round: int, on_action_callback=None):
+                 bet_timeout: int, timeout_tolerance: int, wait_after_round: int, on_action_callback=None,
+                 wait_function=None):
         self._game_players: GamePlayers = game_players
         self._bet_rounder: GameBetRounder = bet_rounder
         self._event_dispatcher: GameEventDispatcher = event_dispatcher
@@ -643,26 +808,27 @@ class GameBetHandler:
         self._timeout_tolerance: int = timeout_tolerance
         self._wait_after_round: int = wait_after_round
         self._on_action_callback = on_action_callback
+        self._wait_function = wait_function or _sleep  # 牌局的节奏等待（PokerGame._wait）
 
-    def any_bet(self, bets: Dict[int, float]) -> bool:
+    def any_bet(self, bets: Dict[int, int]) -> bool:
         """
         检查当前是否有任何玩家下注。
 
         参数：
-        - bets (Dict[str, float]): 玩家当前的下注状态。
+        - bets (Dict[int, int]): 玩家当前的下注状态。
 
         返回：
         - bool: 如果至少有一名玩家下注金额大于零，则返回 True。
         """
         return any(k for k in bets if bets[k] > 0)
 
-    def bet_round(self, dealer_id: int, bets: Dict[int, float], pots: GamePots, blind_bet: bool = False):
+    def bet_round(self, dealer_id: int, bets: Dict[int, int], pots: GamePots, blind_bet: bool = False):
         """
         执行一轮下注操作。
 
         参数：
         - dealer_id (str): 当前庄家的玩家 ID。
-        - bets (Dict[str, float]): 玩家当前的下注状态。
+        - bets (Dict[int, int]): 玩家当前的下注状态。
         - pots (GamePots): 当前奖金池对象。
 
         返回：
@@ -670,21 +836,22 @@ class GameBetHandler:
         """
         # 调用 bet_rounder 执行下注轮次逻辑
         best_player = self._bet_rounder.bet_round(dealer_id, bets, self.get_bet, self.on_bet, blind_bet)  # [b,c,d,e,a]
-        gevent.sleep(self._wait_after_round)
+        if self._wait_after_round:
+            self._wait_function(self._wait_after_round, BET_ROUND)
         if self.any_bet(bets):
             pots.add_bets(bets)
             self._event_dispatcher.pots_update_event(self._game_players.active, pots)
         return best_player
 
-    def get_bet(self, player, min_bet: float, max_bet: float, bets: Dict[int, float]) -> Optional[int]:
+    def get_bet(self, player, min_bet: int, max_bet: int, bets: Dict[int, int]) -> Optional[int]:
         """
         获取玩家的下注金额。
 
         参数：
         - player (Player): 当前下注的玩家。
-        - min_bet (float): 当前最小下注金额。
-        - max_bet (float): 当前最大下注金额。
-        - bets (Dict[str, float]): 玩家当前的下注状态。
+        - min_bet (int): 当前最小下注金额。
+        - max_bet (int): 当前最大下注金额。
+        - bets (Dict[int, int]): 玩家当前的下注状态。
 
         返回：
         - Optional[int]: 玩家下注的金额。如果返回 None，表示玩家未下注或超时。
@@ -706,8 +873,8 @@ class GameBetHandler:
 
         参数：
         - player (Player): 当前下注的玩家。
-        - min_bet (float): 当前最小下注金额。
-        - max_bet (float): 当前最大下注金额。
+        - min_bet (int): 当前最小下注金额。
+        - max_bet (int): 当前最大下注金额。
         - timeout_epoch (float): 超时时间点（UNIX 时间戳）。
 
         返回：
@@ -741,16 +908,16 @@ class GameBetHandler:
             player.send_message({"message_type": "error", "error": e.args[0]})
             return -1
 
-    def on_bet(self, player: Player, bet: float, min_bet: float, max_bet: float, bets: Dict[int, float]):
+    def on_bet(self, player: Player, bet: int, min_bet: int, max_bet: int, bets: Dict[int, int]):
         """
         处理玩家的下注事件并触发相关事件。
 
         参数：
         - player (Player): 当前下注的玩家。
-        - bet (float): 玩家下注的金额。
-        - min_bet (float): 当前最小下注金额。
-        - max_bet (float): 当前最大下注金额。
-        - bets (Dict[str, float]): 玩家当前的下注状态。
+        - bet (int): 玩家下注的金额。
+        - min_bet (int): 当前最小下注金额。
+        - max_bet (int): 当前最大下注金额。
+        - bets (Dict[int, int]): 玩家当前的下注状态。
         """
         def get_bet_type(bet):
             if bet == 0:
@@ -798,8 +965,10 @@ class PokerGame:
     WAIT_AFTER_WINNER_DESIGNATION = 1  # 赢家判定后等待时间
 
     def __init__(self, id: str, game_players: GamePlayers, event_dispatcher: GameEventDispatcher,
-                 deck_factory: DeckFactory, score_detector: ScoreDetector, room_id: str = None):
+                 deck_factory: DeckFactory, score_detector: ScoreDetector, room_id: str = None,
+                 timing: Optional[TimingPolicy] = None):
         self._id: str = id
+        self._timing: TimingPolicy = timing or get_timing_policy(TABLE_TIMING)
         self._room_id: str = room_id
         self._game_players: GamePlayers = game_players
         self._event_dispatcher: GameEventDispatcher = event_dispatcher
@@ -825,6 +994,19 @@ class PokerGame:
         """Callback for player actions, to be overridden for DB logging"""
         pass
 
+    def _wait(self, seconds: float, point: Optional[str] = None):
+        """
+        牌局节奏等待（发牌、摊牌、赢家展示等），point 为等待点（见 timing.py），由 TimingPolicy 决定等多久。
+        """
+        self._timing.wait(self, point, seconds)
+
+    def has_human_players(self) -> bool:
+        return any(not getattr(player, "is_bot", False) for player in self._game_players.all)
+
+    def is_runout(self) -> bool:
+        """还有多名玩家但最多一人还能下注（其余都已全下），剩下的公共牌直接发完"""
+        return self._game_players.count_active() > 1 and self._game_players.count_active_with_money() <= 1
+
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
     # Factory methods
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -840,7 +1022,8 @@ class PokerGame:
             bet_timeout=BET_TIMEOUT,
             timeout_tolerance=TIMEOUT_TOLERANCE,
             wait_after_round=self.WAIT_AFTER_BET_ROUND,
-            on_action_callback=self._on_player_action
+            on_action_callback=self._on_player_action,
+            wait_function=self._wait
         )
 
     def _create_winners_detector(self) -> GameWinnersDetector:
@@ -887,9 +1070,9 @@ class PokerGame:
         # Assign cards
         for player in self._game_players.round(dealer_id):
             # Distribute cards
-            scores.assign_cards(player.id, deck.pop_cards(number_of_cards))
+            scores.assign_cards(player.id, deck.pop_codes(number_of_cards))
             self._send_player_score(player, scores)
-        gevent.sleep(self.WAIT_AFTER_CARDS_ASSIGNMENT)
+        self._wait(self.WAIT_AFTER_CARDS_ASSIGNMENT, CARDS)
 
     def _send_player_score(self, player: Player, scores: GameScores):
         """
@@ -901,7 +1084,7 @@ class PokerGame:
         """
         self._event_dispatcher.cards_assignment_event(
             player=player,
-            cards=scores.player_cards(player.id),
+            codes=scores.player_codes(player.id),
             score=scores.player_score(player.id)
         )
 
@@ -919,13 +1102,15 @@ class PokerGame:
         if self._game_players.count_active() < 2:
             raise EndGameException
 
-    def _detect_winners(self, pots: GamePots, scores: GameScores) -> Set[int]:
+    def _detect_winners(self, pots: GamePots, scores: GameScores, dealer_id: Optional[int] = None) -> Set[int]:
         """
         检测并分配赢家。
+        平分奖金池时除不尽的筹码从庄家左手边第一个赢家开始每人分一个。
 
         参数：
         - pots (GamePots): 当前游戏的奖金池管理器。
         - scores (GameScores): 管理玩家得分的组件。
+        - dealer_id (int): 庄家 ID，为空时按奖金池中的玩家顺序分配除不尽的筹码。
         
         返回：
         - Set[int]: 所有赢家的ID集合。
@@ -936,41 +1121,51 @@ class PokerGame:
         all_winner_ids = set()
         for i, pot in enumerate(reversed(pots)):
             winners = self._winners_detector.get_winners(pot.players, scores)
-            try:
-                money_split = round(pot.money / len(winners))  # Strip decimals
-            except ZeroDivisionError:
+            if not winners:
                 raise GameError("No players left")
-            else:
-                for winner in winners:
-                    # 核心业务逻辑: 给赢家账户加钱，此行不应改动以确保数据正确
-                    winner.add_money(money_split)
-                    all_winner_ids.add(winner.id)
-
-                # 新增: 为前端显示计算净利润
-                # 由于底池的所有赢家对该池的贡献相同，我们只取第一个赢家来计算
-                first_winner_contribution = pot.contributions.get(winners[0].id, 0.0)
-                net_win_for_display = money_split - first_winner_contribution
-
-                self._event_dispatcher.winner_designation_event(
-                    players=self._game_players.active,
-                    pot=pot,
-                    winners=winners,
-                    money_split=money_split,
-                    # 新增: 传入用于前端显示的净赢金额
-                    net_win_split=net_win_for_display,
-                    upcoming_pots=pots[:-(i + 1)],
-                    bets=pots.bets
-                )
-
-                gevent.sleep(self.WAIT_AFTER_WINNER_DESIGNATION)
+            if dealer_id is not None and len(winners) > 1:
+                # 从庄家左手边开始排序，除不尽的筹码按这个顺序每人一个
+                winner_ids = {winner.id for winner in winners}
+                winners = [player for player in self._game_players.round(dealer_id) if player.id in winner_ids]
+            money_split, odd_chips = divmod(pot.money, len(winners))
+            winner_shares = {}
+            for k, winner in enumerate(winners):
+                # 核心业务逻辑: 给赢家账户加钱，此行不应改动以确保数据正确
+                share = money_split + 1 if k < odd_chips else money_split
+                if share:
+                    winner.add_money(share)
+                winner_shares[winner.id] = share
+                all_winner_ids.add(winner.id)
+
+            # 新增: 为前端显示计算净利润，按每名赢家实际分到的金额减去他在该池的贡献
+            net_wins = {
+                winner_id: share - pot.contributions.get(winner_id, 0)
+                for winner_id, share in winner_shares.items()
+            }
+
+            self._event_dispatcher.winner_designation_event(
+                players=self._game_players.active,
+                pot=pot,
+                winners=winners,
+                money_split=money_split,
+                # 新增: 传入用于前端显示的净赢金额
+                net_win_split=net_wins[winners[0].id],
+                upcoming_pots=pots[:-(i + 1)],
+                bets=pots.bets,
+                winner_shares=winner_shares,
+                net_wins=net_wins
+            )
+
+            self._wait(self.WAIT_AFTER_WINNER_DESIGNATION, WINNER)
         return all_winner_ids
 
-    def _showdown(self, scores: GameScores):
+    def _showdown(self, scores: GameScores, equities: Optional[Dict[int, float]] = None):
         """
         执行摊牌流程，通知玩家所有的手牌和得分。
 
         参数：
         - scores (GameScores): 管理玩家得分的组件。
+        - equities (Dict[int, float]): 公共牌未发完时每名玩家的胜率，可选。
         """
-        self._event_dispatcher.showdown_event(self._game_players.active, scores)
-        gevent.sleep(self.WAIT_AFTER_SHOWDOWN)
+        self._event_dispatcher.showdown_event(self._game_players.active, scores, equities)
+        self._wait(self.WAIT_AFTER_SHOWDOWN, SHOWDOWN)
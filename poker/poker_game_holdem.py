@@ -1,30 +1,45 @@
 import uuid
 import json
+import random
 from typing import Optional, List, Dict
 
 import gevent
 
+from .card import code_dto, encode_codes
 from .deck import DeckFactory
+from .equity import BOARD_SIZE, showdown_equities, showdown_is_exact
 from .player import Player
 from .poker_game import PokerGame, GameFactory, GameError, EndGameException, GamePlayers, \
-    GameEventDispatcher, GameSubscriber, GameBetHandler, GameBetRounder
+    GameEventDispatcher, GameSubscriber, GameBetHandler, GameBetRounder, GamePots
 from .score_detector import HoldemPokerScoreDetector
-from .db_utils import get_or_create_table, create_hand, add_hand_player, update_hand_player_result, \
-    add_hand_action, finish_hand, update_daily_stats, update_player_wallet, auto_topup_chips, get_daily_ranking_list, \
-    update_lifetime_stats
+from .persistence import DatabaseSink, DATABASE_SINK
+from .timing import TimingPolicy, STREET
 from .config import INIT_MONEY, TIMEOUT_TOLERANCE, BET_TIMEOUT, WAIT_AFTER_FLOP_TURN_RIVER
 import logging
 
-from .bots.decision import BotDecisionContext
+from .bots.context import HandContextTracker
+from .bots.prefetch import DecisionPrefetcher
+from .bots.scheduler import DEFAULT_SCHEDULER, ThinkScheduler
 
 
 class HoldemPokerGameFactory(GameFactory):
-    def __init__(self, big_blind: float, small_blind: float, logger,
-                 game_subscribers: Optional[List[GameSubscriber]] = None):
-        self._big_blind: float = big_blind
-        self._small_blind: float = small_blind
+    def __init__(self, big_blind: int, small_blind: int, logger,
+                 game_subscribers: Optional[List[GameSubscriber]] = None, rng: Optional[random.Random] = None,
+                 timing: Optional[TimingPolicy] = None, sink: Optional[DatabaseSink] = None,
+                 think_scheduler: Optional[ThinkScheduler] = None):
+        """
+        timing / sink / think_scheduler 为空时使用线上配置（实时节奏、写数据库、机器人思考时间），
+        无界面模拟时传入 HEADLESS_TIMING、NULL_SINK、NO_DELAY_SCHEDULER（见 simulate.py）。
+        """
+        self._big_blind: int = big_blind
+        self._small_blind: int = small_blind
         self._logger = logger
         self._game_subscribers: List[GameSubscriber] = [] if game_subscribers is None else game_subscribers
+        self._timing = timing
+        self._sink = sink
+        self._think_scheduler = think_scheduler
+        # 所有牌局共用一个牌组工厂，牌组在每手牌结束后回收复用；rng 为空时使用 secrets 随机源
+        self._deck_factory = DeckFactory(2, rng=rng)  # 指定2为最小牌面
 
     def create_game(self, players: List[Player], room_id: str = None):
         game_id = str(uuid.uuid4())
@@ -40,9 +55,12 @@ class HoldemPokerGameFactory(GameFactory):
             id=game_id,
             game_players=GamePlayers(players),
             event_dispatcher=event_dispatcher,
-            deck_factory=DeckFactory(2),  # 指定2为最小牌面
+            deck_factory=self._deck_factory,
             score_detector=HoldemPokerScoreDetector(),
-            room_id=room_id
+            room_id=room_id,
+            timing=self._timing,
+            sink=self._sink,
+            think_scheduler=self._think_scheduler
         )
 
 
@@ -73,14 +91,14 @@ class HoldemPokerGameEventDispatcher(GameEventDispatcher):
             {}
         )
 
-    def shared_cards_event(self, cards):
+    def shared_cards_event(self, codes):
         """
         发公共牌
         """
         self.raise_event(
             "shared-cards",
             {
-                "cards": [card.dto() for card in cards]  # [('J', '♠'), ...]
+                "cards": [code_dto(code) for code in codes]  # [(11, 0), ...]
             }
         )
 
@@ -104,12 +122,20 @@ class HoldemGameBetHandler(GameBetHandler):
     def get_bet(self, player, min_bet, max_bet, bets):
         if getattr(player, "is_bot", False):
             return self._game.get_bot_bet(player, min_bet, max_bet, bets)
+        # 真人思考时按过牌/跟注预测局面，提前计算下一位机器人的决策
+        self._game.prefetch_next_bot(player, min_bet, min_bet, max_bet, bets)
         return super().get_bet(player, min_bet, max_bet, bets)
 
 
 class HoldemPokerGame(PokerGame):
-    def __init__(self, big_blind, small_blind, *args, **kwargs):
+    WAIT_AFTER_FLOP_TURN_RIVER = WAIT_AFTER_FLOP_TURN_RIVER  # 发公共牌后等待时间
+    SHOWDOWN_EQUITY_SAMPLES = 1000  # 全下摊牌展示胜率时蒙特卡洛的总次数（只用于显示）
+    SHOWDOWN_EQUITY_BATCH = 250  # 每批模拟之后让出协程，不阻塞同一进程的其他牌桌
+
+    def __init__(self, big_blind, small_blind, *args, sink: Optional[DatabaseSink] = None,
+                 think_scheduler: Optional[ThinkScheduler] = None, **kwargs):
         PokerGame.__init__(self, *args, **kwargs)
+        self._sink: DatabaseSink = sink or DATABASE_SINK  # 牌局数据写到哪里
         self._big_blind = big_blind
         self._small_blind = small_blind
         self._logger = logging.getLogger()
@@ -118,12 +144,15 @@ class HoldemPokerGame(PokerGame):
         self._db_table_id = None  # 数据库中的桌子ID
         self._street = 0  # 当前圈数 (0: Pre-flop, 1: Flop, 2: Turn, 3: River)
         self._action_num = 0  # 当前局的动作序号
-        self._pots = []  # 当前局的底池列表
+        self._pots: Optional[GamePots] = None  # 当前局的底池
         self._hand_stats = {}  # 玩家本局统计数据
         self._preflop_raise_count = 0  # 翻前加注次数，用于计算3-bet
         self._scores = None
         self._action_history = []
+        self._bot_context: Optional[HandContextTracker] = None  # 机器人决策上下文，每手牌新建
         self._dealer_id = None
+        self._think_scheduler = think_scheduler or DEFAULT_SCHEDULER  # 机器人思考时间
+        self._prefetcher = DecisionPrefetcher()  # 提前计算下一位机器人的决策
 
     def __check_no_money_players(self):
         # 没钱的自动贷款
@@ -131,7 +160,7 @@ class HoldemPokerGame(PokerGame):
             if player.money < self._big_blind:
                 amount = INIT_MONEY
                 # 更新数据库并记录交易
-                if auto_topup_chips(player.id, amount, self._db_hand_id):
+                if self._sink.auto_topup_chips(player.id, amount, self._db_hand_id):
                     player.add_money(amount)
                     self._logger.info(f"为玩家 {player.name} (ID: {player.id}) 自动追加{amount}筹码")
                 else:
@@ -141,11 +170,11 @@ class HoldemPokerGame(PokerGame):
         # 一手牌结束时保存数据
         for player in self._game_players.all:
             # Daily stats are now updated in _finish_db_hand
-            update_player_wallet(player.id, player.money)
+            self._sink.update_player_wallet(player.id, player.money)
 
     def update_daily_ranking_list(self):
         # 更新每日榜单，根据当日参与玩家的净胜分由高到低排名
-        daily_ranking_data = get_daily_ranking_list()
+        daily_ranking_data = self._sink.get_daily_ranking_list()
         self._event_dispatcher.update_ranking_event(daily_ranking_data)
 
     def _reset_ready_state(self):
@@ -159,18 +188,39 @@ class HoldemPokerGame(PokerGame):
         """
         执行摊牌流程，记录进入摊牌的玩家。
         """
-        for player in self._game_players.active:
+        active = self._game_players.active
+        for player in active:
             if player.id in self._hand_stats:
                 self._hand_stats[player.id]['wtsd'] = 1
-        super()._showdown(scores)
 
-    def _add_shared_cards(self, new_shared_cards, scores):
+        # 全下后公共牌还没发完：附带每名玩家的胜率（转牌、河牌前精确计算）
+        equities = None
+        if len(scores.shared_codes) < BOARD_SIZE and len(active) > 1:
+            shares = self._showdown_equities([scores.player_codes(player.id) for player in active],
+                                             scores.shared_codes)
+            equities = {player.id: round(share, 4) for player, share in zip(active, shares)}
+        super()._showdown(scores, equities)
+
+    def _showdown_equities(self, hands, board) -> List[float]:
+        """摊牌展示用的胜率：组合数少时精确计算，否则分批蒙特卡洛，批次之间让出协程"""
+        if showdown_is_exact(hands, board):
+            return showdown_equities(hands, board)
+        batches = max(1, self.SHOWDOWN_EQUITY_SAMPLES // self.SHOWDOWN_EQUITY_BATCH)
+        totals = [0.0] * len(hands)
+        for batch in range(batches):
+            if batch:
+                gevent.sleep(0)
+            for index, share in enumerate(showdown_equities(hands, board, samples=self.SHOWDOWN_EQUITY_BATCH)):
+                totals[index] += share
+        return [total / batches for total in totals]
+
+    def _add_shared_cards(self, new_shared_codes, scores):
         """
         添加公共牌并广播事件。
         """
-        self._event_dispatcher.shared_cards_event(new_shared_cards)
+        self._event_dispatcher.shared_cards_event(new_shared_codes)
         # Adds the new shared cards
-        scores.add_shared_cards(new_shared_cards)
+        scores.add_shared_cards(new_shared_codes)
 
     def _init_db_record(self, dealer_id):
         """
@@ -180,11 +230,11 @@ class HoldemPokerGame(PokerGame):
         if not self._room_id:
             return
 
-        self._db_table_id = get_or_create_table(str(self._room_id))
+        self._db_table_id = self._sink.get_or_create_table(str(self._room_id))
         if not self._db_table_id:
             return
 
-        self._db_hand_id = create_hand(self._db_table_id, self._small_blind, self._big_blind)
+        self._db_hand_id = self._sink.create_hand(self._db_table_id, self._small_blind, self._big_blind)
 
         # 计算玩家位置
         active_players = list(self._game_players.round(dealer_id))
@@ -217,7 +267,7 @@ class HoldemPokerGame(PokerGame):
             position = position_map.get(player.id, "UNK")
 
             # 这里没有添加手牌信息，因为Player中没有保存这部分数据
-            add_hand_player(
+            self._sink.add_hand_player(
                 self._db_hand_id,
                 player.id,
                 seat,
@@ -229,86 +279,119 @@ class HoldemPokerGame(PokerGame):
         """
         Explicitly create bet handler with action callback to ensure recording
         """
+        self._bet_rounder = GameBetRounder(self._game_players)
         return HoldemGameBetHandler(
             self,
             game_players=self._game_players,
-            bet_rounder=GameBetRounder(self._game_players),
+            bet_rounder=self._bet_rounder,
             event_dispatcher=self._event_dispatcher,
             bet_timeout=BET_TIMEOUT,
             timeout_tolerance=TIMEOUT_TOLERANCE,
             wait_after_round=self.WAIT_AFTER_BET_ROUND,
-            on_action_callback=self._on_player_action
+            on_action_callback=self._on_player_action,
+            wait_function=self._wait
         )
 
-    def _build_bot_context(self, player, min_bet, max_bet, bets):
-        scores = self._scores
-        board_cards = [c.dto() for c in scores.shared_cards] if scores else []
-        hand_cards = [c.dto() for c in scores.player_cards(player.id)] if scores else []
-
-        players_payload = []
-        for p in self._game_players.all:
-            players_payload.append({
-                "id": p.id,
-                "name": p.name,
-                "seat": getattr(p, "seat", None),
-                "money": p.money,
-                "active": self._game_players.is_active(p.id),
-                "is_bot": getattr(p, "is_bot", False),
-                "bot_difficulty": getattr(p, "bot_difficulty", None)
-            })
-
-        pot_total = 0
-        try:
-            pot_total = sum(getattr(p, "money", 0) for p in self._pots)
-        except Exception:
-            pot_total = 0
-        try:
-            pot_total += sum(int(v) for v in bets.values())
-        except Exception:
-            pass
-
-        return BotDecisionContext(
-            room_id=str(self._room_id) if self._room_id is not None else "",
-            game_id=str(self._id),
-            street=self._street,
-            player_id=player.id,
-            player_name=player.name,
-            seat=getattr(player, "seat", None),
-            hand=hand_cards,
-            board=board_cards,
-            players=players_payload,
-            pot_total=int(pot_total),
-            street_bets={int(k): int(v) for k, v in (bets or {}).items()},
-            min_bet=int(min_bet),
-            max_bet=int(max_bet),
-            to_call=int(min_bet),
-            action_history=list(self._action_history)
-        )
+    def _build_bot_context(self, player, min_bet, max_bet, bets, pending_bet=0):
+        return self._bot_context.context(player, self._street, min_bet, max_bet, bets,
+                                         self._game_players.is_active, pending_bet)
 
-    def get_bot_bet(self, player, min_bet: float, max_bet: float, bets):
+    def get_bot_bet(self, player, min_bet: int, max_bet: int, bets):
         # 机器人下注
         engine = getattr(player, "bot_engine", None)
         if not engine:
             return -1
         context = self._build_bot_context(player, min_bet, max_bet, bets)
+        prefetched = self._prefetcher.take(context)
+
+        def decide():
+            decision = prefetched.get() if prefetched is not None else engine.decide(context)
+            decision = self._normalize_bot_bet(decision, min_bet, max_bet)
+            # 决策已定，思考时间里计算下一位机器人的决策
+            self.prefetch_next_bot(player, decision, min_bet, max_bet, bets)
+            return decision
+
         try:
-            decision = engine.decide(context)
+            return self._think_scheduler.run(decide, getattr(player, "bot_difficulty", None))
         except Exception as e:
             self._logger.error("Bot decision failed: %s", e)
             return -1
 
-        try:
-            decision = int(round(float(decision)))
-        except Exception:
-            return -1
-
+    @staticmethod
+    def _normalize_bot_bet(decision: int, min_bet: int, max_bet: int) -> int:
+        # 引擎都返回整数筹码（远程回复在 RemoteDecisionEngine.decide 中转换），这里只做区间限制
         if decision == -1:
             return -1
         if decision < min_bet:
-            return 0 if min_bet == 0 else int(min_bet)
+            return min_bet
         if decision > max_bet:
-            return int(max_bet)
-        return int(decision)
+            return max_bet
+        return decision
+
+    def prefetch_next_bot(self, player, bet, min_bet, max_bet, bets):
+        """
+        假设 player 这次下注 bet，预测下一位玩家的局面；下一位是需要提前计算的机器人时开始计算。
+        预测落空（真人没有过牌/跟注等）时结果在轮到它时被丢弃；这次行动会结束本轮下注时不预测。
+        """
+        prediction = self._bet_rounder.predict_next(player, bet, min_bet, bets)
+        if prediction is None:
+            # 这次行动后本轮下注结束，或者下一位玩家不需要下注
+            return
+        next_player, next_min_bet, next_max_bet = prediction
+        if not getattr(next_player, "is_bot", False):
+            return
+        engine = getattr(next_player, "bot_engine", None)
+        if not getattr(engine, "prefetch", False):
+            return
+
+        predicted_bets = dict(bets)
+        if bet != -1:
+            predicted_bets[player.id] += bet
+
+        context = self._build_bot_context(next_player, next_min_bet, next_max_bet, predicted_bets,
+                                          pending_bet=0 if bet == -1 else bet)
+        for payload in context.players:
+            if payload["id"] == player.id:
+                if bet == -1:
+                    payload["active"] = False
+                else:
+                    payload["money"] = player.money - bet
+        action_type = self._classify_action(bet, min_bet, max_bet)
+        context.action_history = context.action_history.with_action(
+            self._action_record(player, bet, predicted_bets, action_type, self._action_num + 1))
+        self._prefetcher.prefetch(engine, context)
+
+    @staticmethod
+    def _classify_action(bet, min_bet, max_bet) -> str:
+        # bet == -1 弃牌
+        if bet == -1:
+            return "fold"
+        # 无人下注：check / bet
+        if min_bet == 0:
+            action_type = "check" if bet == 0 else "bet"
+        else:
+            # 有下注：call / raise
+            action_type = "call" if bet == min_bet else "raise"
+
+        # all-in 识别：优先用 max_bet（bet_handler 通常会传入玩家可用最大额）
+        # 注意：盲注/特殊调用可通过 forced_action_type 绕开该判断
+        if max_bet and bet == max_bet and bet > 0:
+            action_type = "all-in"
+        return action_type
+
+    def _action_record(self, player, bet, bets, action_type: str, action_num: int) -> dict:
+        """行动历史中的一条记录，bets 为本次下注之后的累计"""
+        # pot_before = 之前的底池 + 当前圈所有下注累计 - 玩家本次下注（因为bets里包含本次下注后的累计）
+        amount = 0 if bet == -1 else bet
+        pot_before = self._pots.money + sum(bets.values()) - amount
+        return {
+            "street": self._street,
+            "action_num": action_num,
+            "player_id": player.id,
+            "action_type": action_type,
+            "amount": amount,
+            "pot_before": max(pot_before, 0)
+        }
 
     def _on_player_action(self, player, bet, min_bet, max_bet, bets, forced_action_type: str = None):
         """记录玩家行动到数据库。
@@ -323,76 +406,24 @@ class HoldemPokerGame(PokerGame):
         self._action_num += 1
 
         # ---- 1) 计算动作类型 ----
-        if forced_action_type:
-            action_type = forced_action_type
-        else:
-            # bet == -1 弃牌
-            if bet == -1:
-                action_type = "fold"
-            else:
-                # 无人下注：check / bet
-                if min_bet == 0:
-                    action_type = "check" if bet == 0 else "bet"
-                else:
-                    # 有下注：call / raise
-                    action_type = "call" if bet == min_bet else "raise"
+        action_type = forced_action_type or self._classify_action(bet, min_bet, max_bet)
 
-                # all-in 识别：优先用 max_bet（bet_handler 通常会传入玩家可用最大额）
-                # 注意：盲注/特殊调用可通过 forced_action_type 绕开该判断
-                if max_bet and bet == max_bet and bet > 0:
-                    action_type = "all-in"
-
-        # ---- 2) 计算 pot_before ----
-        # pot_before = 之前的底池 + 当前圈所有下注累计 - 玩家本次下注（因为bets里包含本次下注后的累计）
-        try:
-            pot_from_pots = sum(getattr(p, 'money', 0) for p in self._pots)
-        except Exception:
-            pot_from_pots = 0
-
-        try:
-            bet_sum = sum(bets.values()) if bets else 0
-        except Exception:
-            bet_sum = 0
-
-        pot_before = pot_from_pots + bet_sum
-        if bet != -1:
-            pot_before -= bet
-        if pot_before < 0:
-            pot_before = 0
-
-        # ---- 3) 写入数据库（DB 里 amount/pot_before 期望为整数） ----
-        amount = 0 if bet == -1 else bet
-        try:
-            amount = int(amount)
-        except Exception:
-            amount = int(round(amount))
-
-        try:
-            pot_before_i = int(pot_before)
-        except Exception:
-            pot_before_i = int(round(pot_before))
-
-        # ---- 3) 记录行动历史（供机器人/调试使用） ----
-        self._action_history.append({
-            "street": self._street,
-            "action_num": self._action_num,
-            "player_id": player.id,
-            "action_type": action_type,
-            "amount": amount,
-            "pot_before": pot_before_i
-        })
+        # ---- 2) 记录行动历史（供机器人/调试使用） ----
+        record = self._action_record(player, bet, bets, action_type, self._action_num)
+        self._bot_context.record(record, bet)
+        amount, pot_before = record["amount"], record["pot_before"]
 
         if not self._db_hand_id:
             return
 
-        if not add_hand_action(
+        if not self._sink.add_hand_action(
                 self._db_hand_id,
                 player.id,
                 self._street,
                 self._action_num,
                 action_type,
                 amount,
-                pot_before_i
+                pot_before
         ):
             self._logger.error(f"Failed to record action for player {player.id}")
 
@@ -444,13 +475,13 @@ class HoldemPokerGame(PokerGame):
             return
 
         # 总底池
-        total_pot = sum(pot.money for pot in pots) if pots else 0
+        total_pot = pots.money if pots else 0
 
         # 公共牌
-        board_cards_str = json.dumps([c.dto() for c in scores.shared_cards])
+        board_cards_str = json.dumps([code_dto(c) for c in scores.shared_codes])
 
         # 更新hands表中的公共牌与总奖池，大小盲在init时已经记录
-        finish_hand(self._db_hand_id, board_cards_str, total_pot)
+        self._sink.finish_hand(self._db_hand_id, board_cards_str, total_pot)
 
         # Update player results
         # Winners are detected in _detect_winners but here we can check who won from pots or just record final stacks
@@ -576,8 +607,10 @@ class HoldemPokerGame(PokerGame):
                 'wsd': 0
             } for p in self._game_players.all
         }
-        self._action_history = []
         self._scores = scores
+        self._bot_context = HandContextTracker(str(self._room_id) if self._room_id is not None else "", str(self._id),
+                                               self._game_players.all, scores)
+        self._action_history = self._bot_context.actions
         self._dealer_id = dealer_id
         self._init_db_record(dealer_id)
 
@@ -605,34 +638,34 @@ class HoldemPokerGame(PokerGame):
             # 在数据库中记录每名玩家的手牌
             if self._db_hand_id:
                 for player in self._game_players.all:
-                    cards = scores.player_cards(player.id)
-                    if cards:
-                        update_hand_player_result(self._db_hand_id, player.id, player.money, False,
-                                                  json.dumps([c.dto() for c in cards]))
+                    codes = scores.player_codes(player.id)
+                    if codes:
+                        self._sink.update_hand_player_result(self._db_hand_id, player.id, player.money, False,
+                                                  json.dumps([code_dto(c) for c in codes]))
 
             # Pre-flop bet round
             bet_rounds.__next__()
 
             # Flop
             self._street = 1
-            self._add_shared_cards(deck.pop_cards(3), scores)
-            gevent.sleep(WAIT_AFTER_FLOP_TURN_RIVER)
+            self._add_shared_cards(deck.pop_codes(3), scores)
+            self._wait(self.WAIT_AFTER_FLOP_TURN_RIVER, STREET)
 
             # Flop bet round
             bet_rounds.__next__()
 
             # Turn
             self._street = 2
-            self._add_shared_cards(deck.pop_cards(1), scores)
-            gevent.sleep(WAIT_AFTER_FLOP_TURN_RIVER)
+            self._add_shared_cards(deck.pop_codes(1), scores)
+            self._wait(self.WAIT_AFTER_FLOP_TURN_RIVER, STREET)
 
             # Turn bet round
             bet_rounds.__next__()
 
             # River
             self._street = 3
-            self._add_shared_cards(deck.pop_cards(1), scores)
-            gevent.sleep(WAIT_AFTER_FLOP_TURN_RIVER)
+            self._add_shared_cards(deck.pop_codes(1), scores)
+            self._wait(self.WAIT_AFTER_FLOP_TURN_RIVER, STREET)
 
             # River bet round
             if bet_rounds.__next__() and self._game_players.count_active() > 1:
@@ -642,25 +675,27 @@ class HoldemPokerGame(PokerGame):
             raise EndGameException
 
         except EndGameException:
-            total_pot = sum(pot.money for pot in pots)  # 防止self._detect_winners之后会清空pot
-            winner_ids = self._detect_winners(pots, scores)
+            total_pot = pots.money
+            winner_ids = self._detect_winners(pots, scores, dealer_id)
 
             # DB Finish Hand
             if self._db_hand_id:
-                board_cards = json.dumps([c.dto() for c in scores.shared_cards])
-                finish_hand(self._db_hand_id, board_cards, total_pot)
+                board_cards = json.dumps([code_dto(c) for c in scores.shared_codes])
+                self._sink.finish_hand(self._db_hand_id, board_cards, total_pot)
+                # 记录发牌顺序，配合行动记录可以离线回放这手牌（见 replay.py）
+                self._sink.update_hand_deck_order(self._db_hand_id, encode_codes(deck.dealt))
 
                 for player in self._game_players.all:
                     is_winner = player.id in winner_ids
-                    update_hand_player_result(self._db_hand_id, player.id, player.money, is_winner)
+                    self._sink.update_hand_player_result(self._db_hand_id, player.id, player.money, is_winner)
 
                     # Update Stats
                     start_stack = starting_stacks.get(player.id, player.money)
-                    net_chips = int(player.money - start_stack)
+                    net_chips = player.money - start_stack
 
                     # Only update stats for players who actually played (active or all-in at some point)
                     # For now update for everyone in the hand record
-                    update_daily_stats(player.id, 1, net_chips)
+                    self._sink.update_daily_stats(player.id, 1, net_chips)
 
                     # 生涯数据
                     ps = self._hand_stats.get(player.id, {})
@@ -670,7 +705,7 @@ class HoldemPokerGame(PokerGame):
                     # 计算 BB 增益
                     net_bb = net_chips / self._big_blind if self._big_blind > 0 else 0
 
-                    update_lifetime_stats(
+                    self._sink.update_lifetime_stats(
                         player.id,
                         hands_played=1,
                         net_chips=net_chips,
@@ -687,4 +722,6 @@ class HoldemPokerGame(PokerGame):
             self._reset_ready_state()  # 重置准备状态
 
         finally:
+            self._prefetcher.clear()
+            self._deck_factory.recycle(deck)
             self._event_dispatcher.game_over_event()
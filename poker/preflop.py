@@ -0,0 +1,108 @@
+"""
+翻牌前169类起手牌索引。
+
+两张手牌按点数和是否同花归为169类，类编号与起手牌矩阵（前端手牌矩阵图）的格子一一对应：
+点数从 A 到 2 排列，class_id = row * 13 + col；对角线为对子，右上方 (row < col) 为同花，左下方为不同花。
+例如 AA = 0，AKs = 1，AKo = 13，22 = 168。
+
+牌编码对到类编号的映射在导入时生成（52 * 52 的平铺表），查询只需一次下标访问。
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .card import NUM_CODES, card_code, code_rank
+
+NUM_CLASSES = 169
+RANK_CHARS = "AKQJT98765432"  # 矩阵的行列顺序
+
+_RANK_OF_CHAR: Dict[str, int] = {char: 14 - index for index, char in enumerate(RANK_CHARS)}
+_RANK_OF_CHAR["1"] = 10  # Card.RANKS 中 10 显示为 "10"
+
+
+def _class_id(code1: int, code2: int) -> int:
+    row1, row2 = 14 - code_rank(code1), 14 - code_rank(code2)
+    high, low = min(row1, row2), max(row1, row2)
+    if high == low:
+        return high * 14
+    if code1 & 3 == code2 & 3:
+        return high * 13 + low
+    return low * 13 + high
+
+
+def _label(class_id: int) -> str:
+    row, col = divmod(class_id, 13)
+    if row == col:
+        return RANK_CHARS[row] * 2
+    if row < col:
+        return RANK_CHARS[row] + RANK_CHARS[col] + "s"
+    return RANK_CHARS[col] + RANK_CHARS[row] + "o"
+
+
+# 下标为 code1 * 52 + code2，相同的两张牌为 -1
+_PAIR_CLASS: List[int] = [
+    _class_id(code1, code2) if code1 != code2 else -1
+    for code1 in range(NUM_CODES) for code2 in range(NUM_CODES)
+]
+
+LABELS: List[str] = [_label(class_id) for class_id in range(NUM_CLASSES)]
+LABEL_IDS: Dict[str, int] = {label: class_id for class_id, label in enumerate(LABELS)}
+
+# 每类包含的具体手牌 (code1, code2)，code1 > code2
+_CLASS_CODES: List[List[Tuple[int, int]]] = [[] for _ in range(NUM_CLASSES)]
+for _code1 in range(NUM_CODES):
+    for _code2 in range(_code1):
+        _CLASS_CODES[_PAIR_CLASS[_code1 * NUM_CODES + _code2]].append((_code1, _code2))
+
+# 每类的组合数：对子6，同花4，不同花12
+COMBOS: List[int] = [len(codes) for codes in _CLASS_CODES]
+
+
+def class_id(code1: int, code2: int) -> int:
+    """两张手牌的牌编码 -> 类编号"""
+    index = _PAIR_CLASS[code1 * NUM_CODES + code2]
+    if index < 0:
+        raise ValueError("Hole cards must be different")
+    return index
+
+
+def dto_class_id(hand: Sequence[Sequence[int]]) -> int:
+    """[(rank, suit), (rank, suit)] 形式的手牌 -> 类编号"""
+    (rank1, suit1), (rank2, suit2) = hand
+    if not (2 <= rank1 <= 14 and 2 <= rank2 <= 14 and 0 <= suit1 <= 3 and 0 <= suit2 <= 3):
+        raise ValueError("Invalid card")
+    return class_id(card_code(rank1, suit1), card_code(rank2, suit2))
+
+
+def class_label(class_id: int) -> str:
+    return LABELS[class_id]
+
+
+def label_class_id(label: str) -> int:
+    """'AKs' / 'AKo' / 'AA' -> 类编号，未知标签抛出 KeyError"""
+    return LABEL_IDS[label]
+
+
+def class_codes(class_id: int) -> List[Tuple[int, int]]:
+    """该类的所有具体手牌（牌编码对）"""
+    return list(_CLASS_CODES[class_id])
+
+
+def parse_hole_cards(cards) -> Optional[int]:
+    """
+    解析数据库中保存的手牌，返回类编号，无法解析时返回 None。
+    支持 [[14, 0], [13, 1]]（Card.dto 格式），以及 ["Ah", "Kd"] / "AhKd" 这类字符串写法。
+    """
+    if isinstance(cards, str):
+        cards = [cards[0:2], cards[2:4]]
+    if len(cards) != 2:
+        return None
+    try:
+        if isinstance(cards[0], str):
+            (rank1, suit1), (rank2, suit2) = [(_RANK_OF_CHAR[card[0].upper()], card[-1]) for card in cards]
+            if rank1 == rank2 and suit1 == suit2:
+                return None
+            if rank1 == rank2:
+                return (14 - rank1) * 14
+            return dto_class_id([(rank1, 0), (rank2, 0 if suit1 == suit2 else 1)])
+        return dto_class_id(cards)
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
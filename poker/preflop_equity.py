@@ -0,0 +1,190 @@
+"""
+翻牌前全下胜率表。
+
+两张表（类编号见 preflop.py）：
+- 单挑：169 x 169，heads_up[a][b] 为 a 类手牌对 b 类手牌的胜率（平局算一半）
+- 对随机手牌：MAX_OPPONENTS x 169，vs_random[n - 1][a] 为 a 类手牌对 n 个随机手牌对手的胜率
+
+表是静态的，但计算量很大，由构建步骤离线生成：
+
+    python -m poker.preflop_equity [--samples 2000] [--workers 4]
+
+生成的二进制文件（assets/preflop_equity.bin，不提交到仓库）在导入本模块时用 mmap 映射，
+多个进程共享同一份页缓存，查询是一次下标访问。文件不存在时查询函数返回 None。
+"""
+import argparse
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import List, Optional
+
+from .preflop import NUM_CLASSES, class_codes, class_id
+
+MAX_OPPONENTS = 9
+TABLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "preflop_equity.bin")
+
+_MAGIC = b"PFEQ"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHH")  # magic, version, 类数, 最多对手数
+_HEADS_UP_SIZE = NUM_CLASSES * NUM_CLASSES
+_VS_RANDOM_SIZE = MAX_OPPONENTS * NUM_CLASSES
+
+
+class PreflopEquityTables:
+    """映射到内存的胜率表，values 为 float32 序列：先单挑表，再对随机手牌表"""
+
+    def __init__(self, values, buffer=None):
+        self._values = values
+        self._buffer = buffer  # 保持 mmap 打开
+
+    def heads_up(self, class_a: int, class_b: int) -> float:
+        return self._values[class_a * NUM_CLASSES + class_b]
+
+    def vs_random(self, class_a: int, opponents: int = 1) -> float:
+        if not 1 <= opponents <= MAX_OPPONENTS:
+            raise ValueError("Opponents must be between 1 and {}".format(MAX_OPPONENTS))
+        return self._values[_HEADS_UP_SIZE + (opponents - 1) * NUM_CLASSES + class_a]
+
+
+def load_tables(path: str = TABLE_PATH) -> Optional[PreflopEquityTables]:
+    """映射胜率表文件，文件不存在或格式不对时返回 None"""
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    magic, version, num_classes, max_opponents = _HEADER.unpack_from(buffer, 0) \
+        if len(buffer) >= _HEADER.size else (None, None, None, None)
+    expected_size = _HEADER.size + 4 * (_HEADS_UP_SIZE + _VS_RANDOM_SIZE)
+    if magic != _MAGIC or version != _VERSION or num_classes != NUM_CLASSES or max_opponents != MAX_OPPONENTS \
+            or len(buffer) != expected_size:
+        logging.warning("Ignoring invalid preflop equity table %s", path)
+        buffer.close()
+        return None
+
+    if sys.byteorder == "little":
+        values = memoryview(buffer)[_HEADER.size:].cast("f")
+        return PreflopEquityTables(values, buffer)
+
+    # 大端机器上不能直接 cast，复制一份并转换字节序
+    values = array("f")
+    values.frombytes(buffer[_HEADER.size:])
+    values.byteswap()
+    buffer.close()
+    return PreflopEquityTables(values)
+
+
+TABLES: Optional[PreflopEquityTables] = load_tables()
+
+
+def heads_up_equity(class_a: int, class_b: int) -> Optional[float]:
+    """a 类手牌对 b 类手牌的翻牌前全下胜率，没有生成胜率表时返回 None"""
+    return TABLES.heads_up(class_a, class_b) if TABLES else None
+
+
+def equity_vs_random(class_a: int, opponents: int = 1) -> Optional[float]:
+    """a 类手牌对 opponents 个随机手牌的翻牌前全下胜率，没有生成胜率表时返回 None"""
+    return TABLES.vs_random(class_a, opponents) if TABLES else None
+
+
+def hand_equity_vs_random(code1: int, code2: int, opponents: int = 1) -> Optional[float]:
+    return equity_vs_random(class_id(code1, code2), opponents)
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Build
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def _heads_up_cell(args) -> float:
+    from .equity import estimate_equity
+    import random
+
+    class_a, class_b, samples, seed = args
+    if class_a == class_b:
+        return 0.5
+    # 对范围来说同一类的各个组合是花色同构的，取一个代表即可
+    return estimate_equity(class_codes(class_a)[0], ranges=[{class_b}], target_stderr=0.0,
+                           max_samples=samples, batch_size=samples, rng=random.Random(seed)).equity
+
+
+def _vs_random_cell(args) -> float:
+    from .equity import estimate_equity
+    import random
+
+    class_a, opponents, samples, seed = args
+    return estimate_equity(class_codes(class_a)[0], opponents=opponents, target_stderr=0.0,
+                           max_samples=samples, batch_size=samples, rng=random.Random(seed)).equity
+
+
+def build_tables(samples: int = 2000, random_samples: int = 5000, workers: int = 1, seed: int = 0,
+                 progress=None) -> List[float]:
+    """
+    蒙特卡洛生成两张表，返回按文件顺序排列的胜率列表。
+    单挑表只计算 a < b 的格子，另一半取 1 - x，对角线为 0.5。
+    """
+    heads_up_jobs = [(a, b, samples, seed * 1000003 + a * NUM_CLASSES + b)
+                     for a in range(NUM_CLASSES) for b in range(a + 1, NUM_CLASSES)]
+    random_jobs = [(a, opponents, random_samples, seed * 1000003 + _HEADS_UP_SIZE + opponents * NUM_CLASSES + a)
+                   for opponents in range(1, MAX_OPPONENTS + 1) for a in range(NUM_CLASSES)]
+
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(workers) as executor:
+            heads_up_results = list(executor.map(_heads_up_cell, heads_up_jobs, chunksize=64))
+            if progress:
+                progress("heads-up table done")
+            random_results = list(executor.map(_vs_random_cell, random_jobs, chunksize=8))
+    else:
+        heads_up_results = [_heads_up_cell(job) for job in heads_up_jobs]
+        if progress:
+            progress("heads-up table done")
+        random_results = [_vs_random_cell(job) for job in random_jobs]
+
+    values = [0.5] * _HEADS_UP_SIZE
+    for (a, b, _, _), equity in zip(heads_up_jobs, heads_up_results):
+        values[a * NUM_CLASSES + b] = equity
+        values[b * NUM_CLASSES + a] = 1.0 - equity
+    return values + random_results
+
+
+def write_tables(values: List[float], path: str = TABLE_PATH):
+    data = array("f", values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # 先写临时文件再替换，正在映射旧文件的进程不受影响
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, NUM_CLASSES, MAX_OPPONENTS))
+        f.write(data.tobytes())
+    os.replace(temp_path, path)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build the preflop all-in equity tables")
+    parser.add_argument("--samples", type=int, default=2000, help="samples per heads-up class pair")
+    parser.add_argument("--random-samples", type=int, default=5000, help="samples per class vs random hands")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=TABLE_PATH)
+    args = parser.parse_args(argv)
+
+    started = time.time()
+
+    def progress(message):
+        print("{} ({:.0f}s)".format(message, time.time() - started))
+
+    values = build_tables(args.samples, args.random_samples, args.workers, args.seed, progress)
+    write_tables(values, args.output)
+    progress("wrote {}".format(args.output))
+
+
+if __name__ == "__main__":
+    main()
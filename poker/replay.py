@@ -0,0 +1,234 @@
+"""
+离线回放一手牌。
+
+数据库里保存了每手牌的发牌顺序（hands.deck_order，见 card.encode_codes）和完整的行动记录（hand_actions），
+回放时用 PresetDeck 按原顺序发牌，下注处理器按行动记录依次返回下注，重新执行 HoldemPokerGame.play_hand。
+回放不连接玩家、不写数据库、没有任何等待，可以用来核对历史牌局的结算结果：
+
+    python -m poker.replay 120 121 200-300
+"""
+import argparse
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from .card import decode_codes
+from .deck import DeckFactory, PresetDeck
+from .persistence import NULL_SINK
+from .player import Player
+from .poker_game import GamePlayers, GameBetRounder
+from .poker_game_holdem import HoldemPokerGame, HoldemPokerGameEventDispatcher, HoldemGameBetHandler
+from .score_detector import HoldemPokerScoreDetector
+from .timing import HEADLESS_TIMING
+
+
+class ReplayError(Exception):
+    pass
+
+
+@dataclass
+class HandRecord:
+    """
+    回放一手牌需要的数据。
+    - players: 按座位顺序的 (玩家id, 名字, 开局筹码)
+    - deck_order: 按发牌顺序的牌编码
+    - actions: 按顺序的 (玩家id, 动作类型, 金额)，包括盲注和自动过牌
+    """
+    players: List[Tuple[int, str, int]]
+    dealer_id: int
+    small_blind: int
+    big_blind: int
+    deck_order: List[int]
+    actions: List[Tuple[int, str, int]]
+    hand_id: Optional[int] = None
+    ending_stacks: Dict[int, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_db(cls, data: dict) -> "HandRecord":
+        """由 db_utils.get_hand_replay_data 的返回值创建"""
+        if not data.get("deck_order"):
+            raise ReplayError("Hand {} has no recorded deck order".format(data.get("id")))
+
+        players = data["players"]
+        positions = {row["position_name"]: row["player_id"] for row in players}
+        # 三人以上庄家是 BTN，两人时庄家是大盲
+        dealer_id = positions.get("BTN") if len(players) > 2 else positions.get("BB")
+        if dealer_id is None:
+            raise ReplayError("Unable to detect the dealer of hand {}".format(data.get("id")))
+
+        return cls(
+            players=[(row["player_id"], row.get("nickname") or str(row["player_id"]), row["starting_stack"])
+                     for row in players],
+            dealer_id=dealer_id,
+            small_blind=int(data["small_blind"]),
+            big_blind=int(data["big_blind"]),
+            deck_order=decode_codes(data["deck_order"]),
+            actions=[(row["player_id"], row["action_type"], row["amount"]) for row in data["actions"]],
+            hand_id=data.get("id"),
+            ending_stacks={row["player_id"]: row["ending_stack"] for row in players
+                           if row.get("ending_stack") is not None}
+        )
+
+
+@dataclass
+class ReplayResult:
+    stacks: Dict[int, int]
+    board: List[int]
+    winner_ids: Set[int]
+
+
+class _PresetDeckFactory(DeckFactory):
+    def __init__(self, order: List[int]):
+        super().__init__(2)
+        self._order = order
+
+    def create_deck(self):
+        return PresetDeck(self._order, self._lowest_rank)
+
+
+class _ReplayBetHandler(HoldemGameBetHandler):
+    def get_bet(self, player, min_bet, max_bet, bets):
+        return self._game.next_recorded_bet(player)
+
+
+class ReplayHoldemPokerGame(HoldemPokerGame):
+    """
+    按行动记录执行的牌局。当前行动在记录中的位置就是已记录的行动数（self._action_history 的长度），
+    每个行动（包括盲注和自动过牌）都会和记录比对，不一致时抛出 ReplayError。
+    """
+    def __init__(self, record: HandRecord, players: List[Player]):
+        self._record = record
+        self._winner_ids: Set[int] = set()
+        game_id = "replay-{}".format(record.hand_id)
+        HoldemPokerGame.__init__(
+            self,
+            record.big_blind,
+            record.small_blind,
+            id=game_id,
+            game_players=GamePlayers(players),
+            event_dispatcher=HoldemPokerGameEventDispatcher(game_id=game_id, logger=logging.getLogger(__name__)),
+            deck_factory=_PresetDeckFactory(record.deck_order),
+            score_detector=HoldemPokerScoreDetector(),
+            timing=HEADLESS_TIMING,
+            sink=NULL_SINK
+        )
+
+    @property
+    def winner_ids(self) -> Set[int]:
+        return self._winner_ids
+
+    @property
+    def scores(self):
+        return self._scores
+
+    def _create_bet_handler(self):
+        return _ReplayBetHandler(
+            self,
+            game_players=self._game_players,
+            bet_rounder=GameBetRounder(self._game_players),
+            event_dispatcher=self._event_dispatcher,
+            bet_timeout=0,
+            timeout_tolerance=0,
+            wait_after_round=0,
+            on_action_callback=self._on_player_action
+        )
+
+    def _recorded_action(self) -> Tuple[int, str, int]:
+        cursor = len(self._action_history)
+        if cursor >= len(self._record.actions):
+            raise ReplayError("Action log ended after {} actions".format(cursor))
+        return self._record.actions[cursor]
+
+    def next_recorded_bet(self, player) -> int:
+        player_id, action_type, amount = self._recorded_action()
+        if player_id != player.id:
+            raise ReplayError("Action {}: expected player {}, got {}".format(
+                len(self._action_history) + 1, player.id, player_id))
+        return -1 if action_type == "fold" else amount
+
+    def _on_player_action(self, player, bet, min_bet, max_bet, bets, forced_action_type: str = None):
+        expected = self._recorded_action()
+        super()._on_player_action(player, bet, min_bet, max_bet, bets, forced_action_type)
+        action = self._action_history[-1]
+        actual = (action["player_id"], action["action_type"], action["amount"])
+        if actual != tuple(expected):
+            raise ReplayError("Action {}: recorded {}, replayed {}".format(action["action_num"], expected, actual))
+
+    def _detect_winners(self, pots, scores, dealer_id=None):
+        self._winner_ids = super()._detect_winners(pots, scores, dealer_id)
+        return self._winner_ids
+
+
+def replay_hand(record: HandRecord) -> ReplayResult:
+    players = []
+    for seat, (player_id, name, money) in enumerate(record.players):
+        player = Player(player_id, name, money)
+        player.seat = seat
+        players.append(player)
+
+    game = ReplayHoldemPokerGame(record, players)
+    game.play_hand(record.dealer_id)
+    return ReplayResult(
+        stacks={player.id: player.money for player in players},
+        board=list(game.scores.shared_codes),
+        winner_ids=game.winner_ids
+    )
+
+
+def verify_hand(record: HandRecord) -> Dict[int, Tuple[int, int]]:
+    """
+    回放并和记录的结束筹码比对。
+    :return: 不一致的玩家 {玩家id: (记录值, 回放值)}，为空表示一致
+    """
+    result = replay_hand(record)
+    return {
+        player_id: (stack, result.stacks.get(player_id))
+        for player_id, stack in record.ending_stacks.items()
+        if result.stacks.get(player_id) != stack
+    }
+
+
+def _parse_hand_ids(args: List[str]) -> List[int]:
+    hand_ids = []
+    for arg in args:
+        if "-" in arg:
+            first, last = arg.split("-", 1)
+            hand_ids.extend(range(int(first), int(last) + 1))
+        else:
+            hand_ids.append(int(arg))
+    return hand_ids
+
+
+def main(argv: Optional[List[str]] = None):
+    from .db_utils import get_hand_replay_data
+
+    parser = argparse.ArgumentParser(description="Replay recorded hands and check the final stacks")
+    parser.add_argument("hands", nargs="+", help="hand ids or ranges, e.g. 12 40-80")
+    args = parser.parse_args(argv)
+
+    checked = failed = 0
+    started = time.time()
+    for hand_id in _parse_hand_ids(args.hands):
+        data = get_hand_replay_data(hand_id)
+        if not data or not data.get("deck_order"):
+            continue
+        checked += 1
+        try:
+            mismatches = verify_hand(HandRecord.from_db(data))
+        except (ReplayError, ValueError) as e:
+            failed += 1
+            print("hand {}: {}".format(hand_id, e))
+            continue
+        if mismatches:
+            failed += 1
+            print("hand {}: stacks differ {}".format(hand_id, mismatches))
+
+    elapsed = time.time() - started
+    print("{} hands replayed, {} failed, {:.1f} hands/sec".format(
+        checked, failed, checked / elapsed if elapsed > 0 else 0.0))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,10 +1,25 @@
 import collections
+import functools
 from typing import List, Dict, Optional
 
 from .card import Card
+from . import hand_evaluator
 
 
 class Cards:
+    # 牌型 -> 取牌方法，牌型编号与 HoldemPokerScore 一致
+    PATTERNS = {
+        hand_evaluator.NO_PAIR: "no_pair",
+        hand_evaluator.PAIR: "pair",
+        hand_evaluator.TWO_PAIR: "two_pair",
+        hand_evaluator.TRIPS: "trips",
+        hand_evaluator.STRAIGHT: "straight",
+        hand_evaluator.FLUSH: "flush",
+        hand_evaluator.FULL_HOUSE: "full_house",
+        hand_evaluator.QUADS: "quads",
+        hand_evaluator.STRAIGHT_FLUSH: "straight_flush",
+    }
+
     def __init__(self, cards: List[Card], lowest_rank=2):
         # Sort the list of cards in a descending order
         self._sorted = sorted(cards, key=int, reverse=True)
@@ -123,8 +138,14 @@ class Cards:
     def no_pair(self) -> List[Card]:
         return self._sorted[0:5]
 
+    def best_cards(self, category: int) -> Optional[List[Card]]:
+        """已知牌型时直接取出对应的五张牌"""
+        return getattr(self, self.PATTERNS[category])()
+
 
 class Score:
+    __slots__ = ("_category", "_cards")
+
     def __init__(self, category: int, cards: List[Card]):
         self._category: int = category
         self._cards: List[Card] = cards
@@ -153,7 +174,13 @@ class Score:
         }
 
 
+@functools.total_ordering
 class HoldemPokerScore(Score):
+    """
+    德州扑克牌型得分。
+    由 HoldemPokerScoreDetector 查表得到时只保存牌力和原始的牌编码，最佳的五张牌在第一次访问 cards 时才生成 Card 对象。
+    牌力在创建时确定，得分之间可以直接用 <、==、max() 比较。
+    """
     NO_PAIR = 0
     PAIR = 1
     TWO_PAIR = 2
@@ -164,49 +191,109 @@ class HoldemPokerScore(Score):
     QUADS = 7
     STRAIGHT_FLUSH = 8
 
+    __slots__ = ("_strength", "_source")
+
+    def __init__(self, category: int, cards: Optional[List[Card]] = None, strength: Optional[int] = None,
+                 source: Optional[List[int]] = None):
+        if cards is not None:
+            Score.__init__(self, category, cards)
+        else:
+            self._category = category
+            self._cards = None
+        if strength is None:
+            strength = category
+            for offset in range(5):
+                strength <<= 4
+                try:
+                    strength += cards[offset].rank
+                except IndexError:
+                    pass
+        self._strength: int = strength
+        self._source: Optional[List[int]] = source  # 计算牌力用到的全部牌编码，用于还原最佳的五张牌
+
+    @classmethod
+    def from_strength(cls, strength: int, source: List[int]):
+        return cls(hand_evaluator.category(strength), strength=strength, source=source)
+
+    @property
+    def cards(self) -> List[Card]:
+        if self._cards is None:
+            self._cards = Cards([Card.from_code(code) for code in self._source], 2).best_cards(self._category)
+        return self._cards
+
     @property
-    def strength(self):
-        strength = self.category
-        for offset in range(5):
-            strength <<= 4
-            try:
-                strength += self.cards[offset].rank
-            except IndexError:
-                pass
-        return strength
+    def strength(self) -> int:
+        return self._strength
 
     def cmp(self, other):
-        if self.strength < other.strength:
+        if self._strength < other._strength:
             return -1
-        elif self.strength > other.strength:
+        elif self._strength > other._strength:
             return 1
         else:
             return 0
 
+    def __eq__(self, other):
+        if not isinstance(other, HoldemPokerScore):
+            return NotImplemented
+        return self._strength == other._strength
+
+    def __lt__(self, other):
+        if not isinstance(other, HoldemPokerScore):
+            return NotImplemented
+        return self._strength < other._strength
+
+    def __hash__(self):
+        return hash(self._strength)
+
 
 class ScoreDetector:
     def get_score(self, cards: List[Card]):
         raise NotImplemented
 
+    def get_score_codes(self, codes: List[int]):
+        # 牌编码版本，默认转换成 Card 后计算
+        return self.get_score([Card.from_code(code) for code in codes])
+
+    def create_hand(self, codes: List[int]) -> hand_evaluator.HandAccumulator:
+        # 创建可以逐街加牌的手牌状态
+        return hand_evaluator.HandAccumulator(codes)
+
+    def get_hand_score(self, hand: hand_evaluator.HandAccumulator):
+        return self.get_score_codes(list(hand.codes))
+
+    def get_scores_batch(self, board: List[int], hands: List[List[int]]) -> List[int]:
+        """
+        所有玩家共用同一组公共牌时批量计算牌力。
+        :param board: 公共牌编码
+        :param hands: 每名玩家的手牌编码
+        :return: 与 hands 顺序对应的牌力列表
+        """
+        return [self.get_score_codes(list(hand) + list(board)).strength for hand in hands]
+
 
 class HoldemPokerScoreDetector(ScoreDetector):
-    def get_score(self, cards):
-        cards = Cards(cards, 2)
-        score_functions = [
-            (HoldemPokerScore.STRAIGHT_FLUSH, cards.straight_flush),
-            (HoldemPokerScore.QUADS, cards.quads),
-            (HoldemPokerScore.FULL_HOUSE, cards.full_house),
-            (HoldemPokerScore.FLUSH, cards.flush),
-            (HoldemPokerScore.STRAIGHT, cards.straight),
-            (HoldemPokerScore.TRIPS, cards.trips),
-            (HoldemPokerScore.TWO_PAIR, cards.two_pair),
-            (HoldemPokerScore.PAIR, cards.pair),
-            (HoldemPokerScore.NO_PAIR, cards.no_pair),
-        ]
-
-        for score_category, score_function in score_functions:
-            cards = score_function()
-            if cards:
-                return HoldemPokerScore(score_category, cards)
-
-        raise RuntimeError("Unable to detect the score")
+    def get_score(self, cards: List[Card]):
+        return self.get_score_codes([card.code for card in cards])
+
+    def get_score_codes(self, codes: List[int]):
+        # 查表得到牌力，最佳的五张牌延迟到 dto()/cards 时再计算
+        try:
+            strength = hand_evaluator.evaluate(codes)
+        except KeyError:
+            raise RuntimeError("Unable to detect the score")
+        return HoldemPokerScore.from_strength(strength, list(codes))
+
+    def get_hand_score(self, hand: hand_evaluator.HandAccumulator):
+        # 直接使用累积的点数/花色状态，不再重新遍历所有牌
+        try:
+            strength = hand.strength()
+        except KeyError:
+            raise RuntimeError("Unable to detect the score")
+        return HoldemPokerScore.from_strength(strength, list(hand.codes))
+
+    def get_scores_batch(self, board: List[int], hands: List[List[int]]) -> List[int]:
+        try:
+            return hand_evaluator.evaluate_batch(board, hands)
+        except KeyError:
+            raise RuntimeError("Unable to detect the score")
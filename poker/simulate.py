@@ -0,0 +1,133 @@
+"""
+无界面牌桌模拟：机器人对战，评估机器人强弱、压测牌局引擎。
+
+牌局使用 HEADLESS_TIMING（不等待）、NULL_SINK（不写数据库）和 NO_DELAY_SCHEDULER（机器人不模拟思考时间），
+每个进程独立跑一批牌局，最后汇总每个座位的盈亏（bb/100）和每秒手数：
+
+    python -m poker.simulate --hands 1000000 --bots easy,medium,hard,easy,medium,hard --workers 4
+"""
+import argparse
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .bots.bot_player import BotPlayerServer
+from .bots.scheduler import NO_DELAY_SCHEDULER
+from .persistence import NULL_SINK
+from .poker_game_holdem import HoldemPokerGameFactory
+from .timing import HEADLESS_TIMING
+
+
+@dataclass
+class SimulationResult:
+    hands: int = 0
+    seconds: float = 0.0  # 各进程的计算时间之和
+    net: List[int] = field(default_factory=list)  # 每个座位的净盈亏（扣除补充的筹码）
+
+    def merge(self, other: "SimulationResult"):
+        self.hands += other.hands
+        self.seconds += other.seconds
+        self.net = [a + b for a, b in zip(self.net, other.net)] if self.net else list(other.net)
+
+
+def create_factory(big_blind: int, rng: Optional[random.Random] = None, logger=None) -> HoldemPokerGameFactory:
+    """无界面模拟用的牌局工厂"""
+    return HoldemPokerGameFactory(
+        big_blind=big_blind,
+        small_blind=big_blind // 2,
+        logger=logger or logging.getLogger(__name__),
+        rng=rng,
+        timing=HEADLESS_TIMING,
+        sink=NULL_SINK,
+        think_scheduler=NO_DELAY_SCHEDULER
+    )
+
+
+def simulate(bots: List[str], hands: int, big_blind: int = 10, stack: int = 1000,
+             seed: Optional[int] = None) -> SimulationResult:
+    """
+    同一桌的机器人连续打 hands 手牌，庄家位轮转；筹码少于一个大盲时补回初始筹码。
+    :param bots: 每个座位的机器人难度
+    """
+    logger = logging.getLogger(__name__)
+    factory = create_factory(big_blind, random.Random(seed) if seed is not None else None, logger)
+    players = [BotPlayerServer(logger, id=seat + 1, name="{}-{}".format(difficulty, seat + 1), money=stack,
+                               difficulty=difficulty)
+               for seat, difficulty in enumerate(bots)]
+    for seat, player in enumerate(players):
+        player.seat = seat
+    rebuys = [0] * len(players)
+
+    started = time.perf_counter()
+    for hand in range(hands):
+        for seat, player in enumerate(players):
+            if player.money < big_blind:
+                player.add_money(stack)
+                rebuys[seat] += stack
+        factory.create_game(players).play_hand(players[hand % len(players)].id)
+    elapsed = time.perf_counter() - started
+
+    return SimulationResult(
+        hands=hands,
+        seconds=elapsed,
+        net=[player.money - stack - rebuy for player, rebuy in zip(players, rebuys)]
+    )
+
+
+def _simulate_chunk(args) -> SimulationResult:
+    return simulate(*args)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Headless bot-vs-bot table simulation")
+    parser.add_argument("--hands", type=int, default=10000)
+    parser.add_argument("--bots", default="easy,medium,hard,easy,medium,hard",
+                        help="comma separated difficulty per seat")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk", type=int, default=2000, help="hands per task")
+    parser.add_argument("--big-blind", type=int, default=10)
+    parser.add_argument("--stack", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    bots = [bot.strip() for bot in args.bots.split(",") if bot.strip()]
+    if not 2 <= len(bots) <= 10:
+        parser.error("--bots needs 2 to 10 seats")
+
+    jobs = []
+    for index, start in enumerate(range(0, args.hands, args.chunk)):
+        seed = None if args.seed is None else args.seed * 1000003 + index
+        jobs.append((bots, min(args.chunk, args.hands - start), args.big_blind, args.stack, seed))
+
+    total = SimulationResult()
+    started = time.perf_counter()
+
+    def progress(result: SimulationResult):
+        total.merge(result)
+        elapsed = time.perf_counter() - started
+        print("{:>10} hands  {:>9.0f} hands/sec".format(total.hands, total.hands / elapsed if elapsed else 0.0))
+
+    if args.workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(args.workers) as executor:
+            for result in executor.map(_simulate_chunk, jobs):
+                progress(result)
+    else:
+        for job in jobs:
+            progress(_simulate_chunk(job))
+
+    elapsed = time.perf_counter() - started
+    print("{} hands in {:.1f}s: {:.0f} hands/sec ({:.0f} hands/sec per worker)".format(
+        total.hands, elapsed, total.hands / elapsed if elapsed else 0.0,
+        total.hands / total.seconds if total.seconds else 0.0))
+    for seat, (difficulty, net) in enumerate(zip(bots, total.net)):
+        print("seat {} {:<8} {:>+10.1f} bb/100".format(seat + 1, difficulty,
+                                                       net / args.big_blind / total.hands * 100 if total.hands else 0.0))
+
+
+if __name__ == "__main__":
+    main()
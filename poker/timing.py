@@ -0,0 +1,92 @@
+"""
+牌局节奏。
+
+发牌、下注轮结束、发公共牌、摊牌、赢家展示之后牌局会停顿一下给客户端播放动画，
+停顿通过 PokerGame._wait 交给牌局的 TimingPolicy，由它决定等多久：
+- 桌上没有真人时不需要等
+- 全下后发剩下的公共牌（没有人还能下注）时服务器不等，发 pace 事件让客户端自己按节奏播放
+- 快速桌、比赛桌按比例缩短
+
+按桌子类型选择（config.TABLE_TIMING）：
+
+    realtime    原来的节奏，所有停顿都等满
+    standard    线上默认：无真人不等，全下发牌由客户端播放
+    turbo       在 standard 基础上停顿缩短到 40%
+    tournament  在 standard 基础上停顿缩短到 70%
+    bots-only / replay / headless  不等待、不发 pace 事件（机器人对战、离线回放、模拟）
+"""
+from typing import Dict
+
+import gevent
+
+# 等待点
+CARDS = "cards"  # 发手牌
+BET_ROUND = "bet-round"  # 一轮下注结束
+STREET = "street"  # 发公共牌（翻牌、转牌、河牌）
+SHOWDOWN = "showdown"  # 摊牌
+WINNER = "winner"  # 每个底池的赢家展示
+
+
+class TimingPolicy:
+    """
+    :param scale: 停顿时间的比例
+    :param skip_without_humans: 桌上全是机器人时不等待
+    :param client_paced_runout: 全下后发公共牌时服务器不等待，改为给客户端发 pace 事件
+    """
+
+    def __init__(self, scale: float = 1.0, skip_without_humans: bool = False, client_paced_runout: bool = False):
+        self._scale = scale
+        self._skip_without_humans = skip_without_humans
+        self._client_paced_runout = client_paced_runout
+
+    def delay(self, game, point: str, seconds: float) -> float:
+        """服务器在等待点实际等待的秒数"""
+        if not seconds:
+            return 0.0
+        if self._skip_without_humans and not game.has_human_players():
+            return 0.0
+        if self._client_paced_runout and point == STREET and game.is_runout():
+            return 0.0
+        return seconds * self._scale
+
+    def wait(self, game, point: str, seconds: float):
+        delay = self.delay(game, point, seconds)
+        if delay > 0:
+            gevent.sleep(delay)
+        elif seconds and self._client_paced_runout and point == STREET and game.has_human_players():
+            # 全下发牌不在服务器等待，客户端收到 pace 后延迟处理之后的事件
+            game.event_dispatcher.pace_event(seconds * self._scale)
+
+
+class HeadlessTiming(TimingPolicy):
+    """无界面模拟（机器人对战、离线回放）：不等待"""
+
+    def delay(self, game, point: str, seconds: float) -> float:
+        return 0.0
+
+    def wait(self, game, point: str, seconds: float):
+        pass
+
+
+REALTIME_TIMING = TimingPolicy()
+STANDARD_TIMING = TimingPolicy(skip_without_humans=True, client_paced_runout=True)
+TURBO_TIMING = TimingPolicy(scale=0.4, skip_without_humans=True, client_paced_runout=True)
+TOURNAMENT_TIMING = TimingPolicy(scale=0.7, skip_without_humans=True, client_paced_runout=True)
+HEADLESS_TIMING = HeadlessTiming()
+
+TIMING_POLICIES: Dict[str, TimingPolicy] = {
+    "realtime": REALTIME_TIMING,
+    "standard": STANDARD_TIMING,
+    "turbo": TURBO_TIMING,
+    "tournament": TOURNAMENT_TIMING,
+    "bots-only": HEADLESS_TIMING,
+    "replay": HEADLESS_TIMING,
+    "headless": HEADLESS_TIMING,
+}
+
+
+def get_timing_policy(name: str) -> TimingPolicy:
+    try:
+        return TIMING_POLICIES[name]
+    except KeyError:
+        raise ValueError("Unknown timing policy: {}".format(name))
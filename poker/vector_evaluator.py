@@ -0,0 +1,77 @@
+"""
+批量牌力计算（离线分析、机器人训练用）。
+
+输入 (N, k) 的牌编码数组（k 为 5~7），输出 (N,) 的牌力数组，编码与 HoldemPokerScore.strength 相同。
+使用 hand_evaluator 的两张表：非同花牌型的点数计数键在排序后的键数组里 searchsorted，
+同花按每个花色的点数掩码直接索引。NumPy 是可选依赖，没有安装时逐行调用 hand_evaluator.evaluate。
+"""
+from typing import List, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from . import hand_evaluator
+
+_tables = None
+
+
+def _get_tables():
+    # 第一次调用时把查找表转换成数组
+    global _tables
+    if _tables is None:
+        keys = np.array(sorted(hand_evaluator._RANK_TABLE), dtype=np.int64)
+        values = np.array([hand_evaluator._RANK_TABLE[key] for key in keys.tolist()], dtype=np.int64)
+        _tables = (
+            np.array(hand_evaluator._RANK_KEY, dtype=np.int64),
+            np.array(hand_evaluator._RANK_BIT, dtype=np.int64),
+            keys,
+            values,
+            np.array(hand_evaluator._FLUSH_TABLE, dtype=np.int64),
+        )
+    return _tables
+
+
+def evaluate_array(codes):
+    """
+    :param codes: (N, k) 的整数数组或二维列表，每行是一手牌的牌编码
+    :return: 安装了 NumPy 时返回 (N,) 的 int64 数组，否则返回列表
+    """
+    if np is None:
+        return _evaluate_rows(codes)
+
+    codes = np.asarray(codes, dtype=np.int64)
+    if codes.ndim != 2:
+        raise ValueError("codes must be a 2-d array")
+    if codes.shape[0] == 0:
+        return np.zeros(0, dtype=np.int64)
+    if codes.min() < 0 or codes.max() >= 52:
+        raise ValueError("Invalid card code")
+
+    rank_keys, rank_bits, keys, values, flush_table = _get_tables()
+
+    # 非同花：点数计数的5进制编码
+    key = rank_keys[codes].sum(axis=1)
+    index = np.searchsorted(keys, key)
+    index[index >= len(keys)] = 0
+    if not np.array_equal(keys[index], key):
+        raise ValueError("Invalid hand")
+    strength = values[index]
+
+    # 同花：只处理某个花色有5张以上的行，同一花色内点数不重复，掩码直接求和即可
+    suits = codes & 3
+    suit_counts = np.stack([(suits == suit).sum(axis=1) for suit in range(4)], axis=1)
+    rows = np.nonzero(suit_counts.max(axis=1) >= 5)[0]
+    if len(rows):
+        flush_suits = suit_counts[rows].argmax(axis=1)
+        bits = np.where(suits[rows] == flush_suits[:, None], rank_bits[codes[rows]], 0)
+        strength[rows] = flush_table[bits.sum(axis=1)]
+    return strength
+
+
+def _evaluate_rows(codes: Sequence[Sequence[int]]) -> List[int]:
+    try:
+        return [hand_evaluator.evaluate(row) for row in codes]
+    except KeyError:
+        raise ValueError("Invalid hand")
@@ -31,7 +31,10 @@ LOG_DIR="${APP_HOME}/logs"
 PID_DIR="${APP_HOME}/run"
 SERVICE_LOG="${LOG_DIR}/poker_service.log"
 WEB_LOG="${LOG_DIR}/poker_web.log"
+BUILD_LOG="${LOG_DIR}/preflop_equity_build.log"
+BUILD_PID="${PID_DIR}/preflop_equity_build.pid"
 SERVICE_PID="${PID_DIR}/poker_service.pid"
+EQUITY_TABLE="${APP_HOME}/assets/preflop_equity.bin"
 WEB_PID="${PID_DIR}/poker_web.pid"
 MAX_LOG_SIZE=$((10*1024*1024))   # 10MB
 
@@ -117,6 +120,30 @@ activate_venv_if_set() {
 #################################
 # Actions                       #
 #################################
+build_tables() {
+  activate_venv_if_set
+  require_cmd "$PYTHON_BIN"
+  log "Building preflop equity tables (one-off, may take a few minutes)…"
+  (cd "$APP_HOME" && "$PYTHON_BIN" -m poker.preflop_equity --output "$EQUITY_TABLE") \
+    || warn "Failed to build preflop equity tables; bots will run without them"
+}
+
+build_tables_if_missing() {
+  # 不阻塞启动：缺少胜率表时在后台生成，生成之前机器人按蒙特卡洛计算，重启服务后使用胜率表
+  [[ -f "$EQUITY_TABLE" ]] && return 0
+  if pid_running "$BUILD_PID"; then
+    log "Preflop equity tables are being built (pid $(cat "$BUILD_PID"), log: $BUILD_LOG)"
+    return 0
+  fi
+  activate_venv_if_set
+  require_cmd "$PYTHON_BIN"
+  rotate_log_if_needed "$BUILD_LOG"
+  (cd "$APP_HOME" && nohup "$PYTHON_BIN" -m poker.preflop_equity --output "$EQUITY_TABLE" >>"$BUILD_LOG" 2>&1 &
+    echo $! > "$BUILD_PID")
+  log "Preflop equity tables missing; building in background (pid $(cat "$BUILD_PID"), log: $BUILD_LOG)." \
+    "Bots use Monte Carlo until the service is restarted with the tables."
+}
+
 start_service() {
   if pid_running "$SERVICE_PID"; then
     warn "Service already running (pid $(cat "$SERVICE_PID"))"
@@ -160,6 +187,7 @@ start_web() {
 }
 
 start_all() {
+  build_tables_if_missing
   start_service
   start_web
 }
@@ -195,7 +223,7 @@ clean_stale() {
 
 usage() {
   cat <<USAGE
-Usage: $0 {start|stop|restart|status|tail|start-service|start-web|stop-service|stop-web}
+Usage: $0 {start|stop|restart|status|tail|start-service|start-web|stop-service|stop-web|build-tables}
 
 Environment variables you can override:
   APP_HOME, PYTHON_BIN, VENV_ACTIVATE, HOST, PORT, GUNICORN_BIN, GUNICORN_WORKER,
@@ -218,6 +246,7 @@ main() {
     restart)        stop_all || true; start_all ;;
     status)         status ;;
     tail)           tail_logs ;;
+    build-tables)   build_tables ;;
     *)              usage; exit 1 ;;
   esac
 }
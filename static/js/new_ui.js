@@ -905,8 +905,11 @@ const PyPoker = {
 
         // 设置赢家
         setWinners: function(pot) {
-            // 优先使用后端计算好的净利润 `net_win_split`，如果不存在则回退到原始的 `money_split`
-            const moneyToShow = pot.net_win_split ?? pot.money_split;
+            // 优先使用后端计算好的每名赢家的净利润 `net_wins`（除不尽的筹码只分给部分赢家），
+            // 其次是 `net_win_split`，都不存在时回退到原始的 `money_split`
+            const defaultMoney = pot.net_win_split ?? pot.money_split;
+            const moneyFor = (winnerId) => (pot.net_wins && pot.net_wins[winnerId] !== undefined)
+                ? pot.net_wins[winnerId] : defaultMoney;
             
             // 不再重置所有座位状态，而是累加赢家信息
             // 这样可以正确处理多边池的情况（先后触发多次 winner-designation）
@@ -945,7 +948,7 @@ const PyPoker = {
                             seat.appendChild(winLabel);
                         }
                         
-                        const newAmount = currentAmount + moneyToShow;
+                        const newAmount = currentAmount + moneyFor(winnerId);
                         winLabel.textContent = `+$${newAmount}`;
                     }
                 });
@@ -965,6 +968,11 @@ const PyPoker = {
                             // 修改此处: 传入 'small' 参数以调整摊牌时座位上手牌的大小
                             cardsDiv.innerHTML += PyPoker.Game.createCard(card[0], card[1], 'small');
                         }
+                        // 全下提前摊牌时显示胜率
+                        if (players[playerId].equity !== undefined) {
+                            const equity = (players[playerId].equity * 100).toFixed(1);
+                            cardsDiv.innerHTML += `<div class="hand-equity" style="font-size: 12px; font-weight: bold; color: #facc15;">${equity}%</div>`;
+                        }
                     }
                 }
             }
@@ -1068,8 +1076,39 @@ const PyPoker = {
             PyPoker.Logger.log('本局游戏结束');
         },
 
-        // 处理游戏更新事件
+        // 服务器没有等待的动画（全下后发公共牌）由客户端排队播放：
+        // 收到 pace 事件后，之后的牌局事件延迟 seconds 秒再处理
+        _pacing: false,
+        _paceQueue: [],
+
         onGameUpdate: function(message) {
+            const game = PyPoker.Game;
+            if (game._pacing || message.event === 'pace') {
+                game._paceQueue.push(message);
+                if (!game._pacing) {
+                    game._drainPaceQueue();
+                }
+                return;
+            }
+            game.handleGameUpdate(message);
+        },
+
+        _drainPaceQueue: function() {
+            const game = PyPoker.Game;
+            game._pacing = false;
+            while (game._paceQueue.length) {
+                const message = game._paceQueue.shift();
+                if (message.event === 'pace') {
+                    game._pacing = true;
+                    setTimeout(game._drainPaceQueue, (message.seconds || 0) * 1000);
+                    return;
+                }
+                game.handleGameUpdate(message);
+            }
+        },
+
+        // 处理游戏更新事件
+        handleGameUpdate: function(message) {
             PyPoker.Player.disableBetMode();
 
             switch (message.event) {
@@ -0,0 +1,156 @@
+import random
+import unittest
+
+from poker.player import Player
+from poker.poker_game import GameBetRounder, GamePlayers
+
+
+class ListGamePlayers:
+    """按列表扫描的参考实现（GamePlayers 改成座位环之前的行为）"""
+
+    def __init__(self, player_ids):
+        self.player_ids = list(player_ids)
+        self.folder_ids = set()
+        self.dead_ids = set()
+
+    def fold(self, player_id):
+        if player_id not in self.player_ids:
+            raise ValueError("Unknown player id")
+        self.folder_ids.add(player_id)
+
+    def remove(self, player_id):
+        self.fold(player_id)
+        self.dead_ids.add(player_id)
+
+    def reset(self):
+        self.folder_ids = set(self.dead_ids)
+
+    def round(self, dealer_id, reverse=False):
+        start = (self.player_ids.index(dealer_id) + 1) % len(self.player_ids)
+        step = -1 if reverse else 1
+        for i in range(len(self.player_ids)):
+            player_id = self.player_ids[(start + i * step) % len(self.player_ids)]
+            if player_id not in self.folder_ids:
+                yield player_id
+
+    def get_next(self, dealer_id):
+        if dealer_id not in self.player_ids:
+            raise ValueError("Unknown player id")
+        if dealer_id in self.folder_ids:
+            raise ValueError("Inactive player")
+        start = self.player_ids.index(dealer_id)
+        for i in range(len(self.player_ids) - 1):
+            next_id = self.player_ids[(start + i + 1) % len(self.player_ids)]
+            if next_id not in self.folder_ids:
+                return next_id
+        return None
+
+
+def _call(function, *args):
+    try:
+        return function(*args)
+    except ValueError as e:
+        return "ValueError: {}".format(e)
+
+
+class GamePlayersRingTest(unittest.TestCase):
+    def _assert_same(self, game_players, reference, seats):
+        for dealer_id in seats:
+            self.assertEqual([player.id for player in game_players.round(dealer_id)],
+                             list(reference.round(dealer_id)))
+            self.assertEqual([player.id for player in game_players.round(dealer_id, reverse=True)],
+                             list(reference.round(dealer_id, reverse=True)))
+            next_player = _call(game_players.get_next, dealer_id)
+            self.assertEqual(next_player.id if isinstance(next_player, Player) else next_player,
+                             _call(reference.get_next, dealer_id))
+            self.assertEqual(game_players.is_active(dealer_id), dealer_id not in reference.folder_ids)
+        self.assertEqual(game_players.count_active(), len(seats) - len(reference.folder_ids))
+        self.assertEqual([player.id for player in game_players.active],
+                         [player_id for player_id in seats if player_id not in reference.folder_ids])
+        self.assertEqual([player.id for player in game_players.all],
+                         [player_id for player_id in seats if player_id not in reference.dead_ids])
+        self.assertEqual({player.id for player in game_players.folders}, reference.folder_ids)
+
+    def test_matches_list_scan_on_random_sequences(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            seats = rng.sample(range(100), rng.randint(2, 10))
+            game_players = GamePlayers([Player(player_id, "p", 1000) for player_id in seats])
+            reference = ListGamePlayers(seats)
+            for _ in range(30):
+                action = rng.random()
+                player_id = rng.choice(seats)
+                if action < 0.6:
+                    game_players.fold(player_id)
+                    reference.fold(player_id)
+                elif action < 0.7:
+                    game_players.remove(player_id)
+                    reference.remove(player_id)
+                else:
+                    game_players.reset()
+                    reference.reset()
+                self._assert_same(game_players, reference, seats)
+
+    def test_unknown_player(self):
+        game_players = GamePlayers([Player(1, "a", 100), Player(2, "b", 100)])
+        with self.assertRaises(ValueError):
+            game_players.fold(3)
+        with self.assertRaises(ValueError):
+            game_players.get_next(3)
+        with self.assertRaises(ValueError):
+            game_players.is_active(3)
+
+    def test_fold_during_round_iteration(self):
+        seats = [1, 2, 3, 4, 5]
+        game_players = GamePlayers([Player(player_id, "p", 100) for player_id in seats])
+        reference = ListGamePlayers(seats)
+        visited, expected = [], []
+        for player in game_players.round(2):
+            visited.append(player.id)
+            if player.id == 3:
+                game_players.fold(5)
+        for player_id in reference.round(2):
+            expected.append(player_id)
+            if player_id == 3:
+                reference.fold(5)
+        self.assertEqual(visited, expected)
+
+
+class RoundStakesTest(unittest.TestCase):
+    """bet_round 中的上下限与逐个扫描玩家的计算一致"""
+
+    @staticmethod
+    def _scan_limits(game_players, player, bets):
+        others = [other.money + bets[other.id] for other in game_players.round(player.id) if other is not player]
+        min_bet = min(max(bets.values()) - bets[player.id], player.money)
+        max_bet = min(max(others) - bets[player.id], player.money) if others else 0
+        return min_bet, max_bet
+
+    def test_limits_match_scan(self):
+        rng = random.Random(11)
+        checked = 0
+        for _ in range(300):
+            players = [Player(i, "p", rng.choice([50, 200, 1000, 5000])) for i in range(rng.randint(2, 9))]
+            game_players = GamePlayers(players)
+            rounder = GameBetRounder(game_players)
+
+            def get_bet(player, min_bet, max_bet, bets):
+                nonlocal checked
+                self.assertEqual((min_bet, max_bet), self._scan_limits(game_players, player, bets))
+                checked += 1
+                choice = rng.random()
+                if choice < 0.2 and min_bet > 0:
+                    return -1
+                if choice < 0.5 or max_bet == min_bet:
+                    return min_bet
+                return rng.randint(min_bet + 1, max_bet) if rng.random() < 0.8 else max_bet
+
+            for street in range(4):
+                if game_players.count_active() < 2:
+                    break
+                rounder.bet_round(players[-1].id, {}, get_bet)
+        self.assertGreater(checked, 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import random
+import unittest
+
+from poker.player import Player
+from poker.poker_game import GamePlayers, GamePots
+
+
+class RebuiltGamePots:
+    """每次 add_bets 都按投入重新切分奖金池的参考实现（GamePots 改成增量维护之前的行为）"""
+
+    def __init__(self, game_players):
+        self._game_players = game_players
+        self.pots = []
+        self.bets = {player.id: 0 for player in game_players.all}
+
+    def add_bets(self, bets):
+        for player in self._game_players.all:
+            self.bets[player.id] += bets.get(player.id, 0)
+        bets = dict(self.bets)
+        players = sorted(self._game_players.all, key=lambda player: bets[player.id])
+        self.pots = []
+        spare_money = 0
+        for i, player in enumerate(players):
+            if not self._game_players.is_active(player.id):
+                spare_money += bets[player.id]
+                bets[player.id] = 0
+            elif bets[player.id] > 0:
+                pot_bet = bets[player.id]
+                pot = GamePots.GamePot()
+                pot.add_money(spare_money)
+                spare_money = 0
+                for other in players[i:]:
+                    if self._game_players.is_active(other.id):
+                        pot.add_player(other)
+                        pot.add_player_contribution(other.id, pot_bet)
+                    pot.add_money(pot_bet)
+                    bets[other.id] -= pot_bet
+                self.pots.append(pot)
+        if spare_money:
+            raise ValueError("Invalid bets")
+
+
+def _dump(pots):
+    return [(pot.money, [player.id for player in pot.players], pot.contributions) for pot in pots]
+
+
+def _add_bets(pots, bets):
+    try:
+        pots.add_bets(bets)
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+class GamePotsTest(unittest.TestCase):
+    def test_matches_rebuilt_pots_on_random_hands(self):
+        rng = random.Random(1)
+        errors = 0
+        for _ in range(3000):
+            players = [Player(i, "p", 1000) for i in range(rng.randint(2, 9))]
+            game_players = GamePlayers(players)
+            pots = GamePots(game_players)
+            reference = RebuiltGamePots(game_players)
+            for street in range(4):
+                bets = {}
+                for player in game_players.active:
+                    choice = rng.random()
+                    if choice < 0.15:
+                        game_players.fold(player.id)
+                        bets[player.id] = rng.choice([0, 10, 20])
+                    elif choice < 0.2 and street == 1:
+                        game_players.remove(player.id)
+                    else:
+                        # 不同的投入额模拟全下形成的边池
+                        bets[player.id] = rng.choice([0, 10, 20, 40, 55])
+                error = _add_bets(reference, bets)
+                self.assertEqual(_add_bets(pots, bets), error)
+                if error:
+                    errors += 1
+                    break
+                self.assertEqual(_dump(pots), _dump(reference.pots))
+                self.assertEqual(pots.bets, reference.bets)
+                self.assertEqual(pots.money, sum(pot.money for pot in reference.pots))
+        # 随机序列需要同时覆盖正常边池和 "Invalid bets" 两种情况
+        self.assertGreater(errors, 0)
+
+    def test_side_pots(self):
+        players = [Player(1, "a", 1000), Player(2, "b", 1000), Player(3, "c", 1000), Player(4, "d", 1000)]
+        game_players = GamePlayers(players)
+        pots = GamePots(game_players)
+        game_players.fold(2)
+        pots.add_bets({1: 100, 2: 50, 3: 200, 4: 100})
+        self.assertEqual(_dump(pots), [(350, [1, 4, 3], {1: 100, 4: 100, 3: 100}), (100, [3], {3: 100})])
+        self.assertEqual(pots.money, 450)
+
+    def test_folder_bet_above_active_is_invalid(self):
+        game_players = GamePlayers([Player(1, "a", 1000), Player(2, "b", 1000)])
+        pots = GamePots(game_players)
+        game_players.fold(2)
+        with self.assertRaises(ValueError):
+            pots.add_bets({1: 10, 2: 20})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from unittest import mock
+
+from poker.player import Player
+from poker.poker_game import GameBetRounder, GamePlayers
+from poker.poker_game_holdem import HoldemPokerGame
+from poker.simulate import create_factory, simulate
+
+
+class GameBetRounderPredictTest(unittest.TestCase):
+    def _play(self, stacks, actions, bets=None):
+        """按 actions 顺序下注，每次行动前预测下一位玩家，返回 (预测, 实际) 列表"""
+        players = [Player(i, "p{}".format(i), money) for i, money in enumerate(stacks)]
+        rounder = GameBetRounder(GamePlayers(players))
+        actions = list(actions)
+        checks = []
+        pending = {}
+
+        def get_bet(player, min_bet, max_bet, bets):
+            if player.id in pending:
+                checks.append((pending.pop(player.id), (min_bet, max_bet)))
+            bet = actions.pop(0)
+            prediction = rounder.predict_next(player, bet, min_bet, bets)
+            if prediction is not None:
+                next_player, next_min_bet, next_max_bet = prediction
+                pending[next_player.id] = (next_min_bet, next_max_bet)
+            return bet
+
+        rounder.bet_round(len(players) - 1, dict(bets or {}), get_bet)
+        return checks, pending
+
+    def test_prediction_matches_actual_limits(self):
+        # p0 下注 100，p1 弃牌，p2 加注全下，p0 跟注
+        checks, pending = self._play([1000, 500, 800], [100, -1, 800, 700])
+        self.assertEqual(len(checks), 3)
+        for predicted, actual in checks:
+            self.assertEqual(predicted, actual)
+        self.assertEqual(pending, {})
+
+    def test_fold_excludes_folder_from_max_bet(self):
+        # p1 弃牌后 p2 的最大下注只受 p0 的筹码限制
+        checks, _ = self._play([300, 1000, 2000], [0, -1, 0, 0])
+        self.assertIn(((0, 300), (0, 300)), checks)
+
+    def test_no_prediction_when_round_closes(self):
+        # 所有人过牌，最后一位过牌后本轮结束，不应该预测
+        checks, pending = self._play([1000, 1000, 1000], [0, 0, 0])
+        self.assertEqual(len(checks), 2)
+        self.assertEqual(pending, {})
+
+
+class _FixedWinners:
+    def __init__(self, winner_ids):
+        self._winner_ids = winner_ids
+
+    def get_winners(self, players, scores):
+        return [player for player in players if player.id in self._winner_ids]
+
+
+class DetectWinnersOddChipTest(unittest.TestCase):
+    def test_three_way_split_of_odd_pot(self):
+        players = [Player(i, "p{}".format(i), 100) for i in range(1, 5)]
+        game = create_factory(10).create_game(players)
+        bets = {1: 10, 2: 10, 3: 10, 4: 1}
+        for player in players:
+            player.take_money(bets[player.id])
+        game._game_players.fold(4)
+        pots = game._create_pots()
+        pots.add_bets(bets)
+        self.assertEqual(pots.money, 31)
+
+        game._winners_detector = _FixedWinners({1, 2, 3})
+        with mock.patch.object(game.event_dispatcher, "raise_event") as raise_event:
+            winner_ids = game._detect_winners(pots, None, dealer_id=2)
+
+        # 31 = 10 * 3 + 1，多出的 1 个筹码给庄家（2号）左手边第一个赢家 3号
+        self.assertEqual(winner_ids, {1, 2, 3})
+        self.assertEqual([player.money for player in players], [100, 100, 101, 99])
+
+        event, data = raise_event.call_args[0]
+        self.assertEqual(event, "winner-designation")
+        pot = data["pot"]
+        self.assertEqual(pot["winner_ids"], [3, 1, 2])
+        self.assertEqual(pot["money_split"], 10)
+        self.assertEqual(pot["winner_shares"], {3: 11, 1: 10, 2: 10})
+        self.assertEqual(pot["net_wins"], {3: 1, 1: 0, 2: 0})
+        self.assertEqual(pot["net_win_split"], 1)
+        self.assertEqual(sum(pot["winner_shares"].values()), pot["money"])
+
+
+class IntegerChipsTest(unittest.TestCase):
+    def test_normalize_bot_bet_clamps(self):
+        self.assertEqual(HoldemPokerGame._normalize_bot_bet(-1, 10, 50), -1)
+        self.assertEqual(HoldemPokerGame._normalize_bot_bet(0, 10, 50), 10)
+        self.assertEqual(HoldemPokerGame._normalize_bot_bet(70, 10, 50), 50)
+        self.assertEqual(HoldemPokerGame._normalize_bot_bet(30, 10, 50), 30)
+
+    def test_simulation_conserves_integer_chips(self):
+        # 奇数盲注让平分底池时出现零头筹码
+        result = simulate(["easy", "medium", "hard", "easy", "medium"], 30, big_blind=7, stack=300, seed=3)
+        self.assertTrue(all(type(net) is int for net in result.net))
+        self.assertEqual(sum(result.net), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
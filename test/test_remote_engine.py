@@ -0,0 +1,140 @@
+import unittest
+from unittest import mock
+
+import gevent
+import requests
+
+from poker.bots import remote_engine
+from poker.bots.decision import BotDecisionContext
+from poker.bots.remote_engine import CircuitBreaker, DecisionBatcher, RemoteDecisionEngine
+
+BASE_URL = "http://solver.test"
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, data=None):
+        self.status_code = status_code
+        self._data = data
+        self.content = b"" if data is None else b"{}"
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError("{} Server Error".format(self.status_code))
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.paths = []
+
+    def post(self, url, **kwargs):
+        self.paths.append(url[len(BASE_URL):])
+        return self.response
+
+
+class DecisionBatcherErrorTest(unittest.TestCase):
+    def setUp(self):
+        remote_engine._BREAKERS.pop(BASE_URL, None)
+
+    def _request(self, response, requests_count=1):
+        session = FakeSession(response)
+        batcher = DecisionBatcher(BASE_URL, {}, (1.0, 1.0), linger=0.001)
+        with mock.patch.object(remote_engine, "get_session", return_value=session):
+            jobs = [gevent.spawn(batcher.request, {"difficulty": "hard", "context": {}})
+                    for _ in range(requests_count)]
+            gevent.joinall(jobs)
+        return jobs, session
+
+    def test_server_error_is_raised_not_reported_as_timeout(self):
+        jobs, session = self._request(FakeResponse(500, {}))
+        self.assertEqual(session.paths, ["/act"])
+        self.assertIsInstance(jobs[0].exception, requests.HTTPError)
+
+    def test_batch_server_error_is_raised_for_every_request(self):
+        jobs, session = self._request(FakeResponse(500, {}), requests_count=3)
+        self.assertEqual(session.paths, ["/act_batch"])
+        for job in jobs:
+            self.assertIsInstance(job.exception, requests.HTTPError)
+
+    def test_empty_result_is_returned(self):
+        jobs, _ = self._request(FakeResponse(200, None))
+        self.assertIsNone(jobs[0].exception)
+        self.assertEqual(jobs[0].value, {})
+
+    def test_empty_batch_results_raise_mismatch(self):
+        jobs, _ = self._request(FakeResponse(200, {"results": []}), requests_count=2)
+        for job in jobs:
+            self.assertIsInstance(job.exception, ValueError)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class HangingSession:
+    def post(self, url, **kwargs):
+        gevent.sleep(60)
+
+
+def _context():
+    return BotDecisionContext(room_id="", game_id="", street=0, player_id=1, player_name="bot", seat=0,
+                              hand=[], board=[], players=[], pot_total=15, street_bets={}, min_bet=10,
+                              max_bet=100, to_call=10)
+
+
+class CircuitBreakerProbeTest(unittest.TestCase):
+    def _half_open_breaker(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0, clock=clock)
+        breaker.record_failure()
+        clock.now = 30.0
+        return breaker, clock
+
+    def test_stuck_probe_is_replaced_after_reset_timeout(self):
+        breaker, clock = self._half_open_breaker()
+        self.assertTrue(breaker.allow())  # 试探请求，一直没有结果
+        self.assertFalse(breaker.allow())
+        clock.now = 59.0
+        self.assertFalse(breaker.allow())
+        clock.now = 60.0
+        self.assertTrue(breaker.allow())
+
+    def test_cancelled_probe_counts_as_failure(self):
+        breaker, clock = self._half_open_breaker()
+        self.assertTrue(breaker.allow())
+        breaker.record_cancel()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        clock.now = 60.0
+        self.assertTrue(breaker.allow())
+
+    def test_cancel_outside_probe_is_not_counted(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_cancel()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_killed_unbatched_probe_releases_breaker(self):
+        breaker, clock = self._half_open_breaker()
+        with mock.patch.dict(remote_engine._BREAKERS, {BASE_URL: breaker}), \
+                mock.patch.dict("os.environ", {"BOT_DECISION_BATCH": "0"}), \
+                mock.patch.object(remote_engine, "get_api_key", return_value=BASE_URL), \
+                mock.patch.object(remote_engine, "get_session", return_value=HangingSession()):
+            engine = RemoteDecisionEngine("hard")
+            job = gevent.spawn(engine.decide, _context())
+            gevent.sleep(0)
+            self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+            job.kill()  # 例如丢弃预取的决策
+
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        clock.now = 60.0
+        self.assertTrue(breaker.allow())
+
+
+if __name__ == "__main__":
+    unittest.main()
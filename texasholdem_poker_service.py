@@ -28,8 +28,8 @@ if __name__ == '__main__':
         room_factory=GameRoomFactory(
             room_size=10,
             game_factory=HoldemPokerGameFactory(
-                big_blind=10.0,
-                small_blind=5.0,
+                big_blind=10,
+                small_blind=5,
                 logger=logger,
                 game_subscribers=[]
             )